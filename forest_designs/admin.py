@@ -70,6 +70,8 @@ class PlantAdmin(admin.GISModelAdmin):
     model = Plant
 
     autocomplete_fields = ("genus", "species", "variety")
+    readonly_fields = ("current_state",)
+    list_filter = ("current_state",)
     inlines = [PlantImageInline, PlantStateTransitionAdmin, PlantLogInline]
 
 
@@ -6,3 +6,6 @@ class ForestDesignsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "forest_designs"
     verbose_name = _("Forest Designs")
+
+    def ready(self):
+        from . import signals  # noqa: F401
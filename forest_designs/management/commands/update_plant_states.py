@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from forest_designs.models import Plant
+
+
+class Command(BaseCommand):
+    help = "Update the materialized current state of plants from their transitions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report plants with an outdated current state, failing if there are any.",
+        )
+
+    def handle(self, *args, **options):
+        inconsistent = Plant.objects.inconsistent_current_state()
+
+        if options["check"]:
+            count = inconsistent.count()
+            if count:
+                for plant in inconsistent.select_related("current_state")[:20]:
+                    self.stdout.write(
+                        f"{plant.uuid}: {plant.current_state} instead of latest transition."
+                    )
+
+                raise CommandError(f"{count} plants with outdated current state.")
+
+            self.stdout.write(self.style.SUCCESS("All plant states are up to date."))
+            return
+
+        updated = Plant.objects.update_current_state()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated current state of {updated} plants.")
+        )
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_current_state(apps, schema_editor):
+    Plant = apps.get_model("forest_designs", "Plant")
+    PlantStateTransition = apps.get_model("forest_designs", "PlantStateTransition")
+
+    Plant.objects.update(
+        current_state=Subquery(
+            PlantStateTransition.objects.filter(plant=OuterRef("uuid"))
+            .order_by("-date")
+            .values("state")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forest_designs", "0005_alter_plant_genus_alter_plantimage_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="plant",
+            name="current_state",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="current_state_uuid",
+                editable=False,
+                help_text="State of the latest transition, kept up to date on changes.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="current_plants",
+                to="forest_designs.plantstate",
+                to_field="uuid",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="plantstatetransition",
+            index=models.Index(
+                fields=["plant", "-date"], name="statetransition_plant_date"
+            ),
+        ),
+        migrations.RunPython(backfill_current_state, migrations.RunPython.noop),
+    ]
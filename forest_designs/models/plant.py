@@ -2,11 +2,35 @@ from django.contrib.gis.geos import GEOSGeometry
 from django.utils.translation import gettext_lazy as _
 from django.contrib.gis.db import models
 
-from forest_designs.models.state import PlantState
+from django.db.models import F, OuterRef, Q, Subquery
+
+from forest_designs.models.state import PlantState, PlantStateTransition
 from plant_species.models import Genus, Species, SpeciesVariety
 from treescape.models import UUIDIndexedModel
 
 
+def _latest_state() -> Subquery:
+    return Subquery(
+        PlantStateTransition.objects.filter(plant=OuterRef("uuid"))
+        .order_by("-date")
+        .values("state")[:1]
+    )
+
+
+class PlantQuerySet(models.QuerySet):
+    def update_current_state(self) -> int:
+        """Set current_state to the state of the latest transition, in a single query."""
+        return self.update(current_state=_latest_state())
+
+    def inconsistent_current_state(self) -> "PlantQuerySet":
+        """Plants of which current_state doesn't match the latest transition."""
+        return self.annotate(latest_state=_latest_state()).filter(
+            Q(current_state__isnull=True, latest_state__isnull=False)
+            | Q(current_state__isnull=False, latest_state__isnull=True)
+            | ~Q(current_state=F("latest_state"))
+        )
+
+
 class Plant(UUIDIndexedModel):
     """Plant with specific location within design."""
 
@@ -41,11 +65,27 @@ class Plant(UUIDIndexedModel):
         _("location"), unique=True, tolerance=0.05, spatial_index=True
     )
 
+    current_state = models.ForeignKey(
+        PlantState,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("State of the latest transition, kept up to date on changes."),
+        db_column="current_state_uuid",
+        related_name="current_plants",
+        to_field="uuid",
+    )
+
+    objects = PlantQuerySet.as_manager()
+
     def get_state(self) -> PlantState | None:
-        transition = self.statetransitions.first()
-        if transition:
-            return transition.state
-        return None
+        return self.current_state
+
+    def update_current_state(self):
+        """Update current_state from the latest transition."""
+        Plant.objects.filter(pk=self.pk).update_current_state()
+        self.refresh_from_db(fields=["current_state"])
 
     def get_name(self) -> str | None:
         """Return plant name, based on the level of detail given."""
@@ -49,3 +49,6 @@ class PlantStateTransition(UUIDIndexedModel):
         verbose_name = _("plant state transition")
         verbose_name_plural = _("plant state transitions")
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["plant", "-date"], name="statetransition_plant_date"),
+        ]
@@ -0,0 +1,88 @@
+import typing
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Plant, PlantStateTransition, Zone
+from .tiles import invalidate_tiles
+
+
+def _update_current_state(plant_uuids: typing.Iterable):
+    plants = Plant.objects.filter(uuid__in=set(plant_uuids))
+
+    with transaction.atomic():
+        # Lock the plants first, so concurrent transitions of the same plant are
+        # serialized and the update below sees those committed in the meantime.
+        list(plants.select_for_update().values_list("pk", flat=True))
+        plants.update_current_state()
+
+
+@receiver(pre_save, sender=PlantStateTransition)
+def remember_previous_plant(sender, instance, raw, **kwargs):
+    """Track the plant a transition is moved away from, to update it as well."""
+    if raw or instance._state.adding:
+        return
+
+    instance._previous_plant_id = (
+        sender.objects.filter(pk=instance.pk).values_list("plant", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=PlantStateTransition)
+def update_current_state_on_save(sender, instance, raw, **kwargs):
+    # Fixtures carry current_state themselves.
+    if raw:
+        return
+
+    plant_uuids = [instance.plant_id]
+    previous_plant_id = getattr(instance, "_previous_plant_id", None)
+    if previous_plant_id:
+        plant_uuids.append(previous_plant_id)
+
+    _update_current_state(plant_uuids)
+
+    # Keep the in-memory plant in sync, e.g. for serializing it afterwards.
+    if sender.plant.is_cached(instance):
+        instance.plant.refresh_from_db(fields=["current_state"])
+
+
+@receiver(post_delete, sender=PlantStateTransition)
+def update_current_state_on_delete(sender, instance, **kwargs):
+    _update_current_state([instance.plant_id])
+
+
+@receiver(pre_save, sender=Plant)
+@receiver(pre_save, sender=Zone)
+def remember_previous_geometry(sender, instance, raw, **kwargs):
+    """Track the geometry a plant or zone is moved away from, to invalidate its tiles."""
+    if raw or instance._state.adding:
+        return
+
+    geometry_field = "location" if sender is Plant else "area"
+    instance._previous_geometry = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(geometry_field, flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Plant)
+@receiver(post_delete, sender=Plant)
+def invalidate_plant_tiles(sender, instance, **kwargs):
+    invalidate_tiles(instance.location, getattr(instance, "_previous_geometry", None))
+
+
+@receiver(post_save, sender=Zone)
+@receiver(post_delete, sender=Zone)
+def invalidate_zone_tiles(sender, instance, **kwargs):
+    invalidate_tiles(instance.area, getattr(instance, "_previous_geometry", None))
+
+
+@receiver(post_save, sender=PlantStateTransition)
+@receiver(post_delete, sender=PlantStateTransition)
+def invalidate_plant_state_tiles(sender, instance, **kwargs):
+    """Plant states are included in tiles."""
+    invalidate_tiles(
+        *Plant.objects.filter(uuid=instance.plant_id).values_list("location", flat=True)
+    )
@@ -1,3 +1,8 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db import IntegrityError
 from django.test import TestCase
 
@@ -7,6 +12,8 @@ from forest_designs.models import (
     PlantLog,
     PlantLogKind,
     PlantImageKind,
+    PlantState,
+    PlantStateTransition,
 )
 from plant_species.tests.test_models import SpeciesTestMixin
 from forest_designs.models import Zone, ZoneKind
@@ -57,6 +64,79 @@ class PlantTestCase(SpeciesTestMixin, TestCase):
             plant.save()
 
 
+class PlantStateTestCase(SpeciesTestMixin, TestCase):
+    """Test keeping Plant.current_state up to date."""
+
+    def setUp(self):
+        self.planned, _ = PlantState.objects.get_or_create(name="Planned")
+        self.planted, _ = PlantState.objects.get_or_create(name="Planted")
+        self.dead, _ = PlantState.objects.get_or_create(name="Dead")
+
+        self.plant = Plant.objects.create(species=self.species, location="POINT(0 0)")
+
+    def _date(self, day: int) -> datetime.datetime:
+        return datetime.datetime(2024, 1, day, tzinfo=datetime.timezone.utc)
+
+    def _current_state(self, plant: Plant) -> PlantState | None:
+        return Plant.objects.get(pk=plant.pk).current_state
+
+    def test_create(self):
+        self.assertIsNone(self.plant.get_state())
+
+        PlantStateTransition.objects.create(
+            plant=self.plant, state=self.planned, date=self._date(1)
+        )
+        # In-memory instance is updated as well.
+        self.assertEqual(self.plant.get_state(), self.planned)
+
+        PlantStateTransition.objects.create(
+            plant=self.plant, state=self.planted, date=self._date(2)
+        )
+        self.assertEqual(self._current_state(self.plant), self.planted)
+
+        # Back-dated transitions don't change the current state.
+        PlantStateTransition.objects.create(
+            plant=self.plant, state=self.dead, date=self._date(1)
+        )
+        self.assertEqual(self._current_state(self.plant), self.planted)
+
+    def test_edit_and_delete(self):
+        first = PlantStateTransition.objects.create(
+            plant=self.plant, state=self.planned, date=self._date(1)
+        )
+        latest = PlantStateTransition.objects.create(
+            plant=self.plant, state=self.planted, date=self._date(2)
+        )
+
+        first.date = self._date(3)
+        first.save()
+        self.assertEqual(self._current_state(self.plant), self.planned)
+
+        # Moving transitions between plants updates both.
+        other_plant = Plant.objects.create(genus=self.genus, location="POINT(1 1)")
+        first.plant = other_plant
+        first.save()
+        self.assertEqual(self._current_state(self.plant), self.planted)
+        self.assertEqual(self._current_state(other_plant), self.planned)
+
+        latest.delete()
+        self.assertIsNone(self._current_state(self.plant))
+
+    def test_update_plant_states_command(self):
+        PlantStateTransition.objects.create(plant=self.plant, state=self.planned)
+
+        # Simulate an update bypassing signals.
+        Plant.objects.update(current_state=None)
+
+        with self.assertRaises(CommandError):
+            call_command("update_plant_states", check=True, stdout=StringIO())
+
+        call_command("update_plant_states", stdout=StringIO())
+
+        self.assertEqual(self._current_state(self.plant), self.planned)
+        call_command("update_plant_states", check=True, stdout=StringIO())
+
+
 class PlantLogTestCase(SpeciesTestMixin, TestCase):
     def test_save(self):
         """Test the save method of PlantLog model."""
@@ -0,0 +1,66 @@
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+
+from forest_designs.models import Plant, PlantStateTransition
+from forest_designs.tiles import TILE_CACHE_ALIAS, _encode_geometry, _POINT, _POLYGON
+
+from .test_views import ForestDesignsViewTestMixin
+
+
+class TileEncodingTestCase(TestCase):
+    def test_encode_geometry(self):
+        """Test geometry encoding with the examples from the MVT specification."""
+        self.assertEqual(_encode_geometry(_POINT, [[(25, 17)]]), [9, 50, 34])
+        self.assertEqual(
+            _encode_geometry(_POINT, [[(5, 7), (3, 2)]]), [17, 10, 14, 3, 9]
+        )
+        self.assertEqual(
+            _encode_geometry(_POLYGON, [[(3, 6), (8, 12), (20, 34)]]),
+            [9, 6, 12, 18, 10, 12, 24, 44, 15],
+        )
+
+
+class TileViewTestCase(ForestDesignsViewTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        caches[TILE_CACHE_ALIAS].clear()
+
+        self.plant = Plant.objects.create(species=self.species, location="POINT(5 5)")
+
+    def _get_tile(self, z: int, x: int, y: int) -> bytes:
+        response = self.client.get(reverse("tile", kwargs={"z": z, "x": x, "y": y}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/vnd.mapbox-vector-tile")
+
+        return response.content
+
+    def test_tile(self):
+        tile = self._get_tile(0, 0, 0)
+
+        self.assertIn(b"plants", tile)
+        self.assertIn(b"zones", tile)
+        self.assertIn(self.species.slug.encode(), tile)
+
+        # Far away from all features.
+        self.assertEqual(self._get_tile(4, 0, 0), b"")
+
+    def test_tile_out_of_range(self):
+        response = self.client.get(reverse("tile", kwargs={"z": 1, "x": 2, "y": 0}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_tile_invalidation(self):
+        self.assertIn(b"plants", self._get_tile(10, 526, 497))
+
+        # State changes are reflected.
+        PlantStateTransition.objects.create(plant=self.plant, state=self.state2)
+        self.assertIn(b"Planted", self._get_tile(10, 526, 497))
+
+        # Moving plants updates the tiles they moved from.
+        self.plant.location = "POINT(-5 -5)"
+        self.plant.save()
+        self.assertNotIn(b"plants", self._get_tile(10, 526, 497))
+        self.assertIn(b"plants", self._get_tile(10, 497, 526))
+
+        self.plant.delete()
+        self.assertNotIn(b"plants", self._get_tile(10, 497, 526))
@@ -1,14 +1,21 @@
 import json
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from forest_designs.models import (
     Plant,
+    PlantImage,
+    PlantImageKind,
+    PlantLog,
+    PlantLogKind,
     PlantState,
     PlantStateTransition,
     Zone,
     ZoneKind,
 )
+from plant_species.models import GenusCommonName, SpeciesCommonName
 from plant_species.tests.test_models import SpeciesTestMixin
 
 
@@ -140,6 +147,7 @@ class PlantViewTestCase(ForestDesignsViewTestMixin, TestCase):
             url, data=json.dumps(data), content_type="application/json"
         )
         self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["state"]["name"], "Planted")
 
         # Check that a new transition was created
         self.assertEqual(
@@ -186,6 +194,99 @@ class PlantViewTestCase(ForestDesignsViewTestMixin, TestCase):
         transition = PlantStateTransition.objects.filter(plant=plant).first()
         self.assertEqual(transition.state, self.state2)
 
+    def test_plant_list_pagination(self):
+        """Test walking all plants through cursor pagination."""
+        for offset in range(4):
+            self._create_plants(offset)
+
+        ids = []
+        url = reverse("plant-list")
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+            data = json.loads(response.content)
+            ids += [result["id"] for result in data["results"]]
+            url = data["next"]
+
+        self.assertEqual(
+            ids, list(Plant.objects.order_by("id").values_list("id", flat=True))
+        )
+
+    def test_plant_geojson_stream(self):
+        """Test streaming all plants as a single FeatureCollection."""
+        for offset in range(4):
+            self._create_plants(offset)
+
+        response = self.client.get(
+            reverse("plant-list"), {"format": "geojson", "stream": "1"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/geo+json")
+
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(data["type"], "FeatureCollection")
+        self.assertEqual(len(data["features"]), Plant.objects.count())
+        self.assertEqual(data["features"][0]["type"], "Feature")
+
+        # Filters apply to streams as well.
+        response = self.client.get(
+            reverse("plant-list"),
+            {"format": "geojson", "stream": "1", "in_bbox": "-0.5,19,0.5,23"},
+        )
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(data["features"]), 3)
+
+    def _create_plants(self, offset: int):
+        """Create a plant with species, variety and only genus, with related objects."""
+        image_kind, _ = PlantImageKind.objects.get_or_create(name="Overview")
+        log_kind, _ = PlantLogKind.objects.get_or_create(name="Pruning")
+
+        plants = [
+            Plant.objects.create(species=self.species, location=f"POINT({offset} 20)"),
+            Plant.objects.create(variety=self.variety, location=f"POINT({offset} 21)"),
+            Plant.objects.create(genus=self.genus, location=f"POINT({offset} 22)"),
+        ]
+
+        for plant in plants:
+            PlantStateTransition.objects.create(plant=plant, state=self.state1)
+            PlantStateTransition.objects.create(plant=plant, state=self.state2)
+            PlantImage.objects.create(plant=plant, kind=image_kind, image="plant.jpg")
+            PlantLog.objects.create(plant=plant, kind=log_kind, notes="Pruned")
+
+    def test_plant_list_query_count(self):
+        """Test that the number of queries doesn't grow with the number of plants."""
+        SpeciesCommonName.objects.create(
+            species=self.species, language="en", name="Sweet briar"
+        )
+        GenusCommonName.objects.create(genus=self.genus, language="en", name="Rose")
+
+        def list_plants():
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(reverse("plant-list"))
+
+            self.assertEqual(response.status_code, 200)
+            return json.loads(response.content)["results"], len(context)
+
+        self._create_plants(0)
+        results, query_count = list_plants()
+        self.assertEqual(len(results), 4)
+
+        self._create_plants(1)
+        self._create_plants(2)
+        results, more_query_count = list_plants()
+        self.assertEqual(len(results), 10)
+
+        self.assertEqual(more_query_count, query_count)
+
+        # Prefetched data is used.
+        names = {result["name"] for result in results}
+        self.assertIn(str(self.species), names)
+        self.assertIn(str(self.variety), names)
+        self.assertIn(str(self.genus), names)
+        states = [result["state"]["name"] for result in results]
+        self.assertEqual(states.count("Planted"), 9)
+
 
 class ZoneViewTestCase(ForestDesignsViewTestMixin, TestCase):
     """Test the Zone API views."""
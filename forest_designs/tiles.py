@@ -0,0 +1,400 @@
+"""
+Mapbox Vector Tiles (MVT 2.1) of plants and zones.
+
+Tiles are addressed by XYZ (slippy map) coordinates in Web Mercator. Encoding follows
+https://github.com/mapbox/vector-tile-spec/tree/master/2.1, written out here as the
+protobuf schema is small and SpatiaLite lacks ST_AsMVT.
+"""
+
+import math
+import struct
+import time
+import typing
+
+from django.contrib.gis.geos import GEOSGeometry, Polygon
+from django.core.cache import BaseCache, caches
+from django.utils.translation import get_language
+
+from plant_species.models import Genus, Species
+
+from .models import Plant, Zone
+
+# Tile coordinate resolution.
+EXTENT = 4096
+# Extent units around tiles included, so features crossing tile edges render properly.
+BUFFER = 64
+
+MAX_ZOOM = 22
+
+# Versions are kept per tile up to this zoom, deeper tiles share their ancestor's.
+INVALIDATION_ZOOM = 12
+# Beyond this many tiles, invalidate all tiles at once.
+MAX_INVALIDATED_TILES = 256
+
+# Shared by processes when file based, so invalidating tiles reaches all of them.
+TILE_CACHE_ALIAS = "tiles"
+TILE_CACHE_TIMEOUT = 60 * 60 * 24
+
+WEB_MERCATOR = 3857
+# Half the circumference of the earth in Web Mercator.
+_ORIGIN = 20037508.342789244
+
+_POINT = 1
+_POLYGON = 3
+
+_MOVE_TO = 1
+_LINE_TO = 2
+_CLOSE_PATH = 7
+
+Coordinates = typing.List[typing.Tuple[int, int]]
+
+
+def _varint(value: int) -> bytes:
+    encoded = bytearray()
+    while value > 0x7F:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
+
+    return bytes(encoded)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _field_bytes(field: int, data: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(data)) + data
+
+
+def _field_packed(field: int, values: typing.Iterable[int]) -> bytes:
+    return _field_bytes(field, b"".join(map(_varint, values)))
+
+
+def _encode_value(value: typing.Any) -> bytes:
+    if isinstance(value, str):
+        return _field_bytes(1, value.encode())
+    if isinstance(value, bool):
+        return _field_varint(7, int(value))
+    if isinstance(value, int):
+        if value < 0:
+            return _field_varint(6, _zigzag(value))
+        return _field_varint(5, value)
+    if isinstance(value, float):
+        return _varint((3 << 3) | 1) + struct.pack("<d", value)
+
+    raise TypeError(f"Unsupported attribute value: {value!r}")
+
+
+def _command(command: int, count: int) -> int:
+    return (command & 0x7) | (count << 3)
+
+
+def _encode_geometry(
+    geom_type: int, parts: typing.List[Coordinates]
+) -> typing.List[int]:
+    """
+    Encode points (a single part) or polygon rings as geometry commands.
+
+    Rings are expected to be oriented and not to repeat their first point.
+    """
+
+    commands = []
+    cursor_x, cursor_y = 0, 0
+
+    def _parameters(points: Coordinates):
+        nonlocal cursor_x, cursor_y
+
+        for x, y in points:
+            commands.extend((_zigzag(x - cursor_x), _zigzag(y - cursor_y)))
+            cursor_x, cursor_y = x, y
+
+    if geom_type == _POINT:
+        (points,) = parts
+        commands.append(_command(_MOVE_TO, len(points)))
+        _parameters(points)
+        return commands
+
+    for ring in parts:
+        commands.append(_command(_MOVE_TO, 1))
+        _parameters(ring[:1])
+        commands.append(_command(_LINE_TO, len(ring) - 1))
+        _parameters(ring[1:])
+        commands.append(_command(_CLOSE_PATH, 1))
+
+    return commands
+
+
+class _Layer:
+    def __init__(self, name: str):
+        self.name = name
+        self.keys: typing.Dict[str, int] = {}
+        self.values: typing.Dict[typing.Tuple[type, typing.Any], int] = {}
+        self.features: typing.List[bytes] = []
+
+    def add_feature(
+        self,
+        feature_id: int,
+        geom_type: int,
+        geometry: typing.List[int],
+        properties: typing.Dict[str, typing.Any],
+    ):
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+
+            tags.append(self.keys.setdefault(key, len(self.keys)))
+            # Distinguish True from 1.
+            tags.append(self.values.setdefault((type(value), value), len(self.values)))
+
+        self.features.append(
+            _field_varint(1, feature_id)
+            + _field_packed(2, tags)
+            + _field_varint(3, geom_type)
+            + _field_packed(4, geometry)
+        )
+
+    def encode(self) -> bytes:
+        return b"".join(
+            [
+                _field_varint(15, 2),
+                _field_bytes(1, self.name.encode()),
+                *(_field_bytes(2, feature) for feature in self.features),
+                *(_field_bytes(3, key.encode()) for key in self.keys),
+                *(_field_bytes(4, _encode_value(value)) for _, value in self.values),
+                _field_varint(5, EXTENT),
+            ]
+        )
+
+
+def _tile_size(z: int) -> float:
+    return 2 * _ORIGIN / 2**z
+
+
+def tile_bounds(z: int, x: int, y: int) -> typing.Tuple[float, float, float, float]:
+    """Web Mercator bounds (xmin, ymin, xmax, ymax) of a tile."""
+    size = _tile_size(z)
+    xmin = -_ORIGIN + x * size
+    ymax = _ORIGIN - y * size
+
+    return (xmin, ymax - size, xmin + size, ymax)
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z
+
+
+class _TileTransform:
+    """Quantizes Web Mercator coordinates into tile coordinates, with y pointing down."""
+
+    def __init__(self, z: int, x: int, y: int):
+        self.xmin, _, _, self.ymax = tile_bounds(z, x, y)
+        self.scale = EXTENT / _tile_size(z)
+
+    def __call__(self, coords: typing.Iterable[typing.Sequence[float]]) -> Coordinates:
+        points: Coordinates = []
+        for coord in coords:
+            point = (
+                round((coord[0] - self.xmin) * self.scale),
+                round((self.ymax - coord[1]) * self.scale),
+            )
+            # Quantizing collapses nearby points.
+            if not points or points[-1] != point:
+                points.append(point)
+
+        return points
+
+
+def _ring_area(ring: Coordinates) -> int:
+    """Twice the signed area, positive for clockwise rings in tile coordinates."""
+    return sum(
+        x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1])
+    )
+
+
+def _polygon_rings(
+    geometry: GEOSGeometry, transform: _TileTransform
+) -> typing.List[Coordinates]:
+    """Oriented rings of all polygons in geometry, dropping those collapsed by quantizing."""
+
+    if geometry.geom_type == "Polygon":
+        polygons = [geometry]
+    else:
+        polygons = [part for part in geometry if part.geom_type == "Polygon"]
+
+    rings = []
+    for polygon in polygons:
+        for index, linear_ring in enumerate(polygon):
+            ring = transform(linear_ring.coords)
+            # Closing point is implied.
+            if len(ring) > 1 and ring[0] == ring[-1]:
+                ring.pop()
+
+            area = _ring_area(ring) if len(ring) >= 3 else 0
+            if not area:
+                if index == 0:
+                    # Skip holes of collapsed polygons.
+                    break
+                continue
+
+            # Exterior rings have positive area, interior rings negative.
+            if (area > 0) != (index == 0):
+                ring.reverse()
+
+            rings.append(ring)
+
+    return rings
+
+
+def _plants(clip: Polygon):
+    return (
+        Plant.objects.filter(location__intersects=clip)
+        .select_related("species", "variety__species", "genus", "current_state")
+        .prefetch_related(
+            Genus.prefetch_common_names("genus__common_names"),
+            Species.prefetch_common_names("species__common_names"),
+            Species.prefetch_common_names("variety__species__common_names"),
+        )
+    )
+
+
+def render_tile(z: int, x: int, y: int) -> bytes:
+    """Encode plants and zones within a tile."""
+
+    xmin, ymin, xmax, ymax = tile_bounds(z, x, y)
+    buffer = _tile_size(z) * BUFFER / EXTENT
+    clip = Polygon.from_bbox(
+        (xmin - buffer, ymin - buffer, xmax + buffer, ymax + buffer)
+    )
+    clip.srid = WEB_MERCATOR
+
+    transform = _TileTransform(z, x, y)
+    # Drop detail smaller than a tile unit.
+    tolerance = _tile_size(z) / EXTENT
+
+    zones = _Layer("zones")
+    for zone in Zone.objects.filter(area__intersects=clip).select_related("kind"):
+        area = zone.area.transform(WEB_MERCATOR, clone=True)
+        area = area.intersection(clip).simplify(tolerance, preserve_topology=True)
+
+        rings = _polygon_rings(area, transform)
+        if rings:
+            zones.add_feature(
+                zone.id,
+                _POLYGON,
+                _encode_geometry(_POLYGON, rings),
+                {"id": zone.id, "name": zone.name, "kind": zone.kind.name},
+            )
+
+    plants = _Layer("plants")
+    for plant in _plants(clip):
+        location = plant.location.transform(WEB_MERCATOR, clone=True)
+        plants.add_feature(
+            plant.id,
+            _POINT,
+            _encode_geometry(_POINT, [transform([location.coords])]),
+            {
+                "id": plant.id,
+                "name": plant.get_name(),
+                "state": plant.current_state.name if plant.current_state else None,
+                "species": plant.species.slug if plant.species else None,
+            },
+        )
+
+    return b"".join(
+        _field_bytes(3, layer.encode()) for layer in (zones, plants) if layer.features
+    )
+
+
+_GLOBAL_VERSION_KEY = "forest_designs:tiles:version"
+
+
+def _get_cache() -> BaseCache:
+    return caches[TILE_CACHE_ALIAS]
+
+
+def _version_key(z: int, x: int, y: int) -> str:
+    return f"{_GLOBAL_VERSION_KEY}:{z}:{x}:{y}"
+
+
+def _tile_cache_key(z: int, x: int, y: int) -> str:
+    # Deeper tiles are invalidated with their ancestor at INVALIDATION_ZOOM.
+    shift = max(z - INVALIDATION_ZOOM, 0)
+    version_key = _version_key(z - shift, x >> shift, y >> shift)
+
+    keys = [_GLOBAL_VERSION_KEY, version_key]
+    cache = _get_cache()
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # New versions rather than 0, so tiles cached before a version was evicted
+        # aren't served again.
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+
+        versions.update(cache.get_many(missing))
+
+    return ":".join(
+        map(
+            str,
+            [
+                "forest_designs:tiles",
+                z,
+                x,
+                y,
+                get_language(),
+                versions.get(_GLOBAL_VERSION_KEY, 0),
+                versions.get(version_key, 0),
+            ],
+        )
+    )
+
+
+def get_tile(z: int, x: int, y: int) -> bytes:
+    """Return encoded tile, from cache when available."""
+
+    key = _tile_cache_key(z, x, y)
+    cache = _get_cache()
+
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_tile(z, x, y)
+        cache.set(key, tile, TILE_CACHE_TIMEOUT)
+
+    return tile
+
+
+def invalidate_tiles(*geometries: GEOSGeometry | None):
+    """Invalidate cached tiles covering any of the geometries."""
+
+    version_keys = set()
+    for geometry in filter(None, geometries):
+        xmin, ymin, xmax, ymax = geometry.transform(WEB_MERCATOR, clone=True).extent
+
+        for z in range(INVALIDATION_ZOOM + 1):
+            size = _tile_size(z)
+            # Features show up in the buffer of neighbouring tiles as well.
+            buffer = size * BUFFER / EXTENT
+
+            def _tile_range(start: float, end: float) -> range:
+                first = max(math.floor((start - buffer) / size), 0)
+                last = min(math.floor((end + buffer) / size), 2**z - 1)
+                return range(first, last + 1)
+
+            for x in _tile_range(xmin + _ORIGIN, xmax + _ORIGIN):
+                for y in _tile_range(_ORIGIN - ymax, _ORIGIN - ymin):
+                    version_keys.add(_version_key(z, x, y))
+
+    if len(version_keys) > MAX_INVALIDATED_TILES:
+        version_keys = {_GLOBAL_VERSION_KEY}
+
+    # Unique versions, so evicted versions are never reused.
+    version = time.time_ns()
+    _get_cache().set_many({key: version for key in version_keys}, timeout=None)
@@ -23,4 +23,5 @@ router.register(r'zones-kinds', views.ZoneKindViewSet, basename='zonekind')
 # Format suffixes for content negotiation
 urlpatterns = [
     path('', include(router.urls)),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', views.TileView.as_view(), name='tile'),
 ]
\ No newline at end of file
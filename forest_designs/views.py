@@ -1,4 +1,11 @@
+from django.db.models import Prefetch
+from django.http import Http404, StreamingHttpResponse
 from rest_framework import viewsets
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework_gis.filters import InBBoxFilter, TMSTileFilter
 from .models import (
@@ -12,6 +19,8 @@ from .models import (
     PlantLog,
     PlantLogKind,
 )
+from plant_species.models import Genus, Species
+from .tiles import get_tile, is_valid_tile
 from .serializers import (
     PlantSerializer,
     PlantGeoSerializer,
@@ -27,25 +36,82 @@ from .serializers import (
 )
 
 
+class GeoJSONRenderer(JSONRenderer):
+    media_type = "application/geo+json"
+    format = "geojson"
+
+
 class GeoJSONNegotiationMixin:
     """Mixin that adds content negotiation for GeoJSON format"""
 
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [GeoJSONRenderer]
+
+    # Number of features fetched and written at once when streaming.
+    stream_chunk_size = 500
+
     def get_serializer_class(self):
         if self.request and self.request.query_params.get("format") == "geojson":
             return self.geojson_serializer_class
         return super().get_serializer_class()
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("format") == "geojson" and request.query_params.get(
+            "stream"
+        ):
+            return self.stream_feature_collection()
+
+        return super().list(request, *args, **kwargs)
+
+    def stream_feature_collection(self) -> StreamingHttpResponse:
+        """
+        Unpaginated FeatureCollection of all (filtered) objects, written incrementally.
+
+        Objects are read in chunks from a server-side cursor, so memory use doesn't
+        grow with the number of features.
+        """
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        encoder = JSONEncoder()
+
+        def _features():
+            yield '{"type": "FeatureCollection", "features": ['
+
+            separator = ""
+            chunk = []
+            for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+                chunk.append(
+                    separator
+                    + encoder.encode(serializer_class(obj, context=context).data)
+                )
+                separator = ","
+
+                if len(chunk) == self.stream_chunk_size:
+                    yield "".join(chunk)
+                    chunk = []
+
+            yield "".join(chunk) + "]}"
+
+        return StreamingHttpResponse(
+            _features(), content_type=GeoJSONRenderer.media_type
+        )
+
 
 class PlantViewSet(GeoJSONNegotiationMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows plants to be viewed or edited.
 
     Supports both standard JSON and GeoJSON formats.
-    Get GeoJSON with ?format=geojson
+    Get GeoJSON with ?format=geojson, stream all as one FeatureCollection by adding
+    &stream=1
 
     Spatial filtering:
     - ?in_bbox=min_lon,min_lat,max_lon,max_lat (SW lon, SW lat, NE lon, NE lat)
     - ?tile=zoom,x,y (TMS tile coordinates)
+
+    State filtering:
+    - ?current_state__name=Planted
     """
 
     queryset = Plant.objects.all()
@@ -60,6 +126,24 @@ class PlantViewSet(GeoJSONNegotiationMixin, viewsets.ModelViewSet):
     )
     tile_filter_field = "location"
     filter_backends = (DjangoFilterBackend, InBBoxFilter, TMSTileFilter)
+    filterset_fields = {"current_state__name": ["exact", "in"]}
+
+    def get_queryset(self):
+        # Load everything serialized in a constant number of queries, rather than
+        # several per plant.
+        return (
+            super()
+            .get_queryset()
+            .select_related("genus", "species", "variety__species", "current_state")
+            .prefetch_related(
+                Prefetch("images", queryset=PlantImage.objects.select_related("kind")),
+                Prefetch("logs", queryset=PlantLog.objects.select_related("kind")),
+                # Common names in the active language, as used by get_name().
+                Genus.prefetch_common_names("genus__common_names"),
+                Species.prefetch_common_names("species__common_names"),
+                Species.prefetch_common_names("variety__species__common_names"),
+            )
+        )
 
 
 class ZoneViewSet(GeoJSONNegotiationMixin, viewsets.ModelViewSet):
@@ -67,7 +151,8 @@ class ZoneViewSet(GeoJSONNegotiationMixin, viewsets.ModelViewSet):
     API endpoint that allows zones to be viewed or edited.
 
     Supports both standard JSON and GeoJSON formats.
-    Get GeoJSON with ?format=geojson
+    Get GeoJSON with ?format=geojson, stream all as one FeatureCollection by adding
+    &stream=1
 
     Spatial filtering:
     - ?in_bbox=min_lon,min_lat,max_lon,max_lat (SW lon, SW lat, NE lon, NE lat)
@@ -156,3 +241,41 @@ class PlantLogKindViewSet(viewsets.ModelViewSet):
     queryset = PlantLogKind.objects.all()
     serializer_class = PlantLogKindSerializer
     lookup_field = "id"
+
+
+class MVTRenderer(BaseRenderer):
+    """Passes through encoded Mapbox Vector Tiles."""
+
+    media_type = "application/vnd.mapbox-vector-tile"
+    format = "mvt"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class TileView(APIView):
+    """
+    Mapbox Vector Tiles of plants and zones, for QGIS and web maps.
+
+    Tiles are addressed as /tiles/{z}/{x}/{y}.mvt (XYZ scheme) and contain the layers
+    `zones` (id, name, kind) and `plants` (id, name, state, species).
+    """
+
+    # Required for model permissions.
+    queryset = Plant.objects.none()
+    renderer_classes = [MVTRenderer]
+
+    def get(self, request, z: int, x: int, y: int):
+        if not is_valid_tile(z, x, y):
+            raise Http404("Tile out of range.")
+
+        return Response(get_tile(z, x, y))
+
+    def handle_exception(self, exc):
+        # Report errors as JSON, rather than as a tile.
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+
+        return super().handle_exception(exc)
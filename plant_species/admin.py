@@ -1,9 +1,14 @@
-from django.utils.html import format_html
+from django import forms
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from django.contrib import admin
+from django.contrib.contenttypes.models import ContentType
 
+from .jobs import ADMIN_PRIORITY
 from .models import (
+    EnrichmentJob,
     Family,
     Genus,
     Species,
@@ -35,14 +40,27 @@ class VarietyInline(admin.TabularInline):
     extra = 1
 
 
+class SpeciesAdminForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Validate the name quickly, leave the rest to run_enrichment_jobs.
+        self.instance.defer_enrichment = True
+
+
 class SpeciesAdminBase(admin.ModelAdmin):
+    form = SpeciesAdminForm
     readonly_fields = (
         "get_image_html",
         "wikipedia_link",
+        "wikidata_link",
         "gbif_link",
+        "get_enrichment_status",
     )
     list_per_page = 5
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_common_names()
+
     def get_fields(self, request, obj=None):
         fields = super().get_fields(request, obj)
         if obj:
@@ -59,11 +77,48 @@ class SpeciesAdminBase(admin.ModelAdmin):
         extra_context.update({"show_save": False, "show_save_and_add_another": False})
         return super().add_view(request, form_url, extra_context)  # type: ignore
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+
+        # Enriched once when added, edits shouldn't fetch everything again.
+        if not change:
+            obj.enqueue_enrichment(priority=ADMIN_PRIORITY)
+
+    @admin.display(description=_("Enrichment"))
+    def get_enrichment_status(self, obj):
+        jobs = EnrichmentJob.objects.filter(
+            content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+        ).order_by("stage", "-created")
+
+        # Latest job by stage.
+        latest = {}
+        for job in jobs:
+            latest.setdefault(job.stage, job)
+
+        if not latest:
+            return _("No jobs.")
+
+        return format_html_join(
+            format_html("<br>"),
+            "{}: {} {}",
+            (
+                (
+                    job.get_stage_display(),
+                    job.get_status_display(),
+                    f"({job.attempts}/{job.max_attempts}: {job.last_error})"
+                    if job.last_error and job.status != EnrichmentJob.Status.SUCCEEDED
+                    else "",
+                )
+                for job in latest.values()
+            ),
+        )
+
 
 @admin.register(SpeciesVariety)
 class SpeciesVarietyAdmin(admin.ModelAdmin):
     list_display = ("name", "species")
     list_display_filter = ("species__family",)
+    list_select_related = ("species",)
     autocomplete_fields = ("species",)
     search_fields = (
         "name",
@@ -73,6 +128,13 @@ class SpeciesVarietyAdmin(admin.ModelAdmin):
         "species__genus__common_names__name",
     )
 
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(Species.prefetch_common_names("species__common_names"))
+        )
+
 
 @admin.register(Family)
 class FamilyAdmin(SpeciesAdminBase):
@@ -84,11 +146,19 @@ class FamilyAdmin(SpeciesAdminBase):
 @admin.register(Genus)
 class GenusAdmin(SpeciesAdminBase):
     list_display = ("latin_name", "family", "get_common_name", "gbif_link")
+    list_select_related = ("family",)
     list_filter = ("family",)
     search_fields = ["latin_name", "common_names__name", "family__latin_name"]
     inlines = [GenusCommonNameInline]
     autocomplete_fields = ("family",)
 
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(Family.prefetch_common_names("family__common_names"))
+        )
+
 
 @admin.register(Species)
 class SpeciesAdmin(SpeciesAdminBase):
@@ -100,7 +170,7 @@ class SpeciesAdmin(SpeciesAdminBase):
         "gbif_link",
     )
     list_display_links = ("get_thumbnail_html", "latin_name", "get_common_name")
-    list_select_related = ("genus",)
+    list_select_related = ("genus__family",)
     list_filter = ("genus__family",)
     search_fields = [
         "latin_name",
@@ -113,10 +183,6 @@ class SpeciesAdmin(SpeciesAdminBase):
     autocomplete_fields = ("genus",)
     inlines = [SpeciesCommonNameInline, VarietyInline]
 
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-        obj.enrich_related()
-
     def genus_family_link(self, obj):
         genus_url = reverse("admin:plant_species_genus_change", args=[obj.genus.pk])
         family_url = reverse(
@@ -131,3 +197,27 @@ class SpeciesAdmin(SpeciesAdminBase):
         )
 
     genus_family_link.short_description = _("Genus / Family")
+
+
+@admin.register(EnrichmentJob)
+class EnrichmentJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "__str__",
+        "stage",
+        "status",
+        "priority",
+        "attempts",
+        "run_after",
+        "finished",
+    )
+    list_filter = ("status", "stage", "content_type")
+    list_select_related = ("content_type",)
+    readonly_fields = ("content_type", "object_id", "last_error", "started", "finished")
+    actions = ["retry"]
+
+    @admin.action(description=_("Retry selected jobs"))
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=EnrichmentJob.Status.RUNNING).update(
+            status=EnrichmentJob.Status.QUEUED, attempts=0, run_after=timezone.now()
+        )
+        self.message_user(request, _("Queued %d jobs.") % count)
@@ -6,3 +6,6 @@ class PlantSpeciesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "plant_species"
     verbose_name = _("Plant Species")
+
+    def ready(self):
+        from . import signals  # noqa: F401
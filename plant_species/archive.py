@@ -0,0 +1,263 @@
+"""
+Incremental archives of species data and images, for distribution.
+
+An archive is a directory of fixture partitions and media files, with a manifest
+listing them. Fixtures are dumped per model, in dependency order, partitioned by
+primary key range, and compressed with bz2. Files are named by the hash of their
+content, so rebuilding only compresses changed partitions and copies changed media
+files, in parallel. Consumers can compare manifests to fetch only new files.
+
+Archives are loaded with `./manage.py load_species_fixture --archive <directory>`.
+"""
+
+import bz2
+import datetime
+import hashlib
+import json
+import os
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from django.apps import apps
+from django.core import serializers
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models
+from django.db.models import Max, Min
+
+FORMAT_VERSION = 1
+
+MANIFEST_NAME = "manifest.json"
+FIXTURES_DIR = "fixtures"
+MEDIA_DIR = "media"
+
+APP_LABELS = ["plant_species", "species_data"]
+EXCLUDED_MODELS = [
+    # Derived from other models, see rebuild_search_index.
+    "plant_species.SpeciesSearchTerm",
+    # Local mirror of the GBIF backbone, see load_gbif_backbone.
+    "plant_species.BackboneTaxon",
+    "plant_species.BackboneVernacularName",
+]
+# Media files are archived from this directory in storage.
+MEDIA_ROOT = "plant_species"
+
+# Objects per partition, by primary key, so new objects only change the last one.
+PARTITION_SIZE = 5000
+
+
+@dataclass
+class ArchiveStats:
+    fixtures_compressed: int = 0
+    fixtures_reused: int = 0
+    media_copied: int = 0
+    media_reused: int = 0
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_models(app_labels: typing.List[str]) -> typing.List[typing.Type[models.Model]]:
+    """Models of apps, such that models come after those they refer to."""
+
+    app_list = [(apps.get_app_config(label), None) for label in app_labels]
+
+    return [
+        model
+        for model in serializers.sort_dependencies(app_list, allow_cycles=True)
+        if not model._meta.proxy and model._meta.label not in EXCLUDED_MODELS
+    ]
+
+
+def _iter_partitions(
+    model: typing.Type[models.Model], size: int
+) -> typing.Iterator[str]:
+    """Serialized partitions of objects, with natural keys, like `dumpdata`."""
+
+    queryset = model._base_manager.order_by("pk")
+    if hasattr(model, "natural_key"):
+        # Natural keys commonly span relations.
+        queryset = queryset.select_related()
+    queryset = queryset.prefetch_related(
+        *(
+            field.name
+            for field in model._meta.many_to_many
+            if field.remote_field.through._meta.auto_created
+        )
+    )
+
+    bounds = queryset.aggregate(first=Min("pk"), last=Max("pk"))
+    if bounds["first"] is None:
+        return
+
+    for start in range(bounds["first"] // size * size, bounds["last"] + 1, size):
+        objects = list(queryset.filter(pk__gte=start, pk__lt=start + size))
+        if objects:
+            yield serializers.serialize(
+                "json",
+                objects,
+                use_natural_foreign_keys=True,
+                use_natural_primary_keys=True,
+            )
+
+
+def _compress(path: Path, data: bytes) -> int:
+    compressed = bz2.compress(data)
+    path.write_bytes(compressed)
+
+    return len(compressed)
+
+
+def _iter_media(directory: str) -> typing.Iterator[str]:
+    """Names of files in storage directory, recursively."""
+
+    try:
+        subdirectories, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+
+    for filename in files:
+        yield f"{directory}/{filename}"
+    for subdirectory in subdirectories:
+        yield from _iter_media(f"{directory}/{subdirectory}")
+
+
+def _copy_media(name: str, output: Path) -> typing.Tuple[str, str, bool]:
+    """Copy media file to the archive, unless it's there, returning its hash and file."""
+
+    with default_storage.open(name) as f:
+        data = f.read()
+
+    sha256 = _sha256(data)
+    file = f"{MEDIA_DIR}/{sha256}{PurePosixPath(name).suffix.lower()}"
+
+    copied = not (output / file).exists()
+    if copied:
+        # Images are compressed already.
+        (output / file).write_bytes(data)
+
+    return sha256, file, copied
+
+
+def read_manifest(directory: Path) -> typing.Optional[dict]:
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        return None
+
+    return json.loads(path.read_text())
+
+
+def _delete_unused(directory: Path, used: typing.Set[str]):
+    for path in directory.iterdir():
+        if f"{directory.name}/{path.name}" not in used:
+            path.unlink()
+
+
+def build_archive(
+    output: Path,
+    app_labels: typing.List[str] = APP_LABELS,
+    partition_size: int = PARTITION_SIZE,
+    workers: typing.Optional[int] = None,
+) -> ArchiveStats:
+    """Build or update the archive in output, returning what changed."""
+
+    (output / FIXTURES_DIR).mkdir(parents=True, exist_ok=True)
+    (output / MEDIA_DIR).mkdir(exist_ok=True)
+
+    previous = read_manifest(output) or {}
+    # Media files which didn't change needn't be read again.
+    previous_media = {
+        (entry["path"], entry["size"], entry["modified"]): entry
+        for entry in previous.get("media", [])
+    }
+
+    stats = ArchiveStats()
+    fixtures: typing.List[dict] = []
+    media: typing.List[dict] = []
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        # Serialize in this thread, which holds the database connection.
+        compressing: typing.List[typing.Tuple[dict, Future]] = []
+        for model in get_models(app_labels):
+            for partition in _iter_partitions(model, partition_size):
+                data = partition.encode()
+                sha256 = _sha256(data)
+                entry = {
+                    "model": model._meta.label,
+                    "file": f"{FIXTURES_DIR}/{sha256}.json.bz2",
+                    "sha256": sha256,
+                }
+                fixtures.append(entry)
+
+                path = output / entry["file"]
+                if path.exists():
+                    entry["size"] = path.stat().st_size
+                    stats.fixtures_reused += 1
+                else:
+                    compressing.append((entry, executor.submit(_compress, path, data)))
+                    stats.fixtures_compressed += 1
+
+        copying: typing.List[typing.Tuple[dict, Future]] = []
+        for name in _iter_media(MEDIA_ROOT):
+            entry = {
+                "path": name,
+                "size": default_storage.size(name),
+                "modified": default_storage.get_modified_time(name).isoformat(),
+            }
+            media.append(entry)
+
+            known = previous_media.get((name, entry["size"], entry["modified"]))
+            if known and (output / known["file"]).exists():
+                entry.update(sha256=known["sha256"], file=known["file"])
+                stats.media_reused += 1
+            else:
+                copying.append((entry, executor.submit(_copy_media, name, output)))
+
+        for entry, future in compressing:
+            entry["size"] = future.result()
+
+        for entry, future in copying:
+            entry["sha256"], entry["file"], copied = future.result()
+            if copied:
+                stats.media_copied += 1
+            else:
+                stats.media_reused += 1
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "fixtures": fixtures,
+        "media": media,
+    }
+    # Replace atomically, so consumers never read a partial manifest.
+    temporary = output / f"{MANIFEST_NAME}.tmp"
+    temporary.write_text(json.dumps(manifest, indent=2))
+    temporary.replace(output / MANIFEST_NAME)
+
+    _delete_unused(output / FIXTURES_DIR, {entry["file"] for entry in fixtures})
+    _delete_unused(output / MEDIA_DIR, {entry["file"] for entry in media})
+
+    return stats
+
+
+def restore_media(directory: Path, manifest: dict) -> int:
+    """Save media files of an archive to storage, unless present, returning how many."""
+
+    restored = 0
+    for entry in manifest["media"]:
+        name = entry["path"]
+        if default_storage.exists(name):
+            if default_storage.size(name) == entry["size"]:
+                continue
+
+            default_storage.delete(name)
+
+        default_storage.save(
+            name, ContentFile((directory / entry["file"]).read_bytes())
+        )
+        restored += 1
+
+    return restored
@@ -0,0 +1,289 @@
+"""
+Local mirror of the plants in the GBIF Backbone Taxonomy, resolving names without the API.
+
+Taxa and vernacular names are streamed from the `Taxon.tsv` and `VernacularName.tsv`
+of the backbone's Darwin Core Archive into indexed tables. Lookups answer with the
+same fields as the `species/match` and `species/{key}/vernacularNames` endpoints,
+so they can replace the pygbif calls, see GBIF_BACKEND.
+"""
+
+import csv
+import difflib
+import functools
+import typing
+
+import pycountry
+from django.db import transaction
+
+from .enrichment.gbif import _normalize_name
+from .models import BackboneTaxon, BackboneVernacularName
+
+KINGDOM = "Plantae"
+
+BATCH_SIZE = 5000
+
+# Misspelled names are only matched with names starting with the same letters.
+FUZZY_PREFIX_LENGTH = 3
+# Minimum similarity ratio of misspelled names.
+FUZZY_CUTOFF = 0.8
+
+# Preferred taxa among those with the same name.
+STATUS_ORDER = [
+    "ACCEPTED",
+    "DOUBTFUL",
+    "HOMOTYPIC_SYNONYM",
+    "HETEROTYPIC_SYNONYM",
+    "PROPARTE_SYNONYM",
+    "SYNONYM",
+    "MISAPPLIED",
+]
+
+# Sorts after any name, to turn prefixes into ranges.
+_MAX_CHAR = "\uffff"
+
+Row = typing.Dict[str, str]
+
+
+def read_tsv(file: typing.TextIO) -> typing.Iterator[Row]:
+    """Rows of a Darwin Core Archive data file by column, unquoted as in the backbone."""
+
+    for row in csv.DictReader(file, delimiter="\t", quoting=csv.QUOTE_NONE):
+        # Older dumps mark missing values as in MySQL exports.
+        yield {column: "" if value == r"\N" else value for column, value in row.items()}
+
+
+def _batches(objs: typing.Iterable, size: int) -> typing.Iterator[typing.List]:
+    batch = []
+    for obj in objs:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def _taxa(rows: typing.Iterable[Row]) -> typing.Iterator[BackboneTaxon]:
+    for row in rows:
+        if row["kingdom"] != KINGDOM or not row["canonicalName"]:
+            continue
+
+        yield BackboneTaxon(
+            id=int(row["taxonID"]),
+            canonical_name=row["canonicalName"],
+            scientific_name=row["scientificName"],
+            rank=row["taxonRank"].upper(),
+            taxonomic_status=row["taxonomicStatus"].upper(),
+            accepted_id=(
+                int(row["acceptedNameUsageID"]) if row["acceptedNameUsageID"] else None
+            ),
+            family=row["family"],
+            genus=row["genus"],
+        )
+
+
+@functools.cache
+def _get_language_code(language: str) -> str | None:
+    """ISO 639-2 code of a language, as returned by the API, if it has an ISO 639-1 code."""
+
+    language = language.lower()
+    if len(language) == 2:
+        found = pycountry.languages.get(alpha_2=language)
+    elif len(language) == 3:
+        found = pycountry.languages.get(alpha_3=language)
+    else:
+        found = None
+
+    # Common names are stored by ISO 639-1 code.
+    if not found or not hasattr(found, "alpha_2"):
+        return None
+
+    return found.alpha_3
+
+
+def _vernacular_names(
+    rows: typing.Iterable[Row], taxon_ids: typing.Set[int]
+) -> typing.Iterator[BackboneVernacularName]:
+    for row in rows:
+        taxon_id = int(row["taxonID"])
+        language = _get_language_code(row["language"])
+        name = row["vernacularName"].strip()
+
+        if taxon_id in taxon_ids and language and name:
+            yield BackboneVernacularName(
+                taxon_id=taxon_id, name=name[:255], language=language
+            )
+
+
+@transaction.atomic
+def load_backbone(
+    taxon_rows: typing.Iterable[Row],
+    vernacular_name_rows: typing.Iterable[Row] = (),
+    batch_size: int = BATCH_SIZE,
+) -> typing.Tuple[int, int]:
+    """
+    Replace the mirror with plant taxa and their vernacular names, streamed from rows.
+
+    Lookups are served from the previous mirror until it has been replaced. Returns
+    the number of taxa and vernacular names loaded.
+    """
+
+    BackboneVernacularName.objects.all().delete()
+    BackboneTaxon.objects.all().delete()
+
+    taxon_count = 0
+    for batch in _batches(_taxa(taxon_rows), batch_size):
+        BackboneTaxon.objects.bulk_create(batch)
+        taxon_count += len(batch)
+
+    # Vernacular names of all kingdoms are in one file, only those of plants are kept.
+    taxon_ids = set(BackboneTaxon.objects.values_list("id", flat=True).iterator())
+
+    vernacular_name_count = 0
+    for batch in _batches(
+        _vernacular_names(vernacular_name_rows, taxon_ids), batch_size
+    ):
+        BackboneVernacularName.objects.bulk_create(batch)
+        vernacular_name_count += len(batch)
+
+    return taxon_count, vernacular_name_count
+
+
+def _preferred(taxa: typing.Iterable[BackboneTaxon]) -> BackboneTaxon | None:
+    def order(taxon: BackboneTaxon) -> typing.Tuple[int, int]:
+        status = taxon.taxonomic_status
+        return (
+            STATUS_ORDER.index(status) if status in STATUS_ORDER else len(STATUS_ORDER),
+            taxon.id,
+        )
+
+    return min(taxa, key=order, default=None)
+
+
+def _find(name: str, rank: str | None) -> BackboneTaxon | None:
+    taxa = BackboneTaxon.objects.filter(canonical_name=name)
+    if rank:
+        taxa = taxa.filter(rank=rank)
+
+    return _preferred(taxa)
+
+
+def _find_fuzzy(name: str, rank: str | None) -> BackboneTaxon | None:
+    prefix = name[:FUZZY_PREFIX_LENGTH]
+    candidates = BackboneTaxon.objects.filter(
+        canonical_name__gte=prefix, canonical_name__lt=prefix + _MAX_CHAR
+    )
+    if rank:
+        candidates = candidates.filter(rank=rank)
+
+    similar = difflib.get_close_matches(
+        name,
+        set(candidates.values_list("canonical_name", flat=True)),
+        n=1,
+        cutoff=FUZZY_CUTOFF,
+    )
+    if not similar:
+        return None
+
+    return _find(similar[0], rank)
+
+
+def _get_accepted_key(name: str, rank: str) -> int | None:
+    if not name:
+        return None
+
+    return (
+        BackboneTaxon.objects.filter(
+            canonical_name=name, rank=rank, taxonomic_status="ACCEPTED"
+        )
+        .order_by("id")
+        .values_list("id", flat=True)
+        .first()
+    )
+
+
+def _match_data(taxon: BackboneTaxon, match_type: str) -> dict:
+    data = {
+        "usageKey": taxon.id,
+        "scientificName": taxon.scientific_name,
+        "canonicalName": taxon.canonical_name,
+        "rank": taxon.rank,
+        "status": taxon.taxonomic_status,
+        "matchType": match_type,
+        "synonym": bool(taxon.accepted_id),
+        "kingdom": KINGDOM,
+    }
+
+    # Classification of synonyms is that of their accepted taxon.
+    accepted = taxon
+    if taxon.accepted_id:
+        data["acceptedUsageKey"] = taxon.accepted_id
+        accepted = BackboneTaxon.objects.filter(id=taxon.accepted_id).first() or taxon
+
+    family = accepted.canonical_name if accepted.rank == "FAMILY" else accepted.family
+    genus = accepted.canonical_name if accepted.rank == "GENUS" else accepted.genus
+
+    if family:
+        data["family"] = family
+        data["familyKey"] = (
+            accepted.id
+            if accepted.rank == "FAMILY"
+            else _get_accepted_key(family, "FAMILY")
+        )
+    if genus:
+        data["genus"] = genus
+        data["genusKey"] = (
+            accepted.id
+            if accepted.rank == "GENUS"
+            else _get_accepted_key(genus, "GENUS")
+        )
+    if accepted.rank == "SPECIES":
+        data["species"] = accepted.canonical_name
+        data["speciesKey"] = accepted.id
+
+    return data
+
+
+def name_backbone(name: str, rank: typing.Any = None, **kwargs) -> dict:
+    """
+    Match a name like `pygbif.species.name_backbone()`, exactly or fuzzily.
+
+    Names of species not found fall back to their genus, as a HIGHERRANK match.
+    Other arguments of the API, e.g. kingdom, are accepted and ignored.
+    """
+
+    name = _normalize_name(name)
+    rank = str(rank).upper() if rank else None
+
+    taxon = _find(name, rank)
+    if taxon:
+        return _match_data(taxon, "EXACT")
+
+    taxon = _find_fuzzy(name, rank)
+    if taxon:
+        return _match_data(taxon, "FUZZY")
+
+    genus_name = name.split()[0] if name else ""
+    if rank == "SPECIES" and genus_name != name:
+        taxon = _find(genus_name, "GENUS")
+        if taxon:
+            return _match_data(taxon, "HIGHERRANK")
+
+    return {"matchType": "NONE", "synonym": False}
+
+
+def vernacular_names(key: int) -> dict:
+    """Vernacular names of a taxon, like `pygbif.species.name_usage(key, data="vernacularNames")`."""
+
+    names = BackboneVernacularName.objects.filter(taxon_id=key).order_by("id")
+
+    return {
+        "offset": 0,
+        "limit": len(names),
+        "endOfRecords": True,
+        "results": [
+            {"taxonKey": key, "vernacularName": name.name, "language": name.language}
+            for name in names
+        ],
+    }
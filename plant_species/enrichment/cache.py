@@ -0,0 +1,212 @@
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import typing
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .exceptions import OfflineCacheMiss
+
+logger = logging.getLogger(__name__)
+
+# Evict after this many writes, rather than on every write.
+_EVICT_INTERVAL = 100
+
+
+class ResponseCache:
+    """
+    Persistent, content-addressed cache for JSON-serializable API responses.
+
+    Entries are stored in a SQLite file, expire after `ttl` and the least recently
+    used ones are evicted when the total size exceeds `max_size` bytes. In `offline`
+    mode expired entries are served as well.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        ttl: datetime.timedelta,
+        max_size: int,
+        offline: bool = False,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.offline = offline
+
+        self._local = threading.local()
+        self._writes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a connection for the current thread, as SQLite connections can't be shared."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            # Allow concurrent readers while writing.
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+
+        return connection
+
+    def get(self, key: str) -> typing.Any:
+        """Return cached value for key, raising KeyError when missing or expired."""
+
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                raise KeyError(key)
+
+            value, created = row
+            if not self.offline and created < time.time() - self.ttl.total_seconds():
+                raise KeyError(key)
+
+            connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+
+        return json.loads(value)
+
+    def set(self, key: str, value: typing.Any):
+        serialized = json.dumps(value)
+        now = time.time()
+
+        with self._connection() as connection:
+            connection.execute(
+                "REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, serialized, len(serialized), now, now),
+            )
+
+        self._writes += 1
+        if self._writes % _EVICT_INTERVAL == 0:
+            self.evict()
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones until within max_size."""
+
+        with self._connection() as connection:
+            if not self.offline:
+                connection.execute(
+                    "DELETE FROM responses WHERE created < ?",
+                    (time.time() - self.ttl.total_seconds(),),
+                )
+
+            (total_size,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+            excess = total_size - self.max_size
+            if excess <= 0:
+                return
+
+            evicted_keys = []
+            for key, size in connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"
+            ):
+                if excess <= 0:
+                    break
+
+                evicted_keys.append((key,))
+                excess -= size
+
+            logger.debug("Evicting %d cached responses", len(evicted_keys))
+            connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM responses")
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """Return the configured cache, or None when caching is disabled."""
+    global _cache
+
+    config = settings.ENRICHMENT_CACHE
+    if not config.get("PATH"):
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                path=config["PATH"],
+                ttl=config["TTL"],
+                max_size=config["MAX_SIZE"],
+                offline=config.get("OFFLINE", False),
+            )
+
+    return _cache
+
+
+@receiver(setting_changed)
+def _reset_cache(setting, **kwargs):
+    global _cache
+
+    if setting == "ENRICHMENT_CACHE":
+        _cache = None
+
+
+def make_key(namespace: str, *args, **kwargs) -> str:
+    """Content address for a call, stable across processes."""
+    serialized = json.dumps([namespace, args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def cached(namespace: str):
+    """Decorator serving return values of API calls from the response cache."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None:
+                return func(*args, **kwargs)
+
+            key = make_key(namespace, func.__name__, *args, **kwargs)
+
+            try:
+                return cache.get(key)
+            except KeyError:
+                pass
+
+            if cache.offline:
+                raise OfflineCacheMiss(
+                    f"No cached {namespace} response for {func.__name__}{args or ''}{kwargs or ''} in offline mode."
+                )
+
+            value = func(*args, **kwargs)
+            cache.set(key, value)
+
+            return value
+
+        return wrapper
+
+    return decorator
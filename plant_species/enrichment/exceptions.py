@@ -8,3 +8,7 @@ class SpeciesNotFound(EnrichmentException):
 
 class SpeciesAlreadyExists(EnrichmentException):
     pass
+
+
+class OfflineCacheMiss(EnrichmentException):
+    pass
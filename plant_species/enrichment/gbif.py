@@ -1,13 +1,22 @@
 import enum
+import functools
+import logging
+import tempfile
 import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import pycountry
 
 from pygbif import occurrences, species
 import requests
-from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files import File
 
+from .cache import cached
 from .exceptions import SpeciesNotFound
 
+logger = logging.getLogger(__name__)
+
 _valid_licenses = (
     # CC-BY
     "http://creativecommons.org/licenses/by/4.0/legalcode",
@@ -21,6 +30,45 @@ _valid_licenses = (
 )
 
 
+@cached("gbif")
+def _search_occurrences(taxonKey: int, **kwargs) -> dict:
+    return occurrences.search(taxonKey, **kwargs)
+
+
+@cached("gbif")
+def _name_usage(key: int, **kwargs) -> dict:
+    return species.name_usage(key, **kwargs)
+
+
+@cached("gbif")
+def _name_backbone(**kwargs) -> dict:
+    return species.name_backbone(**kwargs)
+
+
+def _uses_local_backbone() -> bool:
+    """Whether names are resolved with the local backbone mirror, rather than the API."""
+    return settings.GBIF_BACKEND == "local"
+
+
+def _match_backbone(**kwargs) -> dict:
+    if _uses_local_backbone():
+        # Imported here, as it depends on the models, which import this module.
+        from plant_species.backbone import name_backbone
+
+        return name_backbone(**kwargs)
+
+    return _name_backbone(**kwargs)
+
+
+def _vernacular_names(key: int) -> dict:
+    if _uses_local_backbone():
+        from plant_species.backbone import vernacular_names
+
+        return vernacular_names(key)
+
+    return _name_usage(key, data="vernacularNames")
+
+
 def _get_image_url(occurrence: dict) -> str | None:
     for media in occurrence.get("media", []):
         if (
@@ -34,7 +82,7 @@ def _get_image_url(occurrence: dict) -> str | None:
 
 def _get_image_urls(taxonKey: int) -> typing.List[str]:
     """Get URL of CC licensed images."""
-    occurrence_data = occurrences.search(
+    occurrence_data = _search_occurrences(
         taxonKey, mediatype="StillImage", basisOfRecord="HUMAN_OBSERVATION"
     )
     """ Returns something like this:
@@ -300,21 +348,76 @@ def _get_image_urls(taxonKey: int) -> typing.List[str]:
     return [url for url in map(_get_image_url, results) if url is not None]
 
 
-def get_image(gbif_id: int) -> ContentFile | None:
-    """Fetch image from GBIF and return as ContentFile."""
+# Size of chunks images are streamed in.
+_CHUNK_SIZE = 64 * 1024
+
+_JPEG_CONTENT_TYPES = ("image/jpeg", "image/jpg")
+_JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+
+@functools.cache
+def _get_session() -> requests.Session:
+    """Session shared by image downloads, keeping connections alive between them."""
+    session = requests.Session()
+
+    adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def _download_image(image_url: str, max_size: int) -> File | None:
+    """Stream JPEG image into a temporary file, skipping other types and oversized images."""
+
+    with _get_session().get(image_url, stream=True, timeout=30) as response:
+        if not response.ok:
+            return None
+
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type not in _JPEG_CONTENT_TYPES:
+            return None
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and int(content_length) > max_size:
+            logger.info("Skipping %s of %s bytes", image_url, content_length)
+            return None
+
+        # Deleted when closed.
+        image_file = tempfile.NamedTemporaryFile(suffix=".jpg")
+
+        size = 0
+        for chunk in response.iter_content(_CHUNK_SIZE):
+            # Don't trust the Content-Type header blindly.
+            if size == 0 and not chunk.startswith(_JPEG_SIGNATURE):
+                image_file.close()
+                return None
+
+            size += len(chunk)
+            if size > max_size:
+                logger.info("Skipping %s exceeding %s bytes", image_url, max_size)
+                image_file.close()
+                return None
+
+            image_file.write(chunk)
+
+    if not size:
+        image_file.close()
+        return None
+
+    image_file.seek(0)
+    return File(image_file)
+
+
+def get_image(gbif_id: int) -> File | None:
+    """Fetch the first JPEG image of a species from GBIF, as a temporary File."""
     image_urls = _get_image_urls(gbif_id)
 
-    if image_urls:
-        for image_url in image_urls:
-            with requests.get(image_url) as response:
-                if response.headers["Content-Type"] not in (
-                    "image/jpeg",
-                    "image/jpg",
-                ):
-                    continue
-
-                # Pick the first JPEG image returned and wrap in ContentFile
-                return ContentFile(response.content)
+    for image_url in image_urls:
+        image_file = _download_image(image_url, settings.SPECIES_IMAGE_MAX_SIZE)
+        if image_file:
+            return image_file
+
     return None
 
 
@@ -332,7 +435,7 @@ def get_common_names(
     gbif_id: int, enabled_languages: typing.List[str]
 ) -> typing.List[typing.Dict[str, str]]:
     """Fetch common names from GBIF for the given gbif_id and return them as a list of dictionaries."""
-    names_data = species.name_usage(gbif_id, data="vernacularNames")
+    names_data = _vernacular_names(gbif_id)
     assert isinstance(names_data, dict)
     results = names_data["results"]
     assert isinstance(results, list)
@@ -366,12 +469,34 @@ class Rank(enum.Enum):
         return self.name.lower()
 
 
-def get_latin_names(
-    latin_name: str, rank: Rank
-) -> typing.Dict[str, typing.Optional[str]]:
-    """Fetch species data from GBIF backbone based on the latin name and rank."""
+def _normalize_name(latin_name: str) -> str:
+    """Normalized form of a latin name, e.g. ' quercus  Robur' -> 'Quercus robur'."""
+    return " ".join(latin_name.split()).capitalize()
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """Result of matching a latin name against the GBIF backbone."""
+
+    name: str
+    match_type: str
+    latin_names: typing.Dict[str, typing.Optional[str]]
 
-    species_data = species.name_backbone(
+    @property
+    def is_exact(self) -> bool:
+        return self.match_type == "EXACT"
+
+    @property
+    def suggestion(self) -> str | None:
+        """Canonical name of a fuzzy match, if any."""
+        if self.is_exact or self.match_type == "NONE":
+            return None
+
+        return self.latin_names.get("species") or self.latin_names.get("genus")
+
+
+def _match_name(latin_name: str, rank: Rank) -> NameMatch:
+    species_data = _match_backbone(
         name=latin_name,
         rank=rank,
         kingdom="plants",
@@ -379,14 +504,61 @@ def get_latin_names(
         strict=False,
     )
 
-    if species_data["matchType"] != "EXACT":
-        raise SpeciesNotFound(f"No unique match for {rank}: '{latin_name}'.")
+    return NameMatch(
+        name=latin_name,
+        match_type=species_data["matchType"],
+        latin_names={
+            "species": species_data.get("species"),
+            "genus": species_data.get("genus"),
+            "family": species_data.get("family"),
+            "speciesKey": species_data.get("speciesKey"),
+            "genusKey": species_data.get("genusKey"),
+            "familyKey": species_data.get("familyKey"),
+        },
+    )
 
-    return {
-        "species": species_data.get("species"),
-        "genus": species_data.get("genus"),
-        "family": species_data.get("family"),
-        "speciesKey": species_data.get("speciesKey"),
-        "genusKey": species_data.get("genusKey"),
-        "familyKey": species_data.get("familyKey"),
-    }
+
+def get_latin_names(
+    latin_name: str, rank: Rank
+) -> typing.Dict[str, typing.Optional[str]]:
+    """Fetch species data from GBIF backbone based on the latin name and rank."""
+
+    match = _match_name(latin_name, rank)
+
+    if not match.is_exact:
+        message = f"No unique match for {rank}: '{latin_name}'."
+        if match.suggestion:
+            message += f" Did you mean '{match.suggestion}'?"
+
+        raise SpeciesNotFound(message)
+
+    return match.latin_names
+
+
+def resolve_latin_names(
+    latin_names: typing.Iterable[str], rank: Rank, workers: int = 8
+) -> typing.Dict[str, NameMatch]:
+    """
+    Match many latin names against the GBIF backbone, concurrently with the API.
+
+    Names are deduplicated by normalized form, so each distinct name is requested
+    once. Returns a match for every given name, keyed by the name as given.
+    """
+
+    latin_names = list(latin_names)
+    normalized = {name: _normalize_name(name) for name in latin_names}
+
+    unique_names = list(dict.fromkeys(normalized.values()))
+    if _uses_local_backbone():
+        # Quicker than starting threads, each opening a database connection.
+        matches = {name: _match_name(name, rank) for name in unique_names}
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            matches = dict(
+                zip(
+                    unique_names,
+                    executor.map(lambda name: _match_name(name, rank), unique_names),
+                )
+            )
+
+    return {name: matches[normalized[name]] for name in latin_names}
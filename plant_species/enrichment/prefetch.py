@@ -0,0 +1,72 @@
+import typing
+from dataclasses import dataclass, field
+
+from django.core.files import File
+
+from .gbif import get_common_names, get_image, get_latin_names, Rank
+from .wikidata import (
+    WikidataEntity,
+    get_image as get_wikidata_image,
+    get_wikidata_entity,
+)
+from .wikipedia import WikipediaPage, get_wikipedia_languages, get_wikipedia_pages
+
+
+@dataclass
+class PrefetchedSpecies:
+    """Network data for a species, fetched ahead of creating the model instance."""
+
+    latin_name: str
+    species_data: typing.Dict[str, typing.Optional[str]]
+    image: File | None = None
+    wikipedia_pages: typing.Dict[str, WikipediaPage] = field(default_factory=dict)
+    common_names: typing.List[typing.Dict[str, str]] = field(default_factory=list)
+    wikidata_entity: WikidataEntity | None = None
+
+
+def prefetch_species(
+    latin_name: str,
+    enabled_languages: typing.List[str],
+    species_data: typing.Dict[str, typing.Optional[str]] | None = None,
+    wikidata_entities: typing.Dict[int, WikidataEntity] | None = None,
+) -> PrefetchedSpecies:
+    """
+    Perform all network-bound enrichment for a species without touching the database.
+
+    Safe to call from worker threads; raises SpeciesNotFound when the name doesn't resolve.
+    Names are read from the database when resolved with the local GBIF backbone.
+    Backbone lookup is skipped when species_data was resolved beforehand, as is the
+    Wikidata lookup when given the wikidata_entities of a batched lookup.
+    """
+
+    if species_data is None:
+        species_data = get_latin_names(latin_name, Rank.SPECIES)
+
+    gbif_id = species_data["speciesKey"]
+    assert isinstance(gbif_id, int), f"No GBIF speciesKey for {latin_name}"
+
+    # Wikipedia is looked up by canonical name, as enrich() does after the backbone lookup.
+    canonical_name = species_data["species"]
+    assert canonical_name, f"No canonical name for {latin_name}"
+
+    if wikidata_entities is not None:
+        entity = wikidata_entities.get(gbif_id)
+    else:
+        entity = get_wikidata_entity(gbif_id)
+
+    image = get_image(gbif_id)
+    if not image and entity:
+        image = get_wikidata_image(entity)
+
+    return PrefetchedSpecies(
+        latin_name=latin_name,
+        species_data=species_data,
+        image=image,
+        wikipedia_pages=get_wikipedia_pages(
+            canonical_name,
+            get_wikipedia_languages(),
+            titles=entity.sitelinks if entity else None,
+        ),
+        common_names=get_common_names(gbif_id, enabled_languages),
+        wikidata_entity=entity,
+    )
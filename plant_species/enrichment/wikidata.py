@@ -0,0 +1,269 @@
+"""
+Batched lookups of Wikidata entities of taxa, by their GBIF id (property P846).
+
+GBIF ids are resolved to entity ids with a SPARQL query per batch, entities fetched
+50 at a time with `wbgetentities`. Both are stored per id in the response cache, so
+enriching the whole catalog again only requests ids not seen before.
+"""
+
+import functools
+import logging
+import typing
+from dataclasses import dataclass
+from urllib.parse import quote
+
+import requests
+import requests.adapters
+from django.conf import settings
+from django.core.files import File
+
+from .cache import get_cache, make_key
+from .exceptions import OfflineCacheMiss
+from .gbif import _download_image
+from .wikipedia import USER_AGENT, get_wikipedia_languages
+
+logger = logging.getLogger(__name__)
+
+SPARQL_URL = "https://query.wikidata.org/sparql"
+API_URL = "https://www.wikidata.org/w/api.php"
+# Commons file by name, redirecting to a rendition at most 2048 pixels wide.
+FILE_URL = "https://commons.wikimedia.org/wiki/Special:FilePath/{name}?width=2048"
+
+# GBIF ids per SPARQL query, small enough for the query to finish quickly.
+SPARQL_BATCH_SIZE = 200
+# Maximum ids per wbgetentities call, for clients without the bot right.
+ENTITIES_BATCH_SIZE = 50
+
+GBIF_PROPERTY = "P846"
+IMAGE_PROPERTY = "P18"
+
+_QUERY = (
+    """SELECT ?item ?gbif WHERE {{
+  VALUES ?gbif {{ {values} }}
+  ?item wdt:%s ?gbif .
+}}"""
+    % GBIF_PROPERTY
+)
+
+T = typing.TypeVar("T")
+
+
+@dataclass(frozen=True)
+class WikidataEntity:
+    """Subset of the Wikidata entity of a taxon, as used for enrichment."""
+
+    id: str
+    # By language code, as requested.
+    labels: typing.Dict[str, str]
+    # Wikipedia page titles, by Wikipedia language.
+    sitelinks: typing.Dict[str, str]
+    image_url: str | None = None
+
+
+@functools.cache
+def _get_session() -> requests.Session:
+    """Session shared by Wikidata requests, keeping connections alive between them."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=8)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def _cached_batches(
+    namespace: str,
+    keys: typing.Iterable[typing.Hashable],
+    fetch: typing.Callable[[typing.List], typing.Dict[typing.Any, T]],
+    batch_size: int,
+) -> typing.Dict[typing.Any, T | None]:
+    """
+    Values for keys, from the response cache, fetching the others in batches.
+
+    Keys missing from a batch's result are cached as None, so they aren't
+    requested again until they expire.
+    """
+
+    cache = get_cache()
+    results: typing.Dict[typing.Any, T | None] = {}
+    missing = []
+
+    for key in dict.fromkeys(keys):
+        if cache:
+            try:
+                results[key] = cache.get(make_key(namespace, key))
+                continue
+            except KeyError:
+                pass
+
+        missing.append(key)
+
+    if missing and cache and cache.offline:
+        raise OfflineCacheMiss(
+            f"No cached {namespace} responses for {len(missing)} ids in offline mode."
+        )
+
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start : start + batch_size]
+        fetched = fetch(batch)
+
+        for key in batch:
+            results[key] = fetched.get(key)
+            if cache:
+                cache.set(make_key(namespace, key), results[key])
+
+    return results
+
+
+def _query_entity_ids(gbif_ids: typing.List[int]) -> typing.Dict[int, str]:
+    values = " ".join(f'"{gbif_id}"' for gbif_id in gbif_ids)
+    response = _get_session().post(
+        SPARQL_URL,
+        data={"query": _QUERY.format(values=values)},
+        headers={"Accept": "application/sparql-results+json"},
+        timeout=60,
+    )
+    response.raise_for_status()
+
+    entity_ids: typing.Dict[int, str] = {}
+    for binding in response.json()["results"]["bindings"]:
+        gbif_id = int(binding["gbif"]["value"])
+        entity_id = binding["item"]["value"].rsplit("/", 1)[-1]
+
+        # Duplicate entities are rare, prefer the oldest.
+        previous = entity_ids.get(gbif_id)
+        if previous is None or int(entity_id[1:]) < int(previous[1:]):
+            entity_ids[gbif_id] = entity_id
+
+    return entity_ids
+
+
+def get_entity_ids(gbif_ids: typing.Iterable[int]) -> typing.Dict[int, str]:
+    """Wikidata entity ids by GBIF id, omitting those without an entity."""
+
+    entity_ids = _cached_batches(
+        "wikidata_ids", gbif_ids, _query_entity_ids, SPARQL_BATCH_SIZE
+    )
+
+    return {
+        gbif_id: entity_id for gbif_id, entity_id in entity_ids.items() if entity_id
+    }
+
+
+def _get_image_url(claims: dict) -> str | None:
+    for claim in claims.get(IMAGE_PROPERTY, []):
+        datavalue = claim["mainsnak"].get("datavalue")
+        if claim.get("rank") != "deprecated" and datavalue:
+            return FILE_URL.format(name=quote(datavalue["value"].replace(" ", "_")))
+
+    return None
+
+
+def _fetch_entities(
+    entity_ids: typing.List[str],
+    languages: typing.Tuple[str, ...],
+    wikipedia_languages: typing.Tuple[str, ...],
+) -> typing.Dict[str, dict]:
+    response = _get_session().get(
+        API_URL,
+        params={
+            "action": "wbgetentities",
+            "ids": "|".join(entity_ids),
+            "props": "labels|sitelinks|claims",
+            "languages": "|".join(languages),
+            "sitefilter": "|".join(
+                f"{language}wiki" for language in wikipedia_languages
+            ),
+            "format": "json",
+        },
+        timeout=60,
+    )
+    response.raise_for_status()
+
+    entities = {}
+    for entity_id, entity in response.json()["entities"].items():
+        if "missing" in entity:
+            continue
+
+        entities[entity_id] = {
+            "id": entity_id,
+            "labels": {
+                language: label["value"]
+                for language, label in entity.get("labels", {}).items()
+            },
+            "sitelinks": {
+                site.removesuffix("wiki"): sitelink["title"]
+                for site, sitelink in entity.get("sitelinks", {}).items()
+            },
+            "image_url": _get_image_url(entity.get("claims", {})),
+        }
+
+    return entities
+
+
+def get_entities(
+    entity_ids: typing.Iterable[str],
+    languages: typing.Iterable[str],
+    wikipedia_languages: typing.Iterable[str],
+) -> typing.Dict[str, WikidataEntity]:
+    """Entities by id with labels in languages and sitelinks to Wikipedia editions."""
+
+    languages = tuple(sorted(languages))
+    wikipedia_languages = tuple(sorted(wikipedia_languages))
+
+    entities = _cached_batches(
+        # Entities of other languages are cached separately.
+        f"wikidata_entities:{','.join(languages)}:{','.join(wikipedia_languages)}",
+        entity_ids,
+        lambda batch: _fetch_entities(batch, languages, wikipedia_languages),
+        ENTITIES_BATCH_SIZE,
+    )
+
+    return {
+        entity_id: WikidataEntity(**entity)
+        for entity_id, entity in entities.items()
+        if entity
+    }
+
+
+def get_wikidata_entities(
+    gbif_ids: typing.Iterable[int],
+) -> typing.Dict[int, WikidataEntity]:
+    """
+    Entities of taxa by GBIF id, in the configured languages.
+
+    Takes a few requests per few hundred taxa. Lookups of single taxa are served
+    from the cache, after looking up all of them at once.
+    """
+
+    entity_ids = get_entity_ids(gbif_ids)
+    entities = get_entities(
+        entity_ids.values(), dict(settings.LANGUAGES), get_wikipedia_languages()
+    )
+
+    return {
+        gbif_id: entities[entity_id]
+        for gbif_id, entity_id in entity_ids.items()
+        if entity_id in entities
+    }
+
+
+def get_wikidata_entity(gbif_id: int) -> WikidataEntity | None:
+    """Entity of a taxon by GBIF id, or None when it has none or Wikidata fails."""
+
+    try:
+        return get_wikidata_entities([gbif_id]).get(gbif_id)
+    except requests.RequestException as e:
+        # Optional, enrichment falls back to names.
+        logger.warning("Failed looking up Wikidata entity of %s: %r", gbif_id, e)
+        return None
+
+
+def get_image(entity: WikidataEntity) -> File | None:
+    """Download the JPEG image of an entity, as a temporary File."""
+
+    if not entity.image_url:
+        return None
+
+    return _download_image(entity.image_url, settings.SPECIES_IMAGE_MAX_SIZE)
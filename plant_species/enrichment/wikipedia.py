@@ -1,8 +1,115 @@
-import wikipedia
+import functools
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import quote
 
+import requests
+import requests.adapters
+from django.conf import settings
 
-def get_wikipedia_page(name: str) -> wikipedia.WikipediaPage | None:
-    try:
-        return wikipedia.page(title=name, redirect=True)
-    except (wikipedia.PageError, wikipedia.DisambiguationError):
+from .cache import cached
+
+# REST summary of a page, with its lead paragraphs as plain text, following
+# redirects. Much lighter than fetching the whole page.
+SUMMARY_URL = "https://{language}.wikipedia.org/api/rest_v1/page/summary/{title}"
+
+# Wikimedia asks clients to identify themselves.
+USER_AGENT = "treescape/0.1.0 (species data enrichment)"
+
+
+@dataclass(frozen=True)
+class WikipediaPage:
+    """Subset of a Wikipedia page used for enrichment, small enough to be cached."""
+
+    title: str
+    url: str
+    pageid: int
+    summary: str
+
+
+def get_wikipedia_language(language: str) -> str:
+    """Wikipedia edition of a Django language code, e.g. `pt` for `pt-br`."""
+    return language.split("-")[0].lower()
+
+
+def get_wikipedia_languages() -> typing.List[str]:
+    """Wikipedia editions of the configured languages, the default one first."""
+    return list(
+        dict.fromkeys(
+            get_wikipedia_language(language)
+            for language in [settings.LANGUAGE_CODE, *dict(settings.LANGUAGES)]
+        )
+    )
+
+
+@functools.cache
+def _get_session() -> requests.Session:
+    """Session shared by summary requests, keeping connections alive between them."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+
+    adapter = requests.adapters.HTTPAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount("https://", adapter)
+
+    return session
+
+
+@cached("wikipedia")
+def _get_summary_data(name: str, language: str) -> typing.Dict[str, str] | None:
+    url = SUMMARY_URL.format(
+        language=get_wikipedia_language(language),
+        title=quote(name.replace(" ", "_"), safe=""),
+    )
+
+    response = _get_session().get(url, timeout=30)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    data = response.json()
+    if data.get("type") != "standard":
+        # Disambiguation pages don't describe a single taxon.
+        return None
+
+    return {
+        "title": data["title"],
+        "url": data["content_urls"]["desktop"]["page"],
+        "pageid": data["pageid"],
+        "summary": data["extract"],
+    }
+
+
+def get_wikipedia_page(name: str, language: str = "en") -> WikipediaPage | None:
+    page_data = _get_summary_data(name, language)
+
+    if page_data is None:
         return None
+
+    return WikipediaPage(**page_data)
+
+
+def get_wikipedia_pages(
+    name: str,
+    languages: typing.Iterable[str],
+    titles: typing.Dict[str, str] | None = None,
+    workers: int = 4,
+) -> typing.Dict[str, WikipediaPage]:
+    """
+    Pages for a name in several languages, fetched concurrently, by language.
+
+    With titles by language, e.g. Wikidata sitelinks, only those pages are fetched,
+    rather than guessing pages by name.
+    """
+
+    if titles is None:
+        requested = {language: name for language in languages}
+    else:
+        requested = {
+            language: titles[language] for language in languages if language in titles
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = executor.map(get_wikipedia_page, requested.values(), requested)
+
+        return {language: page for language, page in zip(requested, pages) if page}
@@ -0,0 +1,101 @@
+import typing
+from dataclasses import dataclass
+from pathlib import PurePath
+
+import pyvips
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class Derivative:
+    """Square rendition of a species image, cropped to its most interesting part."""
+
+    name: str
+    size: int
+    format: str = "jpeg"
+    quality: int = 85
+
+    @property
+    def extension(self) -> str:
+        return {"jpeg": "jpg"}.get(self.format, self.format)
+
+    @property
+    def field_name(self) -> str:
+        return f"image_{self.name}"
+
+    def get_path(self, uuid) -> str:
+        """Storage path for derivatives without a model field."""
+        return (
+            PurePath("plant_species/images") / self.name / f"{uuid}.{self.extension}"
+        ).as_posix()
+
+
+# Renditions stored on the `image_large` and `image_thumbnail` fields.
+DEFAULT_DERIVATIVES = (
+    Derivative("large", 2048),
+    Derivative("thumbnail", 512),
+)
+
+
+def get_derivatives() -> typing.Tuple[Derivative, ...]:
+    """Default derivatives, followed by those in SPECIES_IMAGE_EXTRA_DERIVATIVES."""
+    return DEFAULT_DERIVATIVES + tuple(
+        Derivative(**spec) for spec in settings.SPECIES_IMAGE_EXTRA_DERIVATIVES
+    )
+
+
+def _save_buffer(image: pyvips.Image, derivative: Derivative) -> bytes:
+    if derivative.format == "jpeg":
+        return image.jpegsave_buffer(Q=derivative.quality, strip=True)
+    if derivative.format == "webp":
+        return image.webpsave_buffer(Q=derivative.quality, strip=True)
+    if derivative.format == "avif":
+        return image.heifsave_buffer(
+            Q=derivative.quality, compression="av1", strip=True
+        )
+
+    raise ValueError(f"Unsupported image format: {derivative.format}")
+
+
+def render_derivatives(
+    source: bytes | str, derivatives: typing.Sequence[Derivative]
+) -> typing.Dict[str, bytes]:
+    """
+    Render encoded derivatives from a source image buffer or file path.
+
+    The source is decoded once, using shrink-on-load to the largest derivative, and
+    smaller derivatives are scaled down from that. Doesn't use Django, so it can run
+    in worker processes.
+    """
+
+    largest = max(derivative.size for derivative in derivatives)
+    options = {"height": largest, "crop": "attention", "size": "down"}
+
+    if isinstance(source, bytes):
+        image = pyvips.Image.thumbnail_buffer(source, largest, **options)
+    else:
+        image = pyvips.Image.thumbnail(source, largest, **options)
+
+    # Decode once, rather than for every derivative.
+    image = image.copy_memory()
+
+    # Sources smaller than the largest derivative aren't upscaled, leaving the other
+    # side uncropped.
+    side = min(image.width, image.height)
+    if image.width != image.height:
+        image = image.smartcrop(side, side, interesting="attention")
+
+    rendered = {}
+    for derivative in derivatives:
+        derived = image
+        if derivative.size < max(image.width, image.height):
+            derived = image.thumbnail_image(
+                derivative.size,
+                height=derivative.size,
+                crop="attention",
+                size="down",
+            )
+
+        rendered[derivative.name] = _save_buffer(derived, derivative)
+
+    return rendered
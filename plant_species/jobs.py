@@ -0,0 +1,137 @@
+"""
+Database-backed queue of slow enrichment stages, run by `run_enrichment_jobs`.
+
+Adding a species through the admin only looks up its GBIF backbone, queueing its
+image, description and common names as jobs, so requests don't wait for them.
+Workers claim jobs by priority with a conditional update, so several can run side by
+side without a broker. Failed jobs are retried with exponential backoff.
+"""
+
+import datetime
+import logging
+import typing
+
+from django.utils import timezone
+
+from .models import IMAGE_FIELDS, WIKIPEDIA_FIELDS, EnrichmentJob, SpeciesBase
+
+logger = logging.getLogger(__name__)
+
+# Of jobs queued through the admin, ahead of bulk enrichment.
+ADMIN_PRIORITY = 10
+
+# Retries wait this long, doubling for every attempt, up to the maximum.
+BACKOFF_BASE = datetime.timedelta(seconds=30)
+BACKOFF_MAX = datetime.timedelta(hours=6)
+
+# Jobs running this long are assumed to have lost their worker.
+STALE_AFTER = datetime.timedelta(minutes=30)
+
+# Candidates fetched at once, some of which may be claimed by other workers.
+CLAIM_CANDIDATES = 10
+
+
+def _enrich_image(obj: SpeciesBase):
+    obj.enrich_gbif_image()
+    # Only what this stage sets, as other stages of the same object may run
+    # concurrently.
+    obj.save(update_fields=IMAGE_FIELDS)
+
+
+def _enrich_wikipedia(obj: SpeciesBase):
+    # Pages are looked up through the Wikidata entity.
+    obj.enrich_wikidata()
+    obj.enrich_wikipedia()
+    obj.save(update_fields=["description", "wikidata_id", *WIKIPEDIA_FIELDS])
+
+
+STAGES: typing.Dict[str, typing.Callable[[SpeciesBase], None]] = {
+    EnrichmentJob.Stage.IMAGE.value: _enrich_image,
+    EnrichmentJob.Stage.WIKIPEDIA.value: _enrich_wikipedia,
+    EnrichmentJob.Stage.COMMON_NAMES.value: SpeciesBase.enrich_related,
+}
+
+
+def get_backoff(attempts: int) -> datetime.timedelta:
+    # Capped before multiplying, which overflows for many attempts.
+    exponent = min(attempts - 1, 16)
+    return min(BACKOFF_BASE * 2**exponent, BACKOFF_MAX)
+
+
+def requeue_stale() -> int:
+    """Queue jobs again which have been running too long, returning how many."""
+
+    return EnrichmentJob.objects.filter(
+        status=EnrichmentJob.Status.RUNNING,
+        started__lt=timezone.now() - STALE_AFTER,
+    ).update(status=EnrichmentJob.Status.QUEUED, run_after=timezone.now())
+
+
+def claim_job() -> typing.Optional[EnrichmentJob]:
+    """Claim the queued job with the highest priority which is due, if any."""
+
+    now = timezone.now()
+    candidates = EnrichmentJob.objects.filter(
+        status=EnrichmentJob.Status.QUEUED, run_after__lte=now
+    ).order_by("-priority", "run_after", "pk")
+
+    for job in candidates[:CLAIM_CANDIDATES]:
+        # Only one worker gets to update it from queued.
+        claimed = EnrichmentJob.objects.filter(
+            pk=job.pk, status=EnrichmentJob.Status.QUEUED
+        ).update(
+            status=EnrichmentJob.Status.RUNNING,
+            attempts=job.attempts + 1,
+            started=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+    return None
+
+
+def run_job(job: EnrichmentJob):
+    """
+    Run claimed job, scheduling a retry when it fails.
+
+    Jobs are claimed and their results recorded in single updates, without holding
+    a transaction open while they run.
+    """
+
+    try:
+        obj = job.target
+        if obj is None:
+            # Deleted in the meantime, nothing to do.
+            logger.info("Skipping %s, its target no longer exists.", job)
+        else:
+            # Not in a transaction, which would stay open during the network
+            # requests of stages. Their writes are idempotent, so retries complete them.
+            STAGES[job.stage](obj)
+
+    except Exception as e:
+        logger.warning("Failed %s (attempt %d): %r", job, job.attempts, e)
+
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts < job.max_attempts:
+            job.status = EnrichmentJob.Status.QUEUED
+            job.run_after = timezone.now() + get_backoff(job.attempts)
+        else:
+            job.status = EnrichmentJob.Status.FAILED
+            job.finished = timezone.now()
+
+    else:
+        job.status = EnrichmentJob.Status.SUCCEEDED
+        job.finished = timezone.now()
+
+    job.save(update_fields=["status", "run_after", "last_error", "finished"])
+
+
+def run_next() -> typing.Optional[EnrichmentJob]:
+    """Claim and run the next job, returning it, or None when there's none due."""
+
+    job = claim_job()
+    if job:
+        run_job(job)
+
+    return job
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from tqdm import tqdm
+
+from plant_species.enrichment.wikidata import get_image, get_wikidata_entities
+from plant_species.models import IMAGE_FIELDS, Family, Genus, Species
+
+
+class Command(BaseCommand):
+    help = "Look up Wikidata entities of families, genera and species, adding their labels as common names."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only look up those without a Wikidata id.",
+        )
+        parser.add_argument(
+            "--images",
+            action="store_true",
+            help="Download Wikidata images for those without an image.",
+        )
+
+    def handle(self, *args, **options):
+        linked = images = 0
+
+        for model in [Family, Genus, Species]:
+            queryset = model.objects.order_by("pk")
+            if options["missing"]:
+                queryset = queryset.filter(wikidata_id="")
+
+            objs = list(queryset)
+            # All at once, in a few batched requests, rather than one by one.
+            entities = get_wikidata_entities(obj.gbif_id for obj in objs)
+
+            for obj in tqdm(objs, desc=model._meta.verbose_name_plural):
+                entity = entities.get(obj.gbif_id)
+                if not entity:
+                    continue
+
+                obj.set_wikidata_entity(entity)
+                obj.wikidata_id = entity.id
+                update_fields = ["wikidata_id"]
+
+                if options["images"] and not obj.image:
+                    image_file = get_image(entity)
+                    if image_file:
+                        obj.set_image(image_file)
+                        update_fields += IMAGE_FIELDS
+                        images += 1
+
+                obj.save(update_fields=update_fields)
+                obj.enrich_wikidata_common_names()
+                linked += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Linked {linked} families, genera and species to Wikidata, added {images} images."
+            )
+        )
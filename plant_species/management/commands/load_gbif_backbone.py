@@ -0,0 +1,90 @@
+import contextlib
+import io
+import typing
+import zipfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from tqdm import tqdm
+
+from plant_species.backbone import BATCH_SIZE, load_backbone, read_tsv
+
+TAXON_FILE = "Taxon.tsv"
+VERNACULAR_NAME_FILE = "VernacularName.tsv"
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the plants of a GBIF Backbone Taxonomy dump into the local mirror, "
+        "used to resolve names when GBIF_BACKEND is 'local'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "backbone",
+            type=Path,
+            help=f"The backbone.zip Darwin Core Archive, or a directory with its {TAXON_FILE} and {VERNACULAR_NAME_FILE}.",
+        )
+        parser.add_argument(
+            "--no-vernacular-names",
+            action="store_true",
+            help="Skip loading vernacular names.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Rows inserted at once (default: {BATCH_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["backbone"]
+        if not path.exists():
+            raise CommandError(f"No such file or directory: '{path}'.")
+
+        with contextlib.ExitStack() as stack:
+            taxon_file = stack.enter_context(self._open(path, TAXON_FILE))
+            taxon_rows = tqdm(read_tsv(taxon_file), desc="Taxa", unit=" rows")
+
+            vernacular_name_rows: typing.Iterable = ()
+            if not options["no_vernacular_names"]:
+                vernacular_name_file = stack.enter_context(
+                    self._open(path, VERNACULAR_NAME_FILE)
+                )
+                vernacular_name_rows = tqdm(
+                    read_tsv(vernacular_name_file),
+                    desc="Vernacular names",
+                    unit=" rows",
+                )
+
+            taxon_count, vernacular_name_count = load_backbone(
+                taxon_rows, vernacular_name_rows, batch_size=options["batch_size"]
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {taxon_count} plant taxa and {vernacular_name_count} vernacular names."
+            )
+        )
+
+    @contextlib.contextmanager
+    def _open(self, path: Path, name: str) -> typing.Iterator[typing.TextIO]:
+        """Stream a data file of the archive, or of the directory it was extracted to."""
+
+        if path.is_dir():
+            if not (path / name).exists():
+                raise CommandError(f"No {name} in '{path}'.")
+
+            with open(path / name, encoding="utf-8", newline="") as file:
+                yield file
+
+            return
+
+        with zipfile.ZipFile(path) as archive:
+            try:
+                member = archive.open(name)
+            except KeyError:
+                raise CommandError(f"No {name} in '{path}'.")
+
+            with io.TextIOWrapper(member, encoding="utf-8", newline="") as file:
+                yield file
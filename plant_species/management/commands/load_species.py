@@ -1,4 +1,18 @@
+import itertools
+import os
+import typing
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from typing import Type
+import pyvips
+import requests
+from django.conf import settings
 from django.forms import ValidationError
 from tqdm import tqdm
 from pathlib import Path
@@ -6,7 +20,11 @@ from pathlib import Path
 from django.core.management.base import BaseCommand
 
 from plant_species.enrichment.exceptions import SpeciesAlreadyExists, SpeciesNotFound
-from plant_species.models import Species
+from plant_species.enrichment.gbif import NameMatch, Rank, resolve_latin_names
+from plant_species.enrichment.prefetch import PrefetchedSpecies, prefetch_species
+from plant_species.enrichment.wikidata import get_wikidata_entities
+from plant_species.images import get_derivatives, render_derivatives
+from plant_species.models import IMAGE_FIELDS, Species
 
 # Path to species_list.txt, getting current directory where script resides.
 species_txt = Path(__file__).resolve().parent.parent.parent.parent / "species_list.txt"
@@ -24,6 +42,42 @@ def _validationerror_is(e: ValidationError, is_type: Type[Exception]) -> bool:
     )
 
 
+class Checkpoint:
+    """Append-only record of handled species names, allowing interrupted runs to resume."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self.names: typing.Set[str] = set()
+        if path.exists():
+            with open(path, "r") as checkpoint_file:
+                self.names = {line.strip() for line in checkpoint_file}
+
+        self._file = open(path, "a")
+
+    def __contains__(self, species_name: str) -> bool:
+        return species_name in self.names
+
+    def add(self, species_name: str):
+        self.names.add(species_name)
+        self._file.write(f"{species_name}\n")
+        # Flush right away, so the checkpoint survives a hard interrupt.
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "Checkpoint":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
 class Command(BaseCommand):
     help = "Idempotent loading of species data."
 
@@ -35,6 +89,24 @@ class Command(BaseCommand):
             default=str(species_txt),
             help="The file to load species from (default: species_list.txt)",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of threads fetching GBIF and Wikipedia data concurrently (default: 1, serial).",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            type=str,
+            default=None,
+            help="File recording handled species, to resume interrupted runs (default: <filename>.checkpoint).",
+        )
+        parser.add_argument(
+            "--image-processes",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of processes rendering image derivatives, 0 renders them inline (default: number of CPUs).",
+        )
 
     def handle(self, *args, **options):
         filename = options["filename"]
@@ -47,44 +119,255 @@ class Command(BaseCommand):
             s.strip() for s in species_list if not s.lstrip().startswith("#")
         ]
 
-        add_count = 0
-        notfound_count = 0
-        synonym_count = 0
-
-        with tqdm(species_list) as pbar:
-            for species_name in pbar:
-                if not Species.objects.filter(latin_name=species_name).exists():
-                    pbar.set_description(f"Adding '{species_name}'")
-
-                    species = Species(latin_name=species_name)
-
-                    # Do this before full_clean to properly capture SpeciesAlreadyExists.
-                    try:
-                        species.full_clean()
-                    except ValidationError as e:
-                        if _validationerror_is(e, SpeciesAlreadyExists):
-                            synonym_count += 1
-                            pbar.write(f"Skipping existing synonym: {species_name}")
-                            continue
-                        if _validationerror_is(e, SpeciesNotFound):
-                            notfound_count += 1
-                            pbar.write(f"Skipping unresolving: {species_name}")
-                            continue
-
-                        # Unexpected exception, re-raise.
-                        raise Exception(
-                            f"ValidationError for {species_name}: {str(e)}"
-                        ) from e
-
-                    species.save()
-                    species.enrich_related()
-
-                    add_count += 1
-                else:
-                    pbar.write(f"Skipping existing species: {species_name}")
+        self.add_count = 0
+        self.notfound_count = 0
+        self.synonym_count = 0
+
+        # Closed when interrupted too, keeping the species handled until then.
+        with Checkpoint(
+            Path(options["checkpoint"] or f"{filename}.checkpoint")
+        ) as checkpoint:
+            self.checkpoint = checkpoint
+            self._load_list(species_list, options)
+
+            # Completed, no need to resume.
+            checkpoint.remove()
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Successfully added {add_count} new species out of {len(species_list)} in the list, skipped {synonym_count} synonyms and {notfound_count} not found."
+                f"Successfully added {self.add_count} new species out of {len(species_list)} in the list, skipped {self.synonym_count} synonyms and {self.notfound_count} not found."
+            )
+        )
+
+    def _load_list(self, species_list: typing.List[str], options: dict):
+        """Load species in the list which weren't handled by an interrupted run."""
+
+        # A single query instead of checking existence for every name.
+        existing_names = set(Species.objects.values_list("latin_name", flat=True))
+        # Added by an interrupted run before their derivatives were stored.
+        unrendered = {
+            species.latin_name: species
+            for species in Species.objects.exclude(image="").filter(image_large="")
+        }
+
+        pending = []
+        rerender = []
+        # Names queued in pending or rerender, so duplicates in the list are skipped.
+        queued: typing.Set[str] = set()
+        for species_name in species_list:
+            if species_name in self.checkpoint or species_name in queued:
+                continue
+
+            queued.add(species_name)
+
+            if species_name in unrendered:
+                rerender.append((species_name, unrendered[species_name]))
+                continue
+
+            if species_name in existing_names:
+                self.stdout.write(f"Skipping existing species: {species_name}")
+                self.checkpoint.add(species_name)
+                continue
+
+            pending.append(species_name)
+
+        if len(pending) < len(species_list):
+            self.stdout.write(
+                f"Skipping {len(species_list) - len(pending)} species already handled."
+            )
+
+        self.image_processes = options["image_processes"]
+        self.image_executor = None
+        if self.image_processes:
+            self.image_executor = ProcessPoolExecutor(max_workers=self.image_processes)
+        self.image_jobs: typing.Dict[Future, typing.Tuple[str, Species]] = {}
+
+        try:
+            self._load(pending, rerender, options["workers"])
+        finally:
+            if self.image_executor:
+                self.image_executor.shutdown()
+
+    def _load(
+        self,
+        pending: typing.List[str],
+        rerender: typing.List[typing.Tuple[str, Species]],
+        workers: int,
+    ):
+        with tqdm(total=len(pending) + len(rerender)) as pbar:
+            for species_name, species in rerender:
+                pbar.set_description(f"Rendering images of '{species_name}'")
+                self._render_image_derivatives(species_name, species, pbar)
+                pbar.update()
+
+            if workers > 1:
+                pbar.set_description("Resolving names")
+                matches = resolve_latin_names(pending, Rank.SPECIES, workers)
+                results = self._prefetch(pending, matches, workers)
+            else:
+                # Fetch inline, during full_clean().
+                results = ((species_name, None) for species_name in pending)
+
+            for species_name, prefetched in results:
+                pbar.set_description(f"Adding '{species_name}'")
+
+                self._add_species(species_name, prefetched, pbar)
+
+                self._apply_image_derivatives(pbar)
+
+                pbar.update()
+
+            pbar.set_description("Rendering images")
+            self._apply_image_derivatives(pbar, return_when=ALL_COMPLETED)
+
+    def _prefetch(
+        self,
+        species_names: typing.List[str],
+        matches: typing.Dict[str, NameMatch],
+        workers: int,
+    ) -> typing.Iterator[typing.Tuple[str, PrefetchedSpecies | SpeciesNotFound]]:
+        """Fetch network data in a bounded thread pool, yielding results as they complete."""
+
+        enabled_languages = [lang[0] for lang in settings.LANGUAGES]
+
+        # Look up Wikidata entities in a few batches, rather than one by one.
+        wikidata_entities = None
+        try:
+            wikidata_entities = get_wikidata_entities(
+                match.latin_names["speciesKey"]
+                for match in matches.values()
+                if match.is_exact
             )
+        except requests.RequestException as e:
+            self.stderr.write(f"Failed looking up Wikidata entities: {e!r}")
+
+        def _fetch(species_name: str) -> PrefetchedSpecies | SpeciesNotFound:
+            match = matches[species_name]
+            if not match.is_exact:
+                return SpeciesNotFound(species_name)
+
+            try:
+                return prefetch_species(
+                    species_name,
+                    enabled_languages,
+                    match.latin_names,
+                    wikidata_entities=wikidata_entities,
+                )
+            except SpeciesNotFound as e:
+                return e
+
+        names = iter(species_names)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Limit the number of results (with images) held in memory.
+            in_flight: typing.Dict[Future, str] = {
+                executor.submit(_fetch, species_name): species_name
+                for species_name in itertools.islice(names, workers * 2)
+            }
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    species_name = in_flight.pop(future)
+
+                    for next_name in itertools.islice(names, 1):
+                        in_flight[executor.submit(_fetch, next_name)] = next_name
+
+                    yield species_name, future.result()
+
+    def _add_species(
+        self,
+        species_name: str,
+        prefetched: PrefetchedSpecies | SpeciesNotFound | None,
+        pbar: tqdm,
+    ):
+        """
+        Create and enrich species from the (single) writing thread.
+
+        Species are checkpointed once handled, after their image derivatives are
+        stored when rendered by the process pool.
+        """
+
+        if isinstance(prefetched, SpeciesNotFound):
+            self.notfound_count += 1
+            pbar.write(f"Skipping unresolving: {species_name}")
+            self.checkpoint.add(species_name)
+            return
+
+        species = Species(latin_name=species_name)
+        species.prefetched = prefetched
+        species.defer_image_derivatives = self.image_executor is not None
+
+        # Do this before full_clean to properly capture SpeciesAlreadyExists.
+        try:
+            species.full_clean()
+        except ValidationError as e:
+            if _validationerror_is(e, SpeciesAlreadyExists):
+                self.synonym_count += 1
+                pbar.write(f"Skipping existing synonym: {species_name}")
+                self.checkpoint.add(species_name)
+                return
+            if _validationerror_is(e, SpeciesNotFound):
+                self.notfound_count += 1
+                pbar.write(f"Skipping unresolving: {species_name}")
+                self.checkpoint.add(species_name)
+                return
+
+            # Unexpected exception, re-raise.
+            raise Exception(f"ValidationError for {species_name}: {str(e)}") from e
+
+        species.save()
+        species.enrich_related()
+        self.add_count += 1
+
+        if self.image_executor and species.image:
+            self._render_image_derivatives(species_name, species, pbar)
+        else:
+            self.checkpoint.add(species_name)
+
+    def _render_image_derivatives(
+        self, species_name: str, species: Species, pbar: tqdm
+    ):
+        """Render derivatives in the process pool, or inline without one."""
+
+        if not self.image_executor:
+            species.set_image_derivatives(
+                render_derivatives(species.get_image_source(), get_derivatives())
+            )
+            species.save(update_fields=IMAGE_FIELDS)
+            self.checkpoint.add(species_name)
+            return
+
+        # Limit the number of pending jobs (and their sources) held in memory.
+        if len(self.image_jobs) >= self.image_processes * 2:
+            self._apply_image_derivatives(pbar, return_when=FIRST_COMPLETED)
+
+        future = self.image_executor.submit(
+            render_derivatives, species.get_image_source(), get_derivatives()
         )
+        self.image_jobs[future] = (species_name, species)
+
+    def _apply_image_derivatives(self, pbar: tqdm, return_when: str | None = None):
+        """Store derivatives of finished image jobs, waiting for them when return_when is given."""
+
+        if not self.image_jobs:
+            return
+
+        if return_when:
+            done, _ = wait(self.image_jobs, return_when=return_when)
+        else:
+            done = [future for future in self.image_jobs if future.done()]
+
+        for future in done:
+            species_name, species = self.image_jobs.pop(future)
+
+            try:
+                rendered = future.result()
+            except pyvips.Error as e:
+                pbar.write(f"Failed rendering image for {species.latin_name}: {e}")
+            else:
+                species.set_image_derivatives(rendered)
+                species.save(update_fields=IMAGE_FIELDS)
+
+            self.checkpoint.add(species_name)
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from plant_species.archive import APP_LABELS, PARTITION_SIZE, build_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Build or update an archive of species data and images, only compressing "
+        "and copying what changed since the previous build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output",
+            nargs="?",
+            type=Path,
+            default=Path("species_data_archive"),
+            help="Archive directory (default: species_data_archive).",
+        )
+        parser.add_argument(
+            "--partition-size",
+            type=int,
+            default=PARTITION_SIZE,
+            help=f"Objects per fixture partition, by primary key (default: {PARTITION_SIZE}).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of threads compressing and copying files (default: number of CPUs).",
+        )
+
+    def handle(self, *args, **options):
+        stats = build_archive(
+            options["output"],
+            APP_LABELS,
+            partition_size=options["partition_size"],
+            workers=options["workers"],
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compressed {stats.fixtures_compressed} fixture partitions "
+                f"(reused {stats.fixtures_reused}), copied {stats.media_copied} "
+                f"media files (reused {stats.media_reused})."
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from plant_species.models import SpeciesSearchTerm
+from plant_species.search import rebuild_search_terms
+
+
+class Command(BaseCommand):
+    help = "Rebuild the species search index from their names."
+
+    def handle(self, *args, **options):
+        rebuild_search_terms()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {SpeciesSearchTerm.objects.count()} search terms."
+            )
+        )
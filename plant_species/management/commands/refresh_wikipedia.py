@@ -0,0 +1,131 @@
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from tqdm import tqdm
+
+from plant_species.enrichment.wikidata import WikidataEntity, get_wikidata_entities
+from plant_species.enrichment.wikipedia import (
+    WikipediaPage,
+    get_wikipedia_languages,
+    get_wikipedia_page,
+)
+from plant_species.models import (
+    WIKIPEDIA_FIELDS,
+    Family,
+    Genus,
+    Species,
+    SpeciesBase,
+)
+
+# Objects whose entities are looked up in one batch, and pages requested ahead of
+# storing them.
+CHUNK_SIZE = 50
+
+
+class Command(BaseCommand):
+    help = "Fetch and store Wikipedia summaries of families, genera and species, in all configured languages."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only fetch summaries never fetched before.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Number of summaries fetched concurrently (default: 8).",
+        )
+
+    def handle(self, *args, **options):
+        languages = get_wikipedia_languages()
+        updated = failed = 0
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            for model in [Family, Genus, Species]:
+                queryset = model.objects.order_by("pk").only(
+                    "pk",
+                    "latin_name",
+                    "gbif_id",
+                    "description",
+                    "wikidata_id",
+                    *WIKIPEDIA_FIELDS,
+                )
+                if options["missing"]:
+                    queryset = queryset.filter(wikipedia_updated=None)
+
+                objs = list(queryset)
+                pbar = tqdm(total=len(objs), desc=model._meta.verbose_name_plural)
+
+                for start in range(0, len(objs), CHUNK_SIZE):
+                    chunk = objs[start : start + CHUNK_SIZE]
+                    entities = self._get_entities(chunk, pbar)
+
+                    # All pages of all objects in the chunk at once.
+                    fetches: typing.List[typing.Dict[str, Future]] = []
+                    for obj in chunk:
+                        entity = entities.get(obj.gbif_id)
+                        obj.wikidata_id = entity.id if entity else ""
+                        # Titles linked from Wikidata, rather than guessed.
+                        titles = (
+                            entity.sitelinks
+                            if entity
+                            else dict.fromkeys(languages, obj.latin_name)
+                        )
+
+                        fetches.append(
+                            {
+                                language: executor.submit(
+                                    get_wikipedia_page, titles[language], language
+                                )
+                                for language in languages
+                                if language in titles
+                            }
+                        )
+
+                    for obj, futures in zip(chunk, fetches):
+                        try:
+                            pages: typing.Dict[str, WikipediaPage] = {
+                                language: page
+                                for language, future in futures.items()
+                                if (page := future.result())
+                            }
+                        except Exception as e:
+                            # Keep what was stored, try again next time.
+                            pbar.write(f"Failed fetching {obj.latin_name}: {e!r}")
+                            failed += 1
+                        else:
+                            obj.enrich_wikipedia(pages)
+                            obj.save(
+                                update_fields=[
+                                    "description",
+                                    "wikidata_id",
+                                    *WIKIPEDIA_FIELDS,
+                                ]
+                            )
+                            updated += 1
+
+                        pbar.update()
+
+                pbar.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed Wikipedia summaries of {updated} families, genera and species in {len(languages)} languages, {failed} failed."
+            )
+        )
+
+    def _get_entities(
+        self, chunk: typing.List[SpeciesBase], pbar: tqdm
+    ) -> typing.Dict[int, WikidataEntity]:
+        """Wikidata entities of a chunk of objects, in one batch."""
+
+        try:
+            return get_wikidata_entities(obj.gbif_id for obj in chunk)
+        except requests.RequestException as e:
+            # Guess pages by name instead.
+            pbar.write(f"Failed looking up Wikidata entities: {e!r}")
+            return {}
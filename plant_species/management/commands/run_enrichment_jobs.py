@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from plant_species.jobs import requeue_stale, run_next
+from plant_species.models import EnrichmentJob
+
+
+class Command(BaseCommand):
+    help = "Run queued enrichment jobs, e.g. of species added through the admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait for new jobs when the queue is empty (default: 5).",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit when no jobs are due, rather than waiting for new ones.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Exit after running this many jobs, e.g. to release memory.",
+        )
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Queued {requeued} stale jobs again.")
+
+        count = 0
+        while options["max_jobs"] is None or count < options["max_jobs"]:
+            job = run_next()
+
+            if job is None:
+                if options["burst"]:
+                    break
+
+                time.sleep(options["poll_interval"])
+                continue
+
+            count += 1
+            self.stdout.write(f"{job}: {job.get_status_display()}")
+            if job.status != EnrichmentJob.Status.SUCCEEDED:
+                self.stdout.write(self.style.WARNING(job.last_error))
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs."))
@@ -0,0 +1,47 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("plant_species", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpeciesSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=255, verbose_name="term")),
+                ("weight", models.PositiveSmallIntegerField(verbose_name="weight")),
+                (
+                    "species",
+                    models.ForeignKey(
+                        db_column="species_uuid",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        to="plant_species.species",
+                        to_field="uuid",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "species search term",
+                "verbose_name_plural": "species search terms",
+                "indexes": [
+                    models.Index(
+                        fields=["term", "weight", "species"],
+                        name="speciessearchterm_term",
+                    )
+                ],
+            },
+        ),
+    ]
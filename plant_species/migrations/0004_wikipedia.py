@@ -0,0 +1,133 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("plant_species", "0003_enrichmentjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="family",
+            name="wikipedia_pageid",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia page id"
+            ),
+        ),
+        migrations.AddField(
+            model_name="family",
+            name="wikipedia_summaries",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Wikipedia summaries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="family",
+            name="wikipedia_title",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="Wikipedia title",
+            ),
+        ),
+        migrations.AddField(
+            model_name="family",
+            name="wikipedia_updated",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia updated"
+            ),
+        ),
+        migrations.AddField(
+            model_name="family",
+            name="wikipedia_url",
+            field=models.URLField(
+                blank=True, editable=False, max_length=500, verbose_name="Wikipedia URL"
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikipedia_pageid",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia page id"
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikipedia_summaries",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Wikipedia summaries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikipedia_title",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="Wikipedia title",
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikipedia_updated",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia updated"
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikipedia_url",
+            field=models.URLField(
+                blank=True, editable=False, max_length=500, verbose_name="Wikipedia URL"
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikipedia_pageid",
+            field=models.PositiveIntegerField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia page id"
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikipedia_summaries",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                verbose_name="Wikipedia summaries",
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikipedia_title",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=255,
+                verbose_name="Wikipedia title",
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikipedia_updated",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Wikipedia updated"
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikipedia_url",
+            field=models.URLField(
+                blank=True, editable=False, max_length=500, verbose_name="Wikipedia URL"
+            ),
+        ),
+    ]
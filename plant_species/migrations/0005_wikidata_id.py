@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("plant_species", "0004_wikipedia"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="family",
+            name="wikidata_id",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, verbose_name="Wikidata id"
+            ),
+        ),
+        migrations.AddField(
+            model_name="genus",
+            name="wikidata_id",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, verbose_name="Wikidata id"
+            ),
+        ),
+        migrations.AddField(
+            model_name="species",
+            name="wikidata_id",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, verbose_name="Wikidata id"
+            ),
+        ),
+    ]
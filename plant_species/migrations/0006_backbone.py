@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("plant_species", "0005_wikidata_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BackboneVernacularName",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "taxon_id",
+                    models.PositiveBigIntegerField(db_index=True, verbose_name="taxon"),
+                ),
+                ("name", models.CharField(max_length=255, verbose_name="name")),
+                ("language", models.CharField(max_length=3, verbose_name="language")),
+            ],
+            options={
+                "verbose_name": "GBIF backbone vernacular name",
+                "verbose_name_plural": "GBIF backbone vernacular names",
+            },
+        ),
+        migrations.CreateModel(
+            name="BackboneTaxon",
+            fields=[
+                (
+                    "id",
+                    models.PositiveBigIntegerField(primary_key=True, serialize=False),
+                ),
+                (
+                    "canonical_name",
+                    models.CharField(max_length=255, verbose_name="canonical name"),
+                ),
+                ("scientific_name", models.TextField(verbose_name="scientific name")),
+                ("rank", models.CharField(max_length=32, verbose_name="rank")),
+                (
+                    "taxonomic_status",
+                    models.CharField(max_length=32, verbose_name="taxonomic status"),
+                ),
+                (
+                    "accepted_id",
+                    models.PositiveBigIntegerField(
+                        null=True, verbose_name="accepted taxon"
+                    ),
+                ),
+                (
+                    "family",
+                    models.CharField(blank=True, max_length=255, verbose_name="family"),
+                ),
+                (
+                    "genus",
+                    models.CharField(blank=True, max_length=255, verbose_name="genus"),
+                ),
+            ],
+            options={
+                "verbose_name": "GBIF backbone taxon",
+                "verbose_name_plural": "GBIF backbone taxa",
+                "indexes": [
+                    models.Index(
+                        fields=["canonical_name", "rank", "taxonomic_status"],
+                        name="backbonetaxon_name",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,20 +1,24 @@
 import logging
 import typing
 
+from django.core.files import File
 from django.core.files.base import ContentFile
-import pyvips
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.forms import ValidationError
 from django.template.defaultfilters import slugify
-from django.db import models, transaction
+from django.db import IntegrityError, models, transaction
+from django.db.models import Prefetch
 from django.db.models.query import Q
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.utils.functional import cached_property
 from django.utils.translation import get_language
 from django.contrib import admin
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
 
 from plant_species.enrichment.exceptions import (
     EnrichmentException,
@@ -28,7 +32,19 @@ from plant_species.enrichment.gbif import (
     Rank,
 )
 
-from plant_species.enrichment.wikipedia import get_wikipedia_page
+from plant_species.enrichment.wikidata import (
+    WikidataEntity,
+    get_wikidata_entity,
+    get_image as get_wikidata_image,
+)
+from plant_species.enrichment.wikipedia import (
+    WikipediaPage,
+    get_wikipedia_language,
+    get_wikipedia_languages,
+    get_wikipedia_pages,
+)
+from plant_species.images import get_derivatives, render_derivatives
+from plant_species.singleflight import SingleFlight
 from treescape.models import UUIDIndexedModel, uuid_image_path_generator
 
 
@@ -74,7 +90,25 @@ class CommonNameBase(UUIDIndexedModel):
             return super().save(*args, **kwargs)
 
 
-class SpeciesManager(models.Manager):
+def _get_current_language() -> str:
+    # Somehow, sometimes this is None, in which case we'll default to English.
+    return get_language() or "en"
+
+
+def _common_names_attr(language: str) -> str:
+    """Attribute holding prefetched common names for language."""
+    return f"_prefetched_common_names_{language.replace('-', '_')}"
+
+
+class SpeciesQuerySet(models.QuerySet):
+    def with_common_names(self, language: str | None = None):
+        """Prefetch common names in the (active) language, for query-free __str__()."""
+        return self.prefetch_related(
+            self.model.prefetch_common_names(language=language)
+        )
+
+
+class SpeciesManager(models.Manager.from_queryset(SpeciesQuerySet)):
     def get_by_natural_key(self, slug):
         return self.get(slug=slug)
 
@@ -82,6 +116,19 @@ class SpeciesManager(models.Manager):
         return self.get_or_create(slug=slug, defaults=kwargs)
 
 
+# Set by SpeciesBase.set_image(), besides extra derivatives stored by path.
+IMAGE_FIELDS = ["image", "image_large", "image_thumbnail"]
+
+# Set by SpeciesBase.enrich_wikipedia(), besides the description.
+WIKIPEDIA_FIELDS = [
+    "wikipedia_title",
+    "wikipedia_url",
+    "wikipedia_pageid",
+    "wikipedia_summaries",
+    "wikipedia_updated",
+]
+
+
 class SpeciesBase(UUIDIndexedModel):
     """Abstract base class for species models."""
 
@@ -91,6 +138,29 @@ class SpeciesBase(UUIDIndexedModel):
     slug = models.SlugField(_("slug"), max_length=255, unique=True, blank=True)
     description = models.TextField(_("description"), blank=True)
     gbif_id = models.IntegerField(_("GBIF usageKey"), editable=False, unique=True)
+
+    # Page in the default language, with summaries by Wikipedia language, stored so
+    # rendering never requires fetching them. See refresh_wikipedia.
+    wikipedia_title = models.CharField(
+        _("Wikipedia title"), max_length=255, blank=True, editable=False
+    )
+    wikipedia_url = models.URLField(
+        _("Wikipedia URL"), max_length=500, blank=True, editable=False
+    )
+    wikipedia_pageid = models.PositiveIntegerField(
+        _("Wikipedia page id"), null=True, blank=True, editable=False
+    )
+    wikipedia_summaries = models.JSONField(
+        _("Wikipedia summaries"), default=dict, blank=True, editable=False
+    )
+    wikipedia_updated = models.DateTimeField(
+        _("Wikipedia updated"), null=True, blank=True, editable=False
+    )
+    # Looked up by GBIF id, see enrich_wikidata.
+    wikidata_id = models.CharField(
+        _("Wikidata id"), max_length=16, blank=True, editable=False
+    )
+
     image = models.ImageField(
         upload_to=uuid_image_path_generator("plant_species/images/full/"),
         null=True,
@@ -111,8 +181,18 @@ class SpeciesBase(UUIDIndexedModel):
 
     objects = SpeciesManager()
 
+    # Network data fetched ahead of time by concurrent importers, used instead of
+    # querying GBIF and Wikipedia during enrichment.
+    prefetched: "PrefetchedSpecies | None" = None
+    # Leave rendering image derivatives to the caller, e.g. a process pool.
+    defer_image_derivatives = False
+    # Only look up the GBIF backbone when cleaning, queueing slow enrichment stages
+    # as jobs, e.g. when adding through the admin.
+    defer_enrichment = False
+
     if typing.TYPE_CHECKING:
         from django.db.models.manager import RelatedManager
+        from plant_species.enrichment.prefetch import PrefetchedSpecies
 
         common_names: RelatedManager[CommonNameBase]
         _rank: Rank
@@ -125,26 +205,34 @@ class SpeciesBase(UUIDIndexedModel):
         common_name = self.get_common_name()
 
         if common_name:
-            return f"{self.latin_name} ({self.get_common_name()})"
+            return f"{self.latin_name} ({common_name})"
 
         return self.latin_name
 
     @admin.display(description=_("Common Name"))
     def get_common_name(self) -> str | None:
-        """Return common name for currently used language."""
+        """
+        Return common name for currently used language.
 
-        assert self.pk
+        Uses names loaded by prefetch_common_names(), otherwise queries once per
+        language and remembers the result on the instance.
+        """
 
-        current_lang = get_language()
+        assert self.pk
 
-        if not current_lang:
-            # Somehow, sometimes this is None, in which case we'll default to English.
-            current_lang = "en"
+        current_lang = _get_current_language()
+        attr = _common_names_attr(current_lang)
 
-        common_name = self.common_names.filter(
-            Q(language=current_lang) | Q(language=current_lang[:2])
-        ).first()
+        prefetched = getattr(self, attr, None)
+        if prefetched is None:
+            prefetched = list(
+                self.common_names.filter(
+                    Q(language=current_lang) | Q(language=current_lang[:2])
+                )[:1]
+            )
+            setattr(self, attr, prefetched)
 
+        common_name = prefetched[0] if prefetched else None
         if not common_name:
             return None
 
@@ -152,6 +240,38 @@ class SpeciesBase(UUIDIndexedModel):
 
         return common_name.name
 
+    @classmethod
+    def prefetch_common_names(
+        cls, lookup: str = "common_names", language: str | None = None
+    ) -> Prefetch:
+        """
+        Prefetch common names in the (active) language, as used by get_common_name().
+
+        The lookup is relative to the queried model, e.g. `species__common_names` for plants.
+        """
+
+        language = language or _get_current_language()
+        common_name_model = cls._meta.get_field("common_names").related_model
+
+        return Prefetch(
+            lookup,
+            queryset=common_name_model.objects.filter(
+                Q(language=language) | Q(language=language[:2])
+            ),
+            to_attr=_common_names_attr(language),
+        )
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.clear_common_name_cache()
+        super().refresh_from_db(*args, **kwargs)
+
+    def clear_common_name_cache(self):
+        """Forget common names remembered by get_common_name()."""
+        for attr in [
+            attr for attr in vars(self) if attr.startswith(_common_names_attr(""))
+        ]:
+            delattr(self, attr)
+
     @admin.display(
         description="GBIF",
     )
@@ -169,25 +289,61 @@ class SpeciesBase(UUIDIndexedModel):
     def wikipedia_link(self) -> str | None:
         """Get link for species Wikipedia page."""
 
-        if self.wikipedia_page:
-            return mark_safe(
-                f'<a target="_blank" href="{self.wikipedia_page.url}">{self.wikipedia_page.title}</a>'
+        if self.wikipedia_url:
+            return format_html(
+                '<a target="_blank" href="{}">{}</a>',
+                self.wikipedia_url,
+                self.wikipedia_title,
+            )
+        return _("Not available.")
+
+    @admin.display(
+        description="Wikidata",
+    )
+    def wikidata_link(self) -> str | None:
+        if self.wikidata_id:
+            return format_html(
+                '<a target="_blank" href="https://www.wikidata.org/wiki/{}">{}</a>',
+                self.wikidata_id,
+                self.wikidata_id,
             )
+
         return _("Not available.")
 
-    # TODO: Query Wikidata
-    # Options:
-    # a) https://www.gbif.org/api/wikidata/species/2945453?locale=en (undocumented)
-    # b) https://query.wikidata.org/#SELECT%20DISTINCT%20%3Fsubject%20WHERE%20%7B%20%3Fsubject%20wdt%3AP846%20%274481106%27%7D
-    #    this gets the id, then query the contents
-    #    https://www.wikidata.org/w/api.php?action=wbgetentities&ids=Q732867&format=json
-    # Ref: https://discourse.gbif.org/t/given-a-gbif-human-readable-webpage-for-a-species-how-to-find-the-api-call-for-each-item-on-the-page/3134/11
+    def get_wikidata_entity(self) -> WikidataEntity | None:
+        """Wikidata entity by GBIF id, looked up once per instance unless prefetched."""
+
+        if self.prefetched:
+            return self.prefetched.wikidata_entity
 
-    @cached_property
-    def wikipedia_page(self):
-        assert self.latin_name, "latin_name needs to be set"
+        if not hasattr(self, "_wikidata_entity"):
+            assert isinstance(self.gbif_id, int), "gbif_id not an integer"
+            self._wikidata_entity = get_wikidata_entity(self.gbif_id)
 
-        return get_wikipedia_page(self.latin_name)
+        return self._wikidata_entity
+
+    def set_wikidata_entity(self, entity: WikidataEntity | None):
+        """Use an entity from a batched lookup, rather than looking it up again."""
+        self._wikidata_entity = entity
+
+    def get_wikipedia_summary(self, language: str | None = None) -> str | None:
+        """Stored Wikipedia summary in language, by default the default language."""
+
+        language = get_wikipedia_language(language or settings.LANGUAGE_CODE)
+        return self.wikipedia_summaries.get(language)
+
+    def set_wikipedia_pages(self, pages: typing.Dict[str, WikipediaPage]):
+        """Store Wikipedia pages by Wikipedia language, without saving the instance."""
+
+        page = pages.get(get_wikipedia_language(settings.LANGUAGE_CODE))
+
+        self.wikipedia_title = page.title if page else ""
+        self.wikipedia_url = page.url if page else ""
+        self.wikipedia_pageid = page.pageid if page else None
+        self.wikipedia_summaries = {
+            language: language_page.summary for language, language_page in pages.items()
+        }
+        self.wikipedia_updated = timezone.now()
 
     @admin.display(
         description="Thumbnail",
@@ -216,7 +372,10 @@ class SpeciesBase(UUIDIndexedModel):
             return
 
         assert self.latin_name, "Species name required to enrich data."
-        species_data = get_latin_names(self.latin_name, self._rank)
+        if self.prefetched:
+            species_data = self.prefetched.species_data
+        else:
+            species_data = get_latin_names(self.latin_name, self._rank)
 
         self.gbif_id = next(
             filter(
@@ -257,11 +416,11 @@ class SpeciesBase(UUIDIndexedModel):
         assert self.latin_name, "Latin name should never be empty."
 
         if self._rank is Rank.SPECIES:
-            self.genus = _get_genus(species_data)
+            self.genus = _get_genus(species_data, defer=self.defer_enrichment)
             assert self.genus, "Returned plant species should never be null."
 
         elif self._rank is Rank.GENUS:
-            self.family = _get_family(species_data)
+            self.family = _get_family(species_data, defer=self.defer_enrichment)
             assert self.family, "Returned plant family should never be null."
 
         else:
@@ -273,46 +432,75 @@ class SpeciesBase(UUIDIndexedModel):
             # Skip existing images.
             return
 
-        LARGE_SIZE = 2048
-        THUMBNAIL_SIZE = 512
-
         assert isinstance(self.gbif_id, int), "gbif_id not an integer"
-        image_content_file = get_image(self.gbif_id)
+        if self.prefetched:
+            image_content_file = self.prefetched.image
+        else:
+            image_content_file = get_image(self.gbif_id)
+            if not image_content_file:
+                entity = self.get_wikidata_entity()
+                image_content_file = entity and get_wikidata_image(entity)
+
         if image_content_file:
-            assert self.latin_name
-            image_name = f"{slugify(self.latin_name)}.jpg"
-
-            logger.debug("Saving full image %s for %s", image_name, self.latin_name)
-            self.image.save(image_name, image_content_file)
-
-            # Since get_image now returns a ContentFile, we need to get the content
-            image_data = image_content_file.read()
-            image_content_file.seek(0)  # Reset the file pointer for future reads
-            
-            # Read single source image from bytes
-            vips_image = pyvips.Image.new_from_buffer(image_data, "")
-
-            logger.debug("Saving large image %s for %s", image_name, self.latin_name)
-            large_image = vips_image.thumbnail_image(
-                LARGE_SIZE,
-                height=LARGE_SIZE,
-                crop="attention",
-                size="down",
-            )
-            large_buffer = large_image.jpegsave_buffer(Q=85)
-            self.image_large.save(image_name, ContentFile(large_buffer))
+            self.set_image(image_content_file)
 
-            logger.debug(
-                "Saving thumbnail image %s for %s", image_name, self.latin_name
-            )
-            thumbnail_image = vips_image.thumbnail_image(
-                THUMBNAIL_SIZE,
-                height=THUMBNAIL_SIZE,
-                crop="attention",
-                size="down",
+    def set_image(self, image_content_file: File):
+        """Store image and, unless deferred, its derivatives, without saving the instance."""
+        assert self.latin_name
+        image_name = f"{slugify(self.latin_name)}.jpg"
+
+        logger.debug("Saving full image %s for %s", image_name, self.latin_name)
+        self.image.save(image_name, image_content_file, save=False)
+
+        if not self.defer_image_derivatives:
+            self.set_image_derivatives(
+                render_derivatives(self.get_image_source(), get_derivatives())
             )
-            thumbnail_buffer = thumbnail_image.jpegsave_buffer(Q=85)
-            self.image_thumbnail.save(image_name, ContentFile(thumbnail_buffer))
+
+    def get_image_source(self) -> bytes | str:
+        """Path of `image` when on local storage, its contents otherwise."""
+        try:
+            return self.image.path
+        except NotImplementedError:
+            with self.image.open("rb") as image_file:
+                return image_file.read()
+
+    def set_image_derivatives(self, rendered: typing.Dict[str, bytes]):
+        """Store rendered image derivatives, without saving the instance."""
+        assert self.latin_name
+
+        for derivative in get_derivatives():
+            if derivative.name not in rendered:
+                continue
+
+            logger.debug("Saving %s image for %s", derivative.name, self.latin_name)
+            content = ContentFile(rendered[derivative.name])
+
+            field_file = getattr(self, derivative.field_name, None)
+            if field_file is not None:
+                field_file.save(
+                    f"{slugify(self.latin_name)}.{derivative.extension}",
+                    content,
+                    save=False,
+                )
+            else:
+                path = derivative.get_path(self.uuid)
+                self.image.storage.delete(path)
+                self.image.storage.save(path, content)
+
+    def get_image_derivative_url(self, name: str) -> str | None:
+        """URL of a configured image derivative, if rendered."""
+        derivative = next(d for d in get_derivatives() if d.name == name)
+
+        field_file = getattr(self, derivative.field_name, None)
+        if field_file is not None:
+            return field_file.url if field_file else None
+
+        path = derivative.get_path(self.uuid)
+        if self.image.storage.exists(path):
+            return self.image.storage.url(path)
+
+        return None
 
     def enrich_gbif_common_names(self):
         """Fetch (missing) common names from GBIF in configured languages."""
@@ -322,7 +510,10 @@ class SpeciesBase(UUIDIndexedModel):
         enabled_languages = [lang[0] for lang in settings.LANGUAGES]
 
         assert isinstance(self.gbif_id, int), "gbif_id not an integer"
-        common_names = get_common_names(self.gbif_id, enabled_languages)
+        if self.prefetched:
+            common_names = self.prefetched.common_names
+        else:
+            common_names = get_common_names(self.gbif_id, enabled_languages)
 
         for name_data in common_names:
             self.common_names.get_or_create(
@@ -335,13 +526,63 @@ class SpeciesBase(UUIDIndexedModel):
                 },
             )
 
-    def enrich_wikipedia(self):
-        if not self.description and self.wikipedia_page:
+        self.clear_common_name_cache()
+
+    def enrich_wikipedia(self, pages: typing.Dict[str, WikipediaPage] | None = None):
+        """Store given Wikipedia pages, or fetch them once, and fill the description."""
+
+        if pages is None and self.wikipedia_updated is None:
+            assert self.latin_name, "latin_name needs to be set"
+
+            if self.prefetched:
+                pages = self.prefetched.wikipedia_pages
+            else:
+                # Titles linked from Wikidata, rather than guessed.
+                entity = self.get_wikidata_entity()
+                pages = get_wikipedia_pages(
+                    self.latin_name,
+                    get_wikipedia_languages(),
+                    titles=entity.sitelinks if entity else None,
+                )
+
+        if pages is not None:
+            self.set_wikipedia_pages(pages)
+
+        summary = self.get_wikipedia_summary()
+        if not self.description and summary:
             logger.debug("Adding description for %s from Wikipedia", self.latin_name)
-            self.description = self.wikipedia_page.summary.strip()
+            self.description = summary.strip()
+
+    def enrich_wikidata(self):
+        """Store the id of the Wikidata entity, if any."""
+
+        entity = self.get_wikidata_entity()
+        self.wikidata_id = entity.id if entity else ""
+
+    def enrich_wikidata_common_names(self):
+        """Add Wikidata labels in configured languages as (missing) common names."""
+        assert self.pk
+
+        entity = self.get_wikidata_entity()
+        if not entity:
+            return
+
+        for language, label in entity.labels.items():
+            # Taxa without a common name are labelled by their latin name.
+            if label.lower() == self.latin_name.lower():
+                continue
+
+            self.common_names.get_or_create(
+                language=language,
+                name__iexact=label.capitalize(),
+                defaults={"name": label.capitalize()},
+            )
+
+        self.clear_common_name_cache()
 
     def enrich(self):
         self.enrich_gbif_backbone()
+        self.enrich_wikidata()
         self.enrich_gbif_image()
         self.enrich_wikipedia()
 
@@ -349,11 +590,21 @@ class SpeciesBase(UUIDIndexedModel):
         assert self.pk, "Instance needs to be saved before enrich_related() is called."
 
         self.enrich_gbif_common_names()
+        self.enrich_wikidata_common_names()
+
+    def enqueue_enrichment(self, priority: int = 0):
+        """Queue slow enrichment stages and related data, after saving."""
+        assert self.pk, "Instance needs to be saved before its enrichment is queued."
+
+        EnrichmentJob.objects.enqueue(self, priority=priority)
 
     def clean(self):
         # Do this here in order to propagate user-friendly ValidationErrors.
         try:
-            self.enrich()
+            if self.defer_enrichment:
+                self.enrich_gbif_backbone()
+            else:
+                self.enrich()
         except EnrichmentException as e:
             raise ValidationError(e) from e
 
@@ -419,43 +670,88 @@ class Species(SpeciesBase):
     _rank = Rank.SPECIES
 
 
-def _get_family(species_data: dict) -> Family:
-    """Returns a Family instance based on GBIF species data."""
-    assert "familyKey" in species_data and species_data["familyKey"]
+# Creations of families and genera in flight, by model and GBIF id.
+_creating = SingleFlight()
+
+_M = typing.TypeVar("_M", bound=SpeciesBase)
 
-    try:
-        return Family.objects.get(gbif_id=species_data["familyKey"])
-    except Family.DoesNotExist:
-        obj = Family(
-            gbif_id=species_data["familyKey"],
-            latin_name=species_data["family"],
-        )
-        obj.full_clean()
-        obj.save()
 
+def _create_enriched(obj: SpeciesBase, defer: bool):
+    obj.defer_enrichment = defer
+    obj.full_clean()
+    obj.save()
+
+    if defer:
+        obj.enqueue_enrichment()
+    else:
         obj.enrich_related()
 
+
+def _get_or_create_enriched(
+    model: typing.Type[_M],
+    gbif_id: int,
+    build: typing.Callable[[], _M],
+    defer: bool,
+) -> _M:
+    """
+    Existing family or genus by GBIF id, or a new, enriched one.
+
+    Concurrent importers of the same family or genus wait for a single creation,
+    rather than each enriching it. Another process creating it in the meantime
+    fails validation or the insert, after which its instance is returned instead.
+    """
+
+    def get_or_create():
+        existing = model.objects.filter(gbif_id=gbif_id).first()
+        if existing:
+            return existing
+
+        obj = build()
+        try:
+            # Savepoint, so a conflicting insert doesn't break an outer transaction.
+            with transaction.atomic():
+                _create_enriched(obj, defer)
+        except (ValidationError, IntegrityError):
+            existing = model.objects.filter(gbif_id=gbif_id).first()
+            if existing:
+                return existing
+
+            raise
+
         return obj
 
+    return _creating.do((model._meta.label, gbif_id), get_or_create)
+
+
+def _get_family(species_data: dict, defer: bool = False) -> Family:
+    """Returns a Family instance based on GBIF species data."""
+    assert "familyKey" in species_data and species_data["familyKey"]
+
+    return _get_or_create_enriched(
+        Family,
+        species_data["familyKey"],
+        lambda: Family(
+            gbif_id=species_data["familyKey"],
+            latin_name=species_data["family"],
+        ),
+        defer,
+    )
 
-def _get_genus(species_data: dict) -> Genus:
+
+def _get_genus(species_data: dict, defer: bool = False) -> Genus:
     """Returns a Genus instance based on GBIF species data."""
     assert "genusKey" in species_data and species_data["genusKey"]
 
-    try:
-        return Genus.objects.get(gbif_id=species_data["genusKey"])
-    except Genus.DoesNotExist:
-        obj = Genus(
-            family=_get_family(species_data),
+    return _get_or_create_enriched(
+        Genus,
+        species_data["genusKey"],
+        lambda: Genus(
+            family=_get_family(species_data, defer),
             gbif_id=species_data["genusKey"],
             latin_name=species_data["genus"],
-        )
-        obj.full_clean()
-        obj.save()
-
-        obj.enrich_related()
-
-        return obj
+        ),
+        defer,
+    )
 
 
 class FamilyCommonName(CommonNameBase):
@@ -539,3 +835,165 @@ class SpeciesVariety(UUIDIndexedModel):
             "species",
             "name",
         )  # Assuming a species cannot have two varieties with the same name
+
+
+class SpeciesSearchTerm(models.Model):
+    """Normalized word from the names of a species, its genus or family, for searching."""
+
+    species = models.ForeignKey(
+        Species,
+        on_delete=models.CASCADE,
+        related_name="search_terms",
+        to_field="uuid",
+        db_column="species_uuid",
+    )
+    term = models.CharField(_("term"), max_length=255)
+    weight = models.PositiveSmallIntegerField(_("weight"))
+
+    def __str__(self):
+        return self.term
+
+    class Meta:
+        verbose_name = _("species search term")
+        verbose_name_plural = _("species search terms")
+        indexes = [
+            # Covers prefix lookups on term.
+            models.Index(
+                fields=["term", "weight", "species"], name="speciessearchterm_term"
+            ),
+        ]
+
+
+class EnrichmentJobManager(models.Manager):
+    def enqueue(
+        self,
+        obj: SpeciesBase,
+        stages: typing.Iterable[str] | None = None,
+        priority: int = 0,
+    ) -> typing.List["EnrichmentJob"]:
+        """Queue enrichment stages of obj, all by default, unless queued already."""
+
+        content_type = ContentType.objects.get_for_model(obj)
+        stages = list(stages or EnrichmentJob.Stage.values)
+
+        pending = set(
+            self.filter(
+                content_type=content_type,
+                object_id=obj.pk,
+                stage__in=stages,
+                status__in=[EnrichmentJob.Status.QUEUED, EnrichmentJob.Status.RUNNING],
+            ).values_list("stage", flat=True)
+        )
+
+        return self.bulk_create(
+            self.model(
+                content_type=content_type,
+                object_id=obj.pk,
+                stage=stage,
+                priority=priority,
+            )
+            for stage in stages
+            if stage not in pending
+        )
+
+
+class EnrichmentJob(models.Model):
+    """Slow enrichment stage of a family, genus or species, run by a worker."""
+
+    class Stage(models.TextChoices):
+        IMAGE = "image", _("GBIF image")
+        WIKIPEDIA = "wikipedia", _("Wikipedia description")
+        COMMON_NAMES = "common_names", _("GBIF common names")
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", _("queued")
+        RUNNING = "running", _("running")
+        SUCCEEDED = "succeeded", _("succeeded")
+        FAILED = "failed", _("failed")
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey("content_type", "object_id")
+
+    stage = models.CharField(_("stage"), max_length=32, choices=Stage.choices)
+    status = models.CharField(
+        _("status"), max_length=16, choices=Status.choices, default=Status.QUEUED
+    )
+    # Higher runs first.
+    priority = models.SmallIntegerField(_("priority"), default=0)
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    max_attempts = models.PositiveSmallIntegerField(_("maximum attempts"), default=5)
+    # Retries back off by postponing this.
+    run_after = models.DateTimeField(_("run after"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    started = models.DateTimeField(_("started"), null=True, blank=True)
+    finished = models.DateTimeField(_("finished"), null=True, blank=True)
+
+    objects = EnrichmentJobManager()
+
+    def __str__(self):
+        return (
+            f"{self.get_stage_display()} of {self.content_type.name} {self.object_id}"
+        )
+
+    class Meta:
+        verbose_name = _("enrichment job")
+        verbose_name_plural = _("enrichment jobs")
+        ordering = ["-created"]
+        indexes = [
+            # Covers claiming the next job.
+            models.Index(
+                fields=["status", "-priority", "run_after"],
+                name="enrichmentjob_next",
+            ),
+            models.Index(
+                fields=["content_type", "object_id"], name="enrichmentjob_target"
+            ),
+        ]
+
+
+class BackboneTaxon(models.Model):
+    """Plant taxon of a local mirror of the GBIF Backbone Taxonomy, see backbone.py."""
+
+    # GBIF taxon key.
+    id = models.PositiveBigIntegerField(primary_key=True)
+    canonical_name = models.CharField(_("canonical name"), max_length=255)
+    scientific_name = models.TextField(_("scientific name"))
+    rank = models.CharField(_("rank"), max_length=32)
+    taxonomic_status = models.CharField(_("taxonomic status"), max_length=32)
+    # Of synonyms. Not a foreign key, as taxa are loaded in any order.
+    accepted_id = models.PositiveBigIntegerField(_("accepted taxon"), null=True)
+    family = models.CharField(_("family"), max_length=255, blank=True)
+    genus = models.CharField(_("genus"), max_length=255, blank=True)
+
+    def __str__(self):
+        return self.scientific_name
+
+    class Meta:
+        verbose_name = _("GBIF backbone taxon")
+        verbose_name_plural = _("GBIF backbone taxa")
+        indexes = [
+            # Covers exact and prefix lookups by name.
+            models.Index(
+                fields=["canonical_name", "rank", "taxonomic_status"],
+                name="backbonetaxon_name",
+            ),
+        ]
+
+
+class BackboneVernacularName(models.Model):
+    """Vernacular name of a taxon of the local GBIF backbone mirror."""
+
+    taxon_id = models.PositiveBigIntegerField(_("taxon"), db_index=True)
+    name = models.CharField(_("name"), max_length=255)
+    # ISO 639-2, as returned by the GBIF API.
+    language = models.CharField(_("language"), max_length=3)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("GBIF backbone vernacular name")
+        verbose_name_plural = _("GBIF backbone vernacular names")
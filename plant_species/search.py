@@ -0,0 +1,202 @@
+"""
+Species search on a denormalized index of the words in their names.
+
+Latin and common names of species, their genus and family are split into normalized
+terms, weighted by where they occur. Searching matches prefixes of terms with range
+lookups on an index, falling back to similar terms for misspelled words.
+"""
+
+import difflib
+import functools
+import operator
+import re
+import typing
+import unicodedata
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Expression,
+    ExpressionWrapper,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    When,
+)
+
+from .models import Species, SpeciesSearchTerm
+
+# Relevance of terms, by the name they occur in.
+WEIGHT_SPECIES = 10
+WEIGHT_SPECIES_COMMON_NAME = 8
+WEIGHT_GENUS = 5
+WEIGHT_GENUS_COMMON_NAME = 4
+WEIGHT_FAMILY = 2
+WEIGHT_FAMILY_COMMON_NAME = 2
+
+# Words shorter than this are only matched by prefix.
+FUZZY_MIN_LENGTH = 4
+# Minimum similarity ratio of misspelled words.
+FUZZY_CUTOFF = 0.75
+FUZZY_MAX_TERMS = 5
+
+# Sorts after any term, to turn prefixes into ranges.
+_MAX_CHAR = "\uffff"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> typing.List[str]:
+    """Split text into lowercase words, without accents."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return _WORD_RE.findall(folded.lower())
+
+
+def get_terms(species: Species) -> typing.Dict[str, int]:
+    """Terms of a species with their weight, the highest where they occur twice."""
+
+    genus = species.genus
+    family = genus.family
+    names = [
+        (species.latin_name, WEIGHT_SPECIES),
+        (genus.latin_name, WEIGHT_GENUS),
+        (family.latin_name, WEIGHT_FAMILY),
+        *(
+            (name.name, WEIGHT_SPECIES_COMMON_NAME)
+            for name in species.common_names.all()
+        ),
+        *((name.name, WEIGHT_GENUS_COMMON_NAME) for name in genus.common_names.all()),
+        *((name.name, WEIGHT_FAMILY_COMMON_NAME) for name in family.common_names.all()),
+    ]
+
+    terms: typing.Dict[str, int] = {}
+    for name, weight in names:
+        for term in normalize(name):
+            terms[term] = max(weight, terms.get(term, 0))
+
+    return terms
+
+
+def rebuild_search_terms(species: QuerySet[Species] | None = None, chunk_size=500):
+    """Replace the search terms of species, all of them by default."""
+
+    if species is None:
+        species = Species.objects.all()
+
+    with transaction.atomic():
+        SpeciesSearchTerm.objects.filter(species__in=species.values("uuid")).delete()
+
+        species = species.select_related("genus__family").prefetch_related(
+            "common_names", "genus__common_names", "genus__family__common_names"
+        )
+
+        SpeciesSearchTerm.objects.bulk_create(
+            (
+                SpeciesSearchTerm(species=obj, term=term[:255], weight=weight)
+                for obj in species.iterator(chunk_size=chunk_size)
+                for term, weight in get_terms(obj).items()
+            ),
+            batch_size=chunk_size,
+        )
+
+
+def _term_range(prefix: str) -> QuerySet[SpeciesSearchTerm]:
+    # A range rather than LIKE, so a plain index applies on every database.
+    return SpeciesSearchTerm.objects.filter(
+        term__gte=prefix, term__lt=prefix + _MAX_CHAR
+    )
+
+
+def _similar_terms(word: str) -> QuerySet[SpeciesSearchTerm] | None:
+    """Terms starting like a misspelled word, if any."""
+
+    if len(word) < FUZZY_MIN_LENGTH:
+        return None
+
+    # Typos in the first letter are rare, and it keeps the candidates few.
+    prefixes = {
+        term[: len(word)]
+        for term in _term_range(word[0]).values_list("term", flat=True).distinct()
+    }
+    close = difflib.get_close_matches(
+        word, prefixes, n=FUZZY_MAX_TERMS, cutoff=FUZZY_CUTOFF
+    )
+    if not close:
+        return None
+
+    conditions = [
+        # Terms shorter than the word are their own prefix.
+        Q(term=prefix)
+        if len(prefix) < len(word)
+        else Q(term__gte=prefix, term__lt=prefix + _MAX_CHAR)
+        for prefix in close
+    ]
+    return SpeciesSearchTerm.objects.filter(functools.reduce(operator.or_, conditions))
+
+
+def _match(word: str) -> typing.Tuple[QuerySet[SpeciesSearchTerm], Expression] | None:
+    """Terms matching a word and their score, prefixes or when none do, similar terms."""
+
+    terms = _term_range(word)
+    if terms.exists():
+        # Whole words rank above prefixes.
+        return terms, Case(
+            When(term=word, then=F("weight") * 2),
+            default=F("weight"),
+            output_field=IntegerField(),
+        )
+
+    terms = _similar_terms(word)
+    if terms is None:
+        return None
+
+    # Misspelled words score half the weight of their terms.
+    return terms, ExpressionWrapper(F("weight") / 2, output_field=IntegerField())
+
+
+def search_species(
+    query: str, species: QuerySet[Species] | None = None
+) -> QuerySet[Species]:
+    """
+    Species matching all words in query, annotated with their `search_rank`, best match
+    first.
+
+    Words match prefixes of terms, or when none do, similar terms. Each species scores
+    its best term per word, ranked in the database, so queries matching many species
+    don't send them back and forth.
+    """
+
+    if species is None:
+        species = Species.objects.all()
+
+    words = list(dict.fromkeys(normalize(query)))
+    if not words:
+        return species.none()
+
+    scores = []
+    for word in words:
+        match = _match(word)
+        if match is None:
+            return species.none()
+
+        terms, score = match
+        species = species.filter(uuid__in=terms.values("species"))
+        scores.append(
+            Subquery(
+                terms.filter(species=OuterRef("uuid"))
+                .values("species")
+                .annotate(score=Max(score))
+                .values("score"),
+                output_field=IntegerField(),
+            )
+        )
+
+    return species.annotate(
+        search_rank=functools.reduce(operator.add, scores)
+    ).order_by("-search_rank", "pk")
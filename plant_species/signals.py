@@ -0,0 +1,70 @@
+"""
+Keep the species search index up to date with names.
+
+Fixtures are skipped, run the rebuild_search_index command after loading them.
+"""
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    Family,
+    FamilyCommonName,
+    Genus,
+    GenusCommonName,
+    Species,
+    SpeciesBase,
+    SpeciesCommonName,
+)
+from .search import rebuild_search_terms
+
+
+def _renamed(update_fields, fields) -> bool:
+    """Whether a save may change names, unlike saves of e.g. images only."""
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Species)
+def index_species(sender, instance, raw, update_fields=None, **kwargs):
+    if not raw and _renamed(update_fields, {"latin_name", "genus", "genus_id"}):
+        rebuild_search_terms(Species.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Genus)
+def index_genus(sender, instance, raw, update_fields=None, **kwargs):
+    if not raw and _renamed(update_fields, {"latin_name", "family", "family_id"}):
+        rebuild_search_terms(Species.objects.filter(genus=instance.uuid))
+
+
+@receiver(post_save, sender=Family)
+def index_family(sender, instance, raw, update_fields=None, **kwargs):
+    if not raw and _renamed(update_fields, {"latin_name"}):
+        rebuild_search_terms(Species.objects.filter(genus__family=instance.uuid))
+
+
+def _cascaded(origin) -> bool:
+    """Whether names are deleted along with their taxon, leaving no terms to update."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, SpeciesBase)
+
+
+@receiver(post_save, sender=SpeciesCommonName)
+@receiver(post_delete, sender=SpeciesCommonName)
+def index_species_common_name(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _cascaded(origin):
+        rebuild_search_terms(Species.objects.filter(uuid=instance.species_id))
+
+
+@receiver(post_save, sender=GenusCommonName)
+@receiver(post_delete, sender=GenusCommonName)
+def index_genus_common_name(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _cascaded(origin):
+        rebuild_search_terms(Species.objects.filter(genus=instance.genus_id))
+
+
+@receiver(post_save, sender=FamilyCommonName)
+@receiver(post_delete, sender=FamilyCommonName)
+def index_family_common_name(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _cascaded(origin):
+        rebuild_search_terms(Species.objects.filter(genus__family=instance.family_id))
@@ -0,0 +1,41 @@
+import threading
+import typing
+from concurrent.futures import Future
+
+T = typing.TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Run a function at most once per key at a time.
+
+    Threads calling with a key already in flight wait for that call and share its
+    result, or its exception, rather than repeating it. Once it returned, the next
+    call with the key runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: typing.Dict[typing.Hashable, Future] = {}
+
+    def do(self, key: typing.Hashable, fn: typing.Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,95 @@
+import io
+import tempfile
+from pathlib import Path
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from plant_species.archive import build_archive, get_models, read_manifest
+from plant_species.models import (
+    BackboneTaxon,
+    BackboneVernacularName,
+    Family,
+    Genus,
+    Species,
+    SpeciesSearchTerm,
+)
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class ArchiveTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        family = Family.objects.create(latin_name="Rosaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Rosa", gbif_id=2, family=family)
+        cls.species = Species.objects.create(
+            latin_name="Rosa rubiginosa", gbif_id=3, genus=genus
+        )
+
+    def setUp(self):
+        default_storage.save("plant_species/images/rosa.jpg", ContentFile(b"image"))
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output = Path(directory.name)
+
+    def _build(self):
+        return build_archive(self.output, ["plant_species"], partition_size=2)
+
+    def test_incremental(self):
+        stats = self._build()
+        self.assertGreater(stats.fixtures_compressed, 0)
+        self.assertEqual(stats.fixtures_reused, 0)
+        self.assertEqual(stats.media_copied, 1)
+
+        stats = self._build()
+        self.assertEqual(stats.fixtures_compressed, 0)
+        self.assertEqual(stats.media_copied, 0)
+        self.assertEqual(stats.media_reused, 1)
+
+        self.species.description = "Sweet briar."
+        self.species.save()
+
+        stats = self._build()
+        self.assertEqual(stats.fixtures_compressed, 1)
+
+        manifest = read_manifest(self.output)
+        files = {entry["file"] for entry in manifest["fixtures"] + manifest["media"]}
+        # Previous partitions are deleted.
+        self.assertEqual(
+            {f"{path.parent.name}/{path.name}" for path in self.output.glob("*/*")},
+            files,
+        )
+
+    def test_load(self):
+        self._build()
+
+        Species.objects.all().delete()
+        Genus.objects.all().delete()
+        Family.objects.all().delete()
+        default_storage.delete("plant_species/images/rosa.jpg")
+
+        call_command("load_species_fixture", archive=self.output, stdout=io.StringIO())
+
+        self.assertEqual(Species.objects.get().uuid, self.species.uuid)
+        with default_storage.open("plant_species/images/rosa.jpg") as f:
+            self.assertEqual(f.read(), b"image")
+
+
+class GetModelsTestCase(TestCase):
+    def test_get_models(self):
+        models = get_models(["plant_species"])
+
+        self.assertIn(Species, models)
+        # Derived or locally loaded.
+        for model in [SpeciesSearchTerm, BackboneTaxon, BackboneVernacularName]:
+            self.assertNotIn(model, models)
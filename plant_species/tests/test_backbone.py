@@ -0,0 +1,165 @@
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from plant_species.backbone import load_backbone, name_backbone, read_tsv
+from plant_species.enrichment import gbif
+from plant_species.enrichment.exceptions import SpeciesNotFound
+from plant_species.models import BackboneTaxon, BackboneVernacularName
+
+TAXON_COLUMNS = [
+    "taxonID",
+    "acceptedNameUsageID",
+    "scientificName",
+    "canonicalName",
+    "taxonRank",
+    "taxonomicStatus",
+    "kingdom",
+    "family",
+    "genus",
+]
+
+TAXA = [
+    ["4689", "", "Fagaceae", "Fagaceae", "family", "accepted", "Plantae", "Fagaceae", ""],
+    ["2877951", "", "Quercus L.", "Quercus", "genus", "accepted", "Plantae", "Fagaceae", "Quercus"],
+    ["2878688", "", "Quercus robur L.", "Quercus robur", "species", "accepted", "Plantae", "Fagaceae", "Quercus"],
+    ["7298981", "2878688", "Quercus pedunculata Ehrh.", "Quercus pedunculata", "species", "synonym", "Plantae", "Fagaceae", "Quercus"],
+    # Not a plant.
+    ["5231190", "", "Passer domesticus (Linnaeus, 1758)", "Passer domesticus", "species", "accepted", "Animalia", "Passeridae", "Passer"],
+]  # fmt: skip
+
+VERNACULAR_NAMES = [
+    ["taxonID", "vernacularName", "language"],
+    ["2878688", "Pedunculate oak", "en"],
+    ["2878688", "Stieleiche", "deu"],
+    # Without an ISO 639-1 code, or language.
+    ["2878688", "Pedunculate oak", "sco"],
+    ["2878688", "Oak", ""],
+    # Not a plant.
+    ["5231190", "House sparrow", "en"],
+]
+
+
+def _tsv(rows):
+    return "".join("\t".join(row) + "\n" for row in rows)
+
+
+TAXON_TSV = _tsv([TAXON_COLUMNS, *TAXA])
+VERNACULAR_NAME_TSV = _tsv(VERNACULAR_NAMES)
+
+
+class BackboneTestCase(TestCase):
+    def setUp(self):
+        load_backbone(
+            read_tsv(io.StringIO(TAXON_TSV)), read_tsv(io.StringIO(VERNACULAR_NAME_TSV))
+        )
+
+    def test_load_backbone(self):
+        self.assertEqual(
+            set(BackboneTaxon.objects.values_list("id", flat=True)),
+            {4689, 2877951, 2878688, 7298981},
+        )
+        self.assertEqual(
+            list(BackboneVernacularName.objects.values_list("name", "language")),
+            [("Pedunculate oak", "eng"), ("Stieleiche", "deu")],
+        )
+
+        # Replaces the previous mirror.
+        self.assertEqual(
+            load_backbone(read_tsv(io.StringIO(_tsv([TAXON_COLUMNS, TAXA[0]])))),
+            (1, 0),
+        )
+        self.assertEqual(BackboneTaxon.objects.count(), 1)
+        self.assertFalse(BackboneVernacularName.objects.exists())
+
+    def test_name_backbone_exact(self):
+        data = name_backbone(name=" quercus  ROBUR", rank=gbif.Rank.SPECIES)
+
+        self.assertEqual(data["matchType"], "EXACT")
+        self.assertEqual(data["usageKey"], 2878688)
+        self.assertEqual(data["species"], "Quercus robur")
+        self.assertEqual(data["speciesKey"], 2878688)
+        self.assertEqual(data["genus"], "Quercus")
+        self.assertEqual(data["genusKey"], 2877951)
+        self.assertEqual(data["family"], "Fagaceae")
+        self.assertEqual(data["familyKey"], 4689)
+
+        data = name_backbone(name="Quercus", rank=gbif.Rank.GENUS)
+        self.assertEqual(data["genusKey"], 2877951)
+        self.assertNotIn("speciesKey", data)
+
+    def test_name_backbone_synonym(self):
+        data = name_backbone(name="Quercus pedunculata", rank=gbif.Rank.SPECIES)
+
+        self.assertEqual(data["matchType"], "EXACT")
+        self.assertTrue(data["synonym"])
+        self.assertEqual(data["usageKey"], 7298981)
+        self.assertEqual(data["acceptedUsageKey"], 2878688)
+        self.assertEqual(data["species"], "Quercus robur")
+        self.assertEqual(data["speciesKey"], 2878688)
+
+    def test_name_backbone_fuzzy(self):
+        data = name_backbone(name="Quercus robor", rank=gbif.Rank.SPECIES)
+        self.assertEqual(data["matchType"], "FUZZY")
+        self.assertEqual(data["species"], "Quercus robur")
+
+        data = name_backbone(name="Quercus unknownus", rank=gbif.Rank.SPECIES)
+        self.assertEqual(data["matchType"], "HIGHERRANK")
+        self.assertEqual(data["genus"], "Quercus")
+        self.assertNotIn("species", data)
+
+        self.assertEqual(
+            name_backbone(name="Passer domesticus", rank=gbif.Rank.SPECIES)[
+                "matchType"
+            ],
+            "NONE",
+        )
+
+    @override_settings(GBIF_BACKEND="local")
+    @patch("plant_species.enrichment.gbif.species")
+    def test_local_backend(self, mock_species):
+        self.assertEqual(
+            gbif.get_latin_names("Quercus robur", gbif.Rank.SPECIES)["speciesKey"],
+            2878688,
+        )
+
+        with self.assertRaisesMessage(SpeciesNotFound, "Did you mean 'Quercus robur'?"):
+            gbif.get_latin_names("Quercus robor", gbif.Rank.SPECIES)
+
+        matches = gbif.resolve_latin_names(
+            ["Quercus robur", "Quercus pedunculata"], gbif.Rank.SPECIES
+        )
+        self.assertEqual(
+            matches["Quercus pedunculata"].latin_names["speciesKey"], 2878688
+        )
+
+        self.assertEqual(
+            gbif.get_common_names(2878688, ["en", "de"]),
+            [
+                {"language": "en", "name": "Pedunculate oak"},
+                {"language": "de", "name": "Stieleiche"},
+            ],
+        )
+
+        mock_species.name_backbone.assert_not_called()
+        mock_species.name_usage.assert_not_called()
+
+    def test_load_gbif_backbone(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "backbone.zip"
+            with zipfile.ZipFile(path, "w") as archive:
+                archive.writestr("Taxon.tsv", TAXON_TSV)
+                archive.writestr("VernacularName.tsv", VERNACULAR_NAME_TSV)
+
+            out = io.StringIO()
+            call_command(
+                "load_gbif_backbone", str(path), stdout=out, stderr=io.StringIO()
+            )
+
+        self.assertIn("Loaded 4 plant taxa and 2 vernacular names.", out.getvalue())
+        self.assertEqual(BackboneTaxon.objects.count(), 4)
@@ -1,10 +1,22 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from unittest.mock import patch, MagicMock
-from django.core.files.base import ContentFile
+from django.core.files import File
+
+import requests
 
-from plant_species.enrichment import gbif, wikipedia
+from plant_species.enrichment import gbif, wikidata, wikipedia
+from plant_species.enrichment.cache import ResponseCache, cached
+from plant_species.enrichment.exceptions import OfflineCacheMiss, SpeciesNotFound
+from plant_species.models import Family, Genus, Species
 
 
+@override_settings(ENRICHMENT_CACHE={"PATH": None})
 class GBIFTestCase(TestCase):
     def test_get_image_url(self):
         occurrence_with_valid_license = {
@@ -64,41 +76,73 @@ class GBIFTestCase(TestCase):
         self.assertEqual(gbif._get_image_urls(12345), expected_urls)
 
     @patch("plant_species.enrichment.gbif._get_image_urls")
-    @patch("requests.get")
-    def test_get_image(self, mock_get, mock_get_image_urls):
+    @patch("plant_species.enrichment.gbif._get_session")
+    def test_get_image(self, mock_get_session, mock_get_image_urls):
         # Mock the _get_image_urls to return a list of image URLs
         mock_get_image_urls.return_value = ["http://example.com/image.jpg"]
 
-        # Mock the requests.get to return a response with image content
-        mock_response = MagicMock()
-        mock_response.__enter__.return_value.headers = {"Content-Type": "image/jpeg"}
-        mock_response.__enter__.return_value.content = b"image content"
-        mock_get.return_value = mock_response
+        # Mock the session to stream a response with image content
+        mock_response = (
+            mock_get_session.return_value.get.return_value.__enter__.return_value
+        )
+        mock_response.ok = True
+        mock_response.headers = {"Content-Type": "image/jpeg"}
+        mock_response.iter_content.return_value = [b"\xff\xd8\xffimage", b" content"]
 
         # Call the get_image function
         result = gbif.get_image(12345)
 
-        # Assert that the result is a ContentFile with the expected content
-        assert isinstance(result, ContentFile)
-        self.assertEqual(result.read(), b"image content")
+        # Assert that the result is a File with the expected content
+        assert isinstance(result, File)
+        self.assertEqual(result.read(), b"\xff\xd8\xffimage content")
+        mock_get_session.return_value.get.assert_called_once_with(
+            "http://example.com/image.jpg", stream=True, timeout=30
+        )
 
     @patch("plant_species.enrichment.gbif._get_image_urls")
-    @patch("requests.get")
-    def test_get_image_no_valid_images(self, mock_get, mock_get_image_urls):
+    @patch("plant_species.enrichment.gbif._get_session")
+    def test_get_image_no_valid_images(self, mock_get_session, mock_get_image_urls):
         # Mock the _get_image_urls to return a list of image URLs
         mock_get_image_urls.return_value = ["http://example.com/image.png"]
 
-        # Mock the requests.get to return a response with non-JPEG content
-        mock_response = MagicMock()
+        # Mock the session to return a response with non-JPEG content
+        mock_response = (
+            mock_get_session.return_value.get.return_value.__enter__.return_value
+        )
+        mock_response.ok = True
         mock_response.headers = {"Content-Type": "image/png"}
-        mock_response.content = b"image content"
-        mock_get.return_value = mock_response
 
         # Call the get_image function
         result = gbif.get_image(12345)
 
         # Assert that the result is None since no valid JPEG images were found
         self.assertIsNone(result)
+        # Without downloading the body
+        mock_response.iter_content.assert_not_called()
+
+    @override_settings(SPECIES_IMAGE_MAX_SIZE=10)
+    @patch("plant_species.enrichment.gbif._get_image_urls")
+    @patch("plant_species.enrichment.gbif._get_session")
+    def test_get_image_too_large(self, mock_get_session, mock_get_image_urls):
+        mock_get_image_urls.return_value = ["http://example.com/image.jpg"]
+
+        mock_response = (
+            mock_get_session.return_value.get.return_value.__enter__.return_value
+        )
+        mock_response.ok = True
+        mock_response.headers = {"Content-Type": "image/jpeg"}
+        mock_response.iter_content.return_value = [b"\xff\xd8\xffimage", b" content"]
+
+        self.assertIsNone(gbif.get_image(12345))
+
+        # Checked upfront when the length is known.
+        mock_response.headers["Content-Length"] = "11"
+        mock_response.iter_content.reset_mock()
+
+        self.assertIsNone(gbif.get_image(12345))
+        mock_response.iter_content.assert_not_called()
+
+    def test_convert_language_code(self):
         self.assertEqual(gbif._convert_language_code("eng"), "en")
         self.assertEqual(gbif._convert_language_code("fra"), "fr")
         self.assertEqual(gbif._convert_language_code("deu"), "de")
@@ -125,17 +169,300 @@ class GBIFTestCase(TestCase):
             gbif.get_common_names(12345, enabled_languages), expected_common_names
         )
 
+    @patch("plant_species.enrichment.gbif.species.name_backbone")
+    def test_get_latin_names_suggestion(self, mock_name_backbone):
+        mock_name_backbone.return_value = {
+            "matchType": "FUZZY",
+            "species": "Quercus robur",
+            "genus": "Quercus",
+            "family": "Fagaceae",
+        }
+
+        with self.assertRaisesMessage(SpeciesNotFound, "Did you mean 'Quercus robur'?"):
+            gbif.get_latin_names("Quercus robor", gbif.Rank.SPECIES)
+
+    @patch("plant_species.enrichment.gbif.species.name_backbone")
+    def test_resolve_latin_names(self, mock_name_backbone):
+        def name_backbone_side_effect(name, **kwargs):
+            if name == "Quercus robor":
+                return {"matchType": "FUZZY", "species": "Quercus robur"}
+            if name == "Unknown":
+                return {"matchType": "NONE"}
+
+            return {
+                "matchType": "EXACT",
+                "species": name,
+                "speciesKey": 1,
+                "genusKey": 2,
+                "familyKey": 3,
+            }
+
+        mock_name_backbone.side_effect = name_backbone_side_effect
+
+        matches = gbif.resolve_latin_names(
+            ["Quercus robur", " quercus  Robur", "Quercus robor", "Unknown"],
+            gbif.Rank.SPECIES,
+        )
+
+        # Duplicates by normalized name are only requested once.
+        self.assertEqual(mock_name_backbone.call_count, 3)
 
+        self.assertTrue(matches["Quercus robur"].is_exact)
+        self.assertIs(matches[" quercus  Robur"], matches["Quercus robur"])
+        self.assertEqual(matches["Quercus robur"].latin_names["speciesKey"], 1)
+
+        self.assertFalse(matches["Quercus robor"].is_exact)
+        self.assertEqual(matches["Quercus robor"].suggestion, "Quercus robur")
+
+        self.assertFalse(matches["Unknown"].is_exact)
+        self.assertIsNone(matches["Unknown"].suggestion)
+
+
+@override_settings(ENRICHMENT_CACHE={"PATH": None})
 class WikipediaTestCase(TestCase):
-    @patch("plant_species.enrichment.wikipedia.wikipedia.page")
-    def test_get_wikipedia_page_success(self, mock_page):
-        mock_page.return_value = MagicMock(title="Test Page")
-        page = wikipedia.get_wikipedia_page("Test Page")
+    summary = {
+        "type": "standard",
+        "title": "Test Page",
+        "pageid": 18630637,
+        "extract": "A test page.",
+        "content_urls": {
+            "desktop": {"page": "https://en.wikipedia.org/wiki/Test_Page"}
+        },
+    }
+
+    @patch("plant_species.enrichment.wikipedia._get_session")
+    def test_get_wikipedia_page_success(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = self.summary
+
+        page = wikipedia.get_wikipedia_page("Test Page", "pt-br")
         assert page
         self.assertEqual(page.title, "Test Page")
+        self.assertEqual(page.pageid, 18630637)
+        self.assertEqual(page.summary, "A test page.")
+        mock_get.assert_called_once_with(
+            "https://pt.wikipedia.org/api/rest_v1/page/summary/Test_Page", timeout=30
+        )
+
+    @patch("plant_species.enrichment.wikipedia._get_session")
+    def test_get_wikipedia_page_failure(self, mock_get_session):
+        mock_get = mock_get_session.return_value.get
+        mock_get.return_value = MagicMock(status_code=404)
+        self.assertIsNone(wikipedia.get_wikipedia_page("Test Page"))
+
+        mock_get.return_value = MagicMock(status_code=200)
+        mock_get.return_value.json.return_value = {
+            **self.summary,
+            "type": "disambiguation",
+        }
+        self.assertIsNone(wikipedia.get_wikipedia_page("Test Page"))
+
+    @patch("plant_species.enrichment.wikipedia.get_wikipedia_page")
+    def test_get_wikipedia_pages(self, mock_get_wikipedia_page):
+        page = wikipedia.WikipediaPage("Test Page", "https://example.com", 1, "")
+        mock_get_wikipedia_page.side_effect = lambda name, language: (
+            page if language == "en" else None
+        )
+
+        self.assertEqual(
+            wikipedia.get_wikipedia_pages("Test Page", ["nl", "en"]), {"en": page}
+        )
+
+    @override_settings(
+        LANGUAGE_CODE="en-us", LANGUAGES=[("pt-br", "Portuguese"), ("en", "English")]
+    )
+    def test_get_wikipedia_languages(self):
+        self.assertEqual(wikipedia.get_wikipedia_languages(), ["en", "pt"])
+
+
+class WikidataTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+        cache_settings = {
+            "PATH": Path(self.tempdir.name) / "cache.sqlite3",
+            "TTL": datetime.timedelta(days=1),
+            "MAX_SIZE": 1024 * 1024,
+        }
+        overrides = override_settings(
+            ENRICHMENT_CACHE=cache_settings,
+            LANGUAGE_CODE="en",
+            LANGUAGES=[("en", "English"), ("nl", "Dutch")],
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        patcher = patch("plant_species.enrichment.wikidata._get_session")
+        self.session = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+        self.session.post.return_value.json.side_effect = lambda: {
+            "results": {
+                "bindings": [
+                    {
+                        "gbif": {"value": str(gbif_id)},
+                        "item": {"value": f"http://www.wikidata.org/entity/Q{gbif_id}"},
+                    }
+                    for gbif_id in [1, 2]
+                ]
+            }
+        }
+        self.session.get.side_effect = self._get_entities
+
+    def _get_entities(self, url, params, timeout):
+        response = MagicMock()
+        response.json.return_value = {
+            "entities": {
+                entity_id: {
+                    "labels": {"nl": {"language": "nl", "value": "Zomereik"}},
+                    "sitelinks": {"enwiki": {"site": "enwiki", "title": "Oak"}},
+                    "claims": {
+                        "P18": [
+                            {
+                                "rank": "normal",
+                                "mainsnak": {"datavalue": {"value": "Oak tree.jpg"}},
+                            }
+                        ]
+                    },
+                }
+                for entity_id in params["ids"].split("|")
+            }
+        }
+
+        return response
+
+    def test_get_wikidata_entities(self):
+        with patch("plant_species.enrichment.wikidata.ENTITIES_BATCH_SIZE", 1):
+            entities = wikidata.get_wikidata_entities([1, 2, 3])
+
+        self.assertEqual(set(entities), {1, 2})
+        self.assertEqual(entities[1].id, "Q1")
+        self.assertEqual(entities[1].labels, {"nl": "Zomereik"})
+        self.assertEqual(entities[1].sitelinks, {"en": "Oak"})
+        self.assertEqual(
+            entities[1].image_url,
+            "https://commons.wikimedia.org/wiki/Special:FilePath/Oak_tree.jpg?width=2048",
+        )
+
+        # One query for all GBIF ids, entities in batches.
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.get.call_count, 2)
+        self.assertEqual(
+            self.session.get.call_args.kwargs["params"]["sitefilter"], "enwiki|nlwiki"
+        )
+
+        # Served from the cache, including ids without an entity.
+        self.assertEqual(wikidata.get_wikidata_entity(2), entities[2])
+        self.assertIsNone(wikidata.get_wikidata_entity(3))
+        self.session.post.assert_called_once()
+        self.assertEqual(self.session.get.call_count, 2)
+
+    @override_settings(ENRICHMENT_CACHE={"PATH": None})
+    @patch("plant_species.models.get_wikipedia_pages", return_value={})
+    @patch("plant_species.models.get_wikidata_image", return_value=None)
+    @patch("plant_species.models.get_image", return_value=None)
+    def test_entity_requests_uncached(self, *mocks):
+        family = Family.objects.create(latin_name="Fagaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Quercus", gbif_id=2, family=family)
+        species = Species(latin_name="Quercus robur", gbif_id=1, genus=genus)
+
+        # Enriching looks up the entity once.
+        species.enrich_wikidata()
+        species.enrich_gbif_image()
+        species.enrich_wikipedia()
+        species.save()
+        species.enrich_wikidata_common_names()
+
+        self.assertEqual(species.wikidata_id, "Q1")
+        self.assertEqual(self.session.post.call_count, 1)
+        self.assertEqual(self.session.get.call_count, 1)
+
+        # One lookup per model, rather than another per object for its labels.
+        call_command("enrich_wikidata", stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertTrue(species.common_names.filter(name="Zomereik").exists())
+        self.assertEqual(self.session.post.call_count, 4)
+        self.assertEqual(self.session.get.call_count, 4)
+
+    def test_get_wikidata_entity_failure(self):
+        self.session.post.side_effect = requests.ConnectionError()
+
+        self.assertIsNone(wikidata.get_wikidata_entity(1))
+
+
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache_settings = {
+            "PATH": Path(self.tempdir.name) / "cache.sqlite3",
+            "TTL": datetime.timedelta(days=1),
+            "MAX_SIZE": 1024 * 1024,
+            "OFFLINE": False,
+        }
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_cached(self):
+        fetch = MagicMock(return_value={"results": [1, 2, 3]})
+
+        @cached("test")
+        def cached_fetch(*args, **kwargs):
+            return fetch(*args, **kwargs)
+
+        with override_settings(ENRICHMENT_CACHE=self.cache_settings):
+            self.assertEqual(cached_fetch(1, data="x"), {"results": [1, 2, 3]})
+            self.assertEqual(cached_fetch(1, data="x"), {"results": [1, 2, 3]})
+            self.assertEqual(fetch.call_count, 1)
+
+            # Different arguments, different content address.
+            cached_fetch(2, data="x")
+            self.assertEqual(fetch.call_count, 2)
+
+    def test_offline(self):
+        fetch = MagicMock(return_value=None)
+
+        @cached("test")
+        def cached_fetch(*args, **kwargs):
+            return fetch(*args, **kwargs)
+
+        with override_settings(ENRICHMENT_CACHE=self.cache_settings):
+            self.assertIsNone(cached_fetch("cached"))
+
+        with override_settings(
+            ENRICHMENT_CACHE=self.cache_settings | {"OFFLINE": True}
+        ):
+            self.assertIsNone(cached_fetch("cached"))
+
+            with self.assertRaises(OfflineCacheMiss):
+                cached_fetch("uncached")
+
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_expiry(self):
+        cache = ResponseCache(
+            self.cache_settings["PATH"], ttl=datetime.timedelta(0), max_size=1024
+        )
+        cache.set("key", "value")
+
+        with self.assertRaises(KeyError):
+            cache.get("key")
+
+    def test_evict(self):
+        cache = ResponseCache(
+            self.cache_settings["PATH"], ttl=datetime.timedelta(days=1), max_size=100
+        )
+        cache.set("old", "x" * 40)
+        cache.set("recent", "x" * 40)
+        cache.get("old")
+        cache.set("new", "x" * 40)
+
+        cache.evict()
 
-    @patch("plant_species.enrichment.wikipedia.wikipedia.page")
-    def test_get_wikipedia_page_failure(self, mock_page):
-        mock_page.side_effect = wikipedia.wikipedia.PageError(pageid=18630637)
-        page = wikipedia.get_wikipedia_page("Test Page")
-        self.assertIsNone(page)
+        # Least recently used entry is evicted first.
+        with self.assertRaises(KeyError):
+            cache.get("recent")
+        self.assertEqual(cache.get("old"), "x" * 40)
+        self.assertEqual(cache.get("new"), "x" * 40)
@@ -0,0 +1,119 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.serializers.base import DeserializationError
+from django.test import TestCase
+
+from plant_species.fixture_loader import FixtureLoader, iter_json_array, open_fixture
+from plant_species.models import (
+    Family,
+    Genus,
+    Species,
+    SpeciesCommonName,
+    SpeciesVariety,
+)
+from species_data import response_cache
+from species_data.enrichment import registry
+
+
+class IterJSONArrayTestCase(TestCase):
+    def test_chunks(self):
+        objects = [{"model": "a", "fields": {"name": "x" * 10}} for _ in range(5)]
+        f = io.StringIO(json.dumps(objects, indent=2))
+
+        self.assertEqual(list(iter_json_array(f, chunk_size=7)), objects)
+        self.assertEqual(list(iter_json_array(io.StringIO(" [ ] "))), [])
+
+    def test_invalid(self):
+        with self.assertRaises(DeserializationError):
+            list(iter_json_array(io.StringIO('{"model": "a"}')))
+
+        with self.assertRaises(DeserializationError):
+            list(iter_json_array(io.StringIO('[{"model": "a"'), chunk_size=4))
+
+
+class FixtureLoaderTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        family = Family.objects.create(latin_name="Rosaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Rosa", gbif_id=2, family=family)
+        for gbif_id, latin_name in [(3, "Rosa rubiginosa"), (4, "Rosa canina")]:
+            species = Species.objects.create(
+                latin_name=latin_name, gbif_id=gbif_id, genus=genus
+            )
+            # Common names share natural keys.
+            SpeciesCommonName.objects.create(
+                species=species, language="en", name="Wild rose"
+            )
+
+        SpeciesVariety.objects.create(species=species, name="Variety")
+
+    def _dump(self, directory: str) -> Path:
+        path = Path(directory) / "plant_species.json.bz2"
+        call_command(
+            "dumpdata",
+            "plant_species",
+            natural_primary=True,
+            natural_foreign=True,
+            output=str(path),
+            verbosity=0,
+        )
+
+        return path
+
+    def _get_state(self):
+        return {
+            "species": sorted(
+                Species.objects.values_list(
+                    "uuid", "slug", "genus__slug", "genus__family__slug"
+                )
+            ),
+            "common_names": sorted(
+                SpeciesCommonName.objects.values_list("species__slug", "name")
+            ),
+            "varieties": sorted(
+                SpeciesVariety.objects.values_list("species__slug", "name")
+            ),
+        }
+
+    def test_load(self):
+        state = self._get_state()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._dump(directory)
+            for model in [Species, Genus, Family]:
+                model.objects.all().delete()
+
+            loader = FixtureLoader(batch_size=2)
+            with open_fixture(path) as f:
+                counts = loader.load(f)
+
+        self.assertEqual(self._get_state(), state)
+        self.assertEqual(counts["plant_species.Species"], 2)
+        self.assertEqual(counts["plant_species.SpeciesCommonName"], 2)
+
+    def test_load_existing(self):
+        state = self._get_state()
+        versions = response_cache.get_versions(
+            [response_cache.GLOBAL_VERSION_KEY, registry._VERSION_KEY]
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = self._dump(directory)
+            Species.objects.filter(gbif_id=4).delete()
+            Family.objects.update(description="Changed")
+
+            call_command("load_species_fixture", str(path), stdout=io.StringIO())
+
+        self.assertEqual(self._get_state(), state)
+        self.assertEqual(Family.objects.get().description, "")
+
+        # Cached responses, the export and the enrichment schema are outdated.
+        new_versions = response_cache.get_versions(
+            [response_cache.GLOBAL_VERSION_KEY, registry._VERSION_KEY]
+        )
+        self.assertNotEqual(new_versions[0], versions[0])
+        self.assertNotEqual(new_versions[1], versions[1])
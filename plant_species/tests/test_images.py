@@ -0,0 +1,42 @@
+import pyvips
+from django.test import TestCase, override_settings
+
+from plant_species.images import Derivative, get_derivatives, render_derivatives
+
+
+class ImageDerivativesTestCase(TestCase):
+    def setUp(self):
+        self.source = pyvips.Image.black(3000, 2000, bands=3).jpegsave_buffer()
+
+    def test_render_derivatives(self):
+        rendered = render_derivatives(
+            self.source,
+            [
+                Derivative("large", 2048),
+                Derivative("thumbnail", 512),
+                Derivative("thumbnail_webp", 512, format="webp"),
+            ],
+        )
+
+        large = pyvips.Image.new_from_buffer(rendered["large"], "")
+        self.assertEqual((large.width, large.height), (2000, 2000))
+
+        thumbnail = pyvips.Image.new_from_buffer(rendered["thumbnail"], "")
+        self.assertEqual((thumbnail.width, thumbnail.height), (512, 512))
+
+        thumbnail_webp = pyvips.Image.new_from_buffer(rendered["thumbnail_webp"], "")
+        self.assertEqual(thumbnail_webp.get("vips-loader"), "webpload_buffer")
+
+    @override_settings(
+        SPECIES_IMAGE_EXTRA_DERIVATIVES=[
+            {"name": "large_webp", "size": 2048, "format": "webp"}
+        ]
+    )
+    def test_get_derivatives(self):
+        derivatives = get_derivatives()
+
+        self.assertEqual(
+            [derivative.field_name for derivative in derivatives],
+            ["image_large", "image_thumbnail", "image_large_webp"],
+        )
+        self.assertEqual(derivatives[-1].extension, "webp")
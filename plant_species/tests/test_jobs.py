@@ -0,0 +1,142 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from plant_species import jobs
+from plant_species.models import EnrichmentJob, Family, Genus, Species
+
+
+class EnrichmentJobTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.family = Family.objects.create(latin_name="Rosaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Rosa", gbif_id=2, family=cls.family)
+        cls.species = Species.objects.create(
+            latin_name="Rosa rubiginosa", gbif_id=3, genus=genus
+        )
+
+    def test_enqueue(self):
+        created = EnrichmentJob.objects.enqueue(self.species)
+        self.assertEqual(len(created), len(EnrichmentJob.Stage.values))
+
+        # Stages queued already aren't queued again.
+        self.assertEqual(EnrichmentJob.objects.enqueue(self.species), [])
+
+        EnrichmentJob.objects.filter(stage=EnrichmentJob.Stage.IMAGE).update(
+            status=EnrichmentJob.Status.SUCCEEDED
+        )
+        created = EnrichmentJob.objects.enqueue(self.species)
+        self.assertEqual([job.stage for job in created], [EnrichmentJob.Stage.IMAGE])
+
+    def test_claim_priority(self):
+        EnrichmentJob.objects.enqueue(self.family, stages=["image"])
+        EnrichmentJob.objects.enqueue(
+            self.species, stages=["image"], priority=jobs.ADMIN_PRIORITY
+        )
+        # Not due yet.
+        EnrichmentJob.objects.enqueue(self.species, stages=["wikipedia"], priority=99)
+        EnrichmentJob.objects.filter(stage="wikipedia").update(
+            run_after=timezone.now() + datetime.timedelta(hours=1)
+        )
+
+        job = jobs.claim_job()
+        self.assertEqual(job.target, self.species)
+        self.assertEqual(job.status, EnrichmentJob.Status.RUNNING)
+        self.assertEqual(job.attempts, 1)
+
+        self.assertEqual(jobs.claim_job().target, self.family)
+        self.assertIsNone(jobs.claim_job())
+
+    def test_run(self):
+        stage = MagicMock()
+        EnrichmentJob.objects.enqueue(self.species, stages=["image"])
+
+        with patch.dict(jobs.STAGES, {"image": stage}):
+            job = jobs.run_next()
+
+        stage.assert_called_once_with(self.species)
+        job.refresh_from_db()
+        self.assertEqual(job.status, EnrichmentJob.Status.SUCCEEDED)
+        self.assertIsNotNone(job.finished)
+
+    def test_run_outside_transaction(self):
+        depth = len(connection.atomic_blocks)
+
+        def stage(obj):
+            # Network requests of stages don't hold a transaction open.
+            self.assertEqual(len(connection.atomic_blocks), depth)
+
+        EnrichmentJob.objects.enqueue(self.species, stages=["image"])
+        with patch.dict(jobs.STAGES, {"image": stage}):
+            job = jobs.run_next()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, EnrichmentJob.Status.SUCCEEDED)
+
+    def test_enrich_image_keeps_other_fields(self):
+        # Loaded before the Wikipedia stage stored a description.
+        species = Species.objects.get(pk=self.species.pk)
+        Species.objects.filter(pk=species.pk).update(description="Stored meanwhile.")
+
+        def enrich_gbif_image(obj):
+            obj.image.name = "plant_species/images/rosa-rubiginosa.jpg"
+
+        with patch.object(Species, "enrich_gbif_image", enrich_gbif_image):
+            jobs._enrich_image(species)
+
+        species.refresh_from_db()
+        self.assertEqual(species.image.name, "plant_species/images/rosa-rubiginosa.jpg")
+        self.assertEqual(species.description, "Stored meanwhile.")
+
+    def test_retry(self):
+        stage = MagicMock(side_effect=ValueError("Unavailable"))
+        (job,) = EnrichmentJob.objects.enqueue(self.species, stages=["image"])
+        job.max_attempts = 2
+        job.save()
+
+        with patch.dict(jobs.STAGES, {"image": stage}):
+            jobs.run_next()
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, EnrichmentJob.Status.QUEUED)
+            self.assertEqual(job.last_error, "ValueError: Unavailable")
+            self.assertGreater(job.run_after, timezone.now())
+
+            # Backing off.
+            self.assertIsNone(jobs.run_next())
+
+            EnrichmentJob.objects.update(run_after=timezone.now())
+            jobs.run_next()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, EnrichmentJob.Status.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_backoff(self):
+        self.assertEqual(jobs.get_backoff(1), jobs.BACKOFF_BASE)
+        self.assertEqual(jobs.get_backoff(3), jobs.BACKOFF_BASE * 4)
+        self.assertEqual(jobs.get_backoff(100), jobs.BACKOFF_MAX)
+
+    def test_requeue_stale(self):
+        EnrichmentJob.objects.enqueue(self.species, stages=["image"])
+        jobs.claim_job()
+        self.assertEqual(jobs.requeue_stale(), 0)
+
+        EnrichmentJob.objects.update(
+            started=timezone.now() - jobs.STALE_AFTER - datetime.timedelta(minutes=1)
+        )
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertIsNotNone(jobs.claim_job())
+
+    @patch.object(Species, "enrich")
+    @patch.object(Species, "enrich_gbif_backbone")
+    def test_deferred_clean(self, mock_backbone, mock_enrich):
+        species = Species(latin_name="Rosa canina")
+        species.defer_enrichment = True
+        species.clean()
+
+        mock_backbone.assert_called_once_with()
+        mock_enrich.assert_not_called()
@@ -1,10 +1,13 @@
 import tempfile
+from pathlib import Path
 
 from django.core.management import call_command
 from django.test import TestCase
 
 from unittest.mock import patch
 
+from plant_species.enrichment.gbif import NameMatch
+from plant_species.enrichment.prefetch import PrefetchedSpecies
 from plant_species.models import Family, Genus, Species
 
 
@@ -37,3 +40,166 @@ class LoadSpeciesCommandTest(TestCase):
         self.assertEqual(Species.objects.filter(latin_name="Species1").count(), 1)
         self.assertEqual(Species.objects.filter(latin_name="Species2").count(), 1)
         self.assertEqual(Species.objects.filter(latin_name="Species3").count(), 1)
+
+    @patch("plant_species.models.get_wikidata_entity", return_value=None)
+    @patch("plant_species.management.commands.load_species.get_wikidata_entities")
+    @patch.object(Species, "enrich_gbif_image")
+    @patch.object(Species, "enrich_wikipedia")
+    @patch("plant_species.management.commands.load_species.prefetch_species")
+    @patch("plant_species.management.commands.load_species.resolve_latin_names")
+    def test_load_species_workers(
+        self,
+        mock_resolve_latin_names,
+        mock_prefetch_species,
+        mock_enrich_wikipedia,
+        mock_enrich_gbif_image,
+        mock_get_wikidata_entities,
+        mock_get_wikidata_entity,
+    ):
+        family = Family.objects.create(latin_name="Fam", gbif_id=3)
+        Genus.objects.create(latin_name="Gen", family=family, gbif_id=2)
+
+        def resolve_side_effect(latin_names, rank, workers):
+            return {
+                species_name: NameMatch(
+                    name=species_name,
+                    match_type="NONE" if species_name == "Unknown" else "EXACT",
+                    latin_names={
+                        "species": f"Gen {species_name.lower()}",
+                        "genus": "Gen",
+                        "family": "Fam",
+                        "speciesKey": 10 + int(species_name[-1]),
+                        "genusKey": 2,
+                        "familyKey": 3,
+                    }
+                    if species_name != "Unknown"
+                    else {},
+                )
+                for species_name in latin_names
+            }
+
+        def prefetch_side_effect(
+            species_name, enabled_languages, species_data, wikidata_entities
+        ):
+            return PrefetchedSpecies(
+                latin_name=species_name,
+                species_data=species_data,
+                common_names=[{"language": "en", "name": f"Common {species_name}"}],
+                wikidata_entity=wikidata_entities.get(species_data["speciesKey"]),
+            )
+
+        mock_resolve_latin_names.side_effect = resolve_side_effect
+        mock_prefetch_species.side_effect = prefetch_side_effect
+        mock_get_wikidata_entities.return_value = {}
+
+        with tempfile.NamedTemporaryFile(mode="w+", delete=False) as temp_file:
+            temp_file.write("Species1\nSpecies2\nUnknown\nSpecies3\n")
+            temp_file.seek(0)
+
+            call_command("load_species", temp_file.name, workers=3)
+
+        # Names are resolved in a single batch, unresolved ones aren't prefetched.
+        mock_resolve_latin_names.assert_called_once()
+        self.assertEqual(
+            sorted(mock_get_wikidata_entities.call_args.args[0]), [11, 12, 13]
+        )
+        self.assertEqual(mock_prefetch_species.call_count, 3)
+        # Entities of the batch are passed on, rather than looked up again.
+        self.assertEqual(
+            mock_prefetch_species.call_args.kwargs["wikidata_entities"],
+            mock_get_wikidata_entities.return_value,
+        )
+        mock_get_wikidata_entity.assert_not_called()
+        self.assertEqual(Species.objects.count(), 3)
+
+        species = Species.objects.get(gbif_id=12)
+        self.assertEqual(species.latin_name, "Gen species2")
+        self.assertTrue(species.common_names.filter(name="Common species2").exists())
+
+        # Completed runs don't leave a checkpoint behind.
+        self.assertFalse(Path(f"{temp_file.name}.checkpoint").exists())
+
+    @patch.object(Species, "enrich_related")
+    def test_load_species_resume(self, mock_enrich_related):
+        family = Family.objects.create(latin_name="Fam", gbif_id=3)
+        genus = Genus.objects.create(latin_name="Gen", family=family, gbif_id=2)
+
+        self.enriched = []
+
+        def enrich_side_effect(species_instance):
+            species_instance.genus = genus
+            species_instance.gbif_id = len(self.enriched) + 3
+            self.enriched.append(species_instance.latin_name)
+
+        with tempfile.NamedTemporaryFile(mode="w+", delete=False) as temp_file:
+            temp_file.write("Species1\nSpecies2\nSpecies3\n")
+            temp_file.seek(0)
+
+            # Simulate an interrupted run which handled Species1.
+            with open(f"{temp_file.name}.checkpoint", "w") as checkpoint_file:
+                checkpoint_file.write("Species1\n")
+
+            with patch.object(Species, "enrich", enrich_side_effect):
+                call_command("load_species", filename=temp_file.name)
+
+        self.assertEqual(self.enriched, ["Species2", "Species3"])
+        self.assertFalse(Species.objects.filter(latin_name="Species1").exists())
+
+    @patch.object(Species, "enrich_related")
+    def test_load_species_interrupted(self, mock_enrich_related):
+        family = Family.objects.create(latin_name="Fam", gbif_id=3)
+        genus = Genus.objects.create(latin_name="Gen", family=family, gbif_id=2)
+
+        def enrich_side_effect(species_instance):
+            if species_instance.latin_name == "Species2":
+                raise KeyboardInterrupt()
+
+            species_instance.genus = genus
+            species_instance.gbif_id = 4
+
+        with tempfile.NamedTemporaryFile(mode="w+", delete=False) as temp_file:
+            temp_file.write("Species1\nSpecies1\nSpecies2\n")
+            temp_file.seek(0)
+
+            with patch.object(Species, "enrich", enrich_side_effect):
+                with self.assertRaises(KeyboardInterrupt):
+                    call_command(
+                        "load_species", filename=temp_file.name, image_processes=0
+                    )
+
+        # Handled species are kept, for the next run to resume from.
+        with open(f"{temp_file.name}.checkpoint") as checkpoint_file:
+            self.assertEqual(checkpoint_file.read(), "Species1\n")
+
+    @patch("plant_species.management.commands.load_species.render_derivatives")
+    def test_load_species_resume_derivatives(self, mock_render_derivatives):
+        family = Family.objects.create(latin_name="Fam", gbif_id=3)
+        genus = Genus.objects.create(latin_name="Gen", family=family, gbif_id=2)
+        # Added by an interrupted run before its derivatives were stored.
+        species = Species.objects.create(
+            latin_name="Species1",
+            gbif_id=3,
+            genus=genus,
+            image="plant_species/images/species1.jpg",
+        )
+
+        mock_render_derivatives.return_value = {
+            "large": b"large",
+            "thumbnail": b"thumb",
+        }
+
+        with tempfile.NamedTemporaryFile(mode="w+", delete=False) as temp_file:
+            temp_file.write("Species1\n")
+            temp_file.seek(0)
+
+            with (
+                patch.object(Species, "get_image_source", return_value=b"image"),
+                patch.object(Species, "set_image_derivatives") as mock_set_derivatives,
+            ):
+                call_command("load_species", filename=temp_file.name, image_processes=0)
+
+        mock_render_derivatives.assert_called_once()
+        mock_set_derivatives.assert_called_once_with(
+            {"large": b"large", "thumbnail": b"thumb"}
+        )
+        self.assertEqual(Species.objects.get().pk, species.pk)
@@ -1,8 +1,19 @@
 from unittest.mock import patch
+from django.db import IntegrityError
+from django.db.models import QuerySet
 from django.test import TestCase
 from django.utils.text import slugify
 
-from plant_species.models import Family, Genus, Species, SpeciesVariety
+from plant_species.models import (
+    Family,
+    Genus,
+    Species,
+    SpeciesCommonName,
+    SpeciesVariety,
+    _get_genus,
+)
+from plant_species.enrichment.wikidata import WikidataEntity
+from plant_species.enrichment.wikipedia import WikipediaPage
 
 
 class SpeciesTestMixin:
@@ -37,10 +48,11 @@ class SpeciesBaseTestCase(SpeciesTestMixin, TestCase):
         assert self.species.latin_name
         self.assertEqual(self.species.slug, slugify(self.species.latin_name))
 
+    @patch("plant_species.models.get_wikidata_entity", return_value=None)
     @patch("plant_species.models.get_latin_names")
     @patch("plant_species.models.get_image")
-    @patch("pyvips.Image.new_from_buffer")
-    def test_enrich_gbif_backbone(self, mock_new_from_buffer, mock_get_image, mock_get_latin_names):
+    @patch("plant_species.models.render_derivatives")
+    def test_enrich_gbif_backbone(self, mock_render_derivatives, mock_get_image, mock_get_latin_names, mock_get_wikidata_entity):
         from django.core.files.base import ContentFile
         
         # Mock latin names return values
@@ -58,9 +70,11 @@ class SpeciesBaseTestCase(SpeciesTestMixin, TestCase):
         mock_content_file = ContentFile(mock_image_data)
         mock_get_image.return_value = mock_content_file
         
-        # Mock vips image
-        mock_vips_image = mock_new_from_buffer.return_value
-        mock_vips_image.thumbnail_image.return_value.jpegsave_buffer.return_value = b"thumbnail data"
+        # Mock rendered derivatives
+        mock_render_derivatives.return_value = {
+            "large": b"large data",
+            "thumbnail": b"thumbnail data",
+        }
         
         new_species = Species(latin_name="Banana bananinus")
         new_species.enrich_gbif_backbone()
@@ -76,3 +90,135 @@ class SpeciesBaseTestCase(SpeciesTestMixin, TestCase):
 
         # This should not cause any errors.
         new_species.save()
+
+    def test_get_genus_existing(self):
+        species_data = {"genusKey": 2, "genus": "Rosa", "familyKey": 1}
+
+        with patch("plant_species.models._create_enriched") as mock_create:
+            self.assertEqual(_get_genus(species_data), self.genus)
+
+        mock_create.assert_not_called()
+
+    def test_get_genus_created_concurrently(self):
+        species_data = {"genusKey": 5, "genus": "Prunus", "familyKey": 1}
+        genus = Genus.objects.create(latin_name="Prunus", gbif_id=5, family=self.family)
+
+        first = QuerySet.first
+        lookups = []
+
+        def first_after_lookup(queryset):
+            # Another process creates it after this one looked it up.
+            if queryset.model is Genus:
+                lookups.append(queryset)
+                if len(lookups) == 1:
+                    return None
+
+            return first(queryset)
+
+        with (
+            patch.object(QuerySet, "first", first_after_lookup),
+            patch(
+                "plant_species.models._create_enriched",
+                side_effect=IntegrityError("UNIQUE constraint failed: gbif_id"),
+            ),
+        ):
+            self.assertEqual(_get_genus(species_data), genus)
+
+        self.assertEqual(len(lookups), 2)
+
+    @patch("plant_species.models.get_wikidata_entity")
+    @patch("plant_species.models.get_wikipedia_pages")
+    def test_enrich_wikipedia(self, mock_get_wikipedia_pages, mock_get_wikidata_entity):
+        mock_get_wikidata_entity.return_value = WikidataEntity(
+            "Q1", labels={}, sitelinks={"en": "Sweet briar", "nl": "Egelantier"}
+        )
+        mock_get_wikipedia_pages.return_value = {
+            "en": WikipediaPage(
+                "Sweet briar", "https://en.wikipedia.org/wiki/Sweet_briar", 1, "Rose. "
+            ),
+            "nl": WikipediaPage(
+                "Egelantier", "https://nl.wikipedia.org/wiki/Egelantier", 2, "Roos."
+            ),
+        }
+
+        self.species.enrich_wikipedia()
+        self.species.save()
+
+        species = Species.objects.get(pk=self.species.pk)
+        self.assertEqual(species.description, "Rose.")
+        self.assertEqual(species.wikipedia_pageid, 1)
+        self.assertEqual(species.get_wikipedia_summary("nl"), "Roos.")
+        self.assertIn(
+            'href="https://en.wikipedia.org/wiki/Sweet_briar"', species.wikipedia_link()
+        )
+
+        # Titles linked from Wikidata.
+        self.assertEqual(
+            mock_get_wikipedia_pages.call_args.kwargs["titles"],
+            {"en": "Sweet briar", "nl": "Egelantier"},
+        )
+
+        # Stored, rather than fetched again.
+        species.enrich_wikipedia()
+        mock_get_wikipedia_pages.assert_called_once()
+
+    @patch("plant_species.models.get_wikidata_entity")
+    def test_enrich_wikidata(self, mock_get_wikidata_entity):
+        mock_get_wikidata_entity.return_value = WikidataEntity(
+            "Q1",
+            labels={"en": "Rosa rubiginosa", "nl": "egelantier"},
+            sitelinks={},
+        )
+
+        self.species.enrich_wikidata()
+        self.assertEqual(self.species.wikidata_id, "Q1")
+
+        self.species.enrich_wikidata_common_names()
+        self.species.enrich_wikidata_common_names()
+
+        # Labels which are the latin name aren't common names.
+        self.assertEqual(
+            list(self.species.common_names.values_list("language", "name")),
+            [("nl", "Egelantier")],
+        )
+
+
+class CommonNameTestCase(SpeciesTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        SpeciesCommonName.objects.create(
+            species=cls.species, language="en", name="Sweet briar"
+        )
+
+    def test_str_queries_once(self):
+        species = Species.objects.get(pk=self.species.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(str(species), "Rosa rubiginosa (Sweet briar)")
+            self.assertEqual(species.get_common_name(), "Sweet briar")
+
+        # Refreshing forgets the common name.
+        SpeciesCommonName.objects.update(name="Eglantine")
+        species.refresh_from_db()
+        self.assertEqual(species.get_common_name(), "Eglantine")
+
+    def test_with_common_names(self):
+        species_list = list(Species.objects.with_common_names())
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [str(species) for species in species_list],
+                ["Rosa rubiginosa (Sweet briar)"],
+            )
+
+    def test_variety_str(self):
+        variety = SpeciesVariety.objects.select_related("species").get(
+            pk=self.variety.pk
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                str(variety), "Rosa rubiginosa (Sweet briar) var. TestVariety"
+            )
+            str(variety)
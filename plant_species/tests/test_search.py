@@ -0,0 +1,127 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from plant_species.models import (
+    Family,
+    Genus,
+    GenusCommonName,
+    Species,
+    SpeciesCommonName,
+    SpeciesSearchTerm,
+)
+from plant_species.search import normalize, rebuild_search_terms, search_species
+from species_data import response_cache
+
+
+class SpeciesSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.family = Family.objects.create(latin_name="Rosaceae", gbif_id=1)
+        cls.genus = Genus.objects.create(
+            latin_name="Rosa", gbif_id=2, family=cls.family
+        )
+        cls.species = Species.objects.create(
+            latin_name="Rosa rubiginosa", gbif_id=3, genus=cls.genus
+        )
+        cls.other_species = Species.objects.create(
+            latin_name="Rosa canina", gbif_id=4, genus=cls.genus
+        )
+        SpeciesCommonName.objects.create(
+            species=cls.other_species, language="en", name="Dog rose"
+        )
+
+    def setUp(self):
+        response_cache.clear()
+
+    def _search(self, query: str):
+        return list(search_species(query).values_list("uuid", flat=True))
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Églantier  odorant"), ["eglantier", "odorant"])
+
+    def test_prefix(self):
+        self.assertEqual(self._search("rubig"), [self.species.uuid])
+        self.assertEqual(self._search("ROSA rub"), [self.species.uuid])
+        self.assertEqual(self._search("dog"), [self.other_species.uuid])
+        self.assertEqual(self._search("unknown"), [])
+        self.assertEqual(self._search(""), [])
+
+    def test_ranking(self):
+        GenusCommonName.objects.create(genus=self.genus, language="en", name="Rose")
+
+        # Common names of species rank above those of their genus.
+        self.assertEqual(
+            self._search("rose"), [self.other_species.uuid, self.species.uuid]
+        )
+
+    def test_typo(self):
+        self.assertEqual(self._search("rubignosa"), [self.species.uuid])
+        self.assertEqual(self._search("Rsa canina"), [])
+
+    def test_incremental_update(self):
+        name = SpeciesCommonName.objects.create(
+            species=self.species, language="de", name="Wein-Rose"
+        )
+        self.assertEqual(self._search("wein"), [self.species.uuid])
+
+        name.delete()
+        self.assertEqual(self._search("wein"), [])
+
+        GenusCommonName.objects.create(genus=self.genus, language="de", name="Rosen")
+        self.assertEqual(len(self._search("rosen")), 2)
+
+        self.family.latin_name = "Rosids"
+        self.family.save()
+        self.assertEqual(len(self._search("rosids")), 2)
+
+    def test_unrelated_update(self):
+        SpeciesSearchTerm.objects.filter(species=self.species).delete()
+
+        # Only saves which may change names reindex.
+        self.species.description = "Sweet briar."
+        self.species.save(update_fields=["description"])
+        self.genus.save(update_fields=["description"])
+        self.assertEqual(self._search("rubig"), [])
+
+        self.species.save(update_fields=["latin_name"])
+        self.assertEqual(self._search("rubig"), [self.species.uuid])
+
+    def test_delete(self):
+        GenusCommonName.objects.create(genus=self.genus, language="en", name="Rose")
+        self.other_species.delete()
+
+        self.assertFalse(
+            SpeciesSearchTerm.objects.filter(species=self.other_species.uuid).exists()
+        )
+        self.assertEqual(self._search("rose"), [self.species.uuid])
+
+    def test_all_results(self):
+        for i in range(150):
+            Species.objects.create(
+                latin_name=f"Rosa hybrida {i}", gbif_id=100 + i, genus=self.genus
+            )
+
+        # Bounded by pagination, rather than truncated.
+        self.assertEqual(len(self._search("rosa")), 152)
+
+    def test_rebuild(self):
+        SpeciesSearchTerm.objects.all().delete()
+        rebuild_search_terms()
+
+        self.assertEqual(self._search("rubig"), [self.species.uuid])
+        self.assertEqual(
+            SpeciesSearchTerm.objects.get(species=self.species, term="rosa").weight, 10
+        )
+
+    def test_search_api(self):
+        response = self.client.get(reverse("species-list"), {"search": "rosa"})
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 2)
+
+        response = self.client.get(reverse("species-list"), {"search": "rubig"})
+        self.assertEqual(
+            [species["slug"] for species in response.json()["results"]],
+            [self.species.slug],
+        )
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from plant_species.singleflight import SingleFlight
+
+
+class SingleFlightTestCase(SimpleTestCase):
+    def _run_concurrently(self, fn, callers: int = 4):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(None)
+            started.set()
+            release.wait(5)
+            return fn()
+
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            futures = [executor.submit(flight.do, "key", call)]
+            started.wait(5)
+            futures += [
+                executor.submit(flight.do, "key", call) for _ in range(callers - 1)
+            ]
+            # Let the waiters block on the call in flight.
+            threading.Event().wait(0.1)
+            release.set()
+
+        return len(calls), futures
+
+    def test_shared_result(self):
+        result = object()
+        calls, futures = self._run_concurrently(lambda: result)
+
+        self.assertEqual(calls, 1)
+        for future in futures:
+            self.assertIs(future.result(), result)
+
+    def test_shared_exception(self):
+        def fail():
+            raise ValueError("Unavailable")
+
+        calls, futures = self._run_concurrently(fail)
+
+        self.assertEqual(calls, 1)
+        for future in futures:
+            self.assertIsInstance(future.exception(), ValueError)
+
+    def test_sequential(self):
+        flight = SingleFlight()
+
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+        # Completed calls aren't remembered.
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+        self.assertEqual(flight.do("other", lambda: 3), 3)
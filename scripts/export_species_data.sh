@@ -5,10 +5,5 @@ PROJECT_PATH=$(cd $(dirname $0); cd ..; pwd -P)
 
 cd $PROJECT_PATH
 
-echo "Getting data out of the DB"
-./manage.py dumpdata --natural-primary --natural-foreign  \
-	plant_species species_data | \
-	bzip2 > fixtures/plant_species_data.json.bz2
-
-echo "Creating a tarball"
-tar cvf treescape_plant_species_data.tar fixtures/plant_species_data.json.bz2 media/plant_species
+# Only changed fixture partitions and images are compressed and copied.
+./manage.py make_species_archive species_data_archive
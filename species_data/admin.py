@@ -1,4 +1,5 @@
 from django.contrib import admin
+from plant_species.models import Species
 from .models import (
     Source,
     SourceType,
@@ -231,3 +232,10 @@ class SpeciesPropertiesAdmin(admin.ModelAdmin):
         "propagation_methods",
     )
     list_select_related = ("species",)
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(Species.prefetch_common_names("species__common_names"))
+        )
@@ -6,3 +6,6 @@ class SpeciesDataConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "species_data"
     verbose_name = _("Species Data")
+
+    def ready(self):
+        from . import signals  # noqa: F401
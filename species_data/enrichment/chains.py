@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import Type
+from typing import TYPE_CHECKING, Tuple, Type
 from langchain.globals import set_verbose
 from langchain.output_parsers import (
     PydanticOutputParser,
@@ -12,6 +12,9 @@ from pydantic import BaseModel
 
 from species_data.enrichment.config import EnrichmentConfig
 
+if TYPE_CHECKING:
+    from species_data.enrichment.registry import EnrichmentSchema
+
 
 logger = logging.getLogger(__name__)
 
@@ -50,8 +53,10 @@ Another example:
 _user_prompt = """Please provide plant properties ({plant_properties}) for the species '{species_name}'."""
 
 
-def get_enrichment_chain(config: EnrichmentConfig, data_model: Type[BaseModel]):
-    """Generates a chain for enriching plant species data using a language model."""
+def get_enrichment_prompt(
+    data_model: Type[BaseModel],
+) -> Tuple[PydanticOutputParser, ChatPromptTemplate]:
+    """Generates the output parser and prompt for a species data model."""
 
     example = json.dumps(
         {
@@ -111,10 +116,6 @@ def get_enrichment_chain(config: EnrichmentConfig, data_model: Type[BaseModel]):
     )
     parser = PydanticOutputParser(pydantic_object=data_model)
 
-    retry_parser = RetryWithErrorOutputParser.from_llm(
-        parser=parser, llm=config.fallback_llm
-    )
-
     # Perplexity (only) uses user prompt for RAG query.
     prompt = ChatPromptTemplate.from_messages(
         [("system", _system_prompt), ("user", _user_prompt)],
@@ -132,6 +133,18 @@ def get_enrichment_chain(config: EnrichmentConfig, data_model: Type[BaseModel]):
         plant_properties=plant_properties,
     )
 
+    return parser, prompt
+
+
+def get_enrichment_chain(config: EnrichmentConfig, schema: "EnrichmentSchema"):
+    """Generates a chain for enriching plant species data using a language model."""
+
+    prompt = schema.prompt
+
+    retry_parser = RetryWithErrorOutputParser.from_llm(
+        parser=schema.parser, llm=config.fallback_llm
+    )
+
     completion_chain = prompt | config.llm
 
     def parse_result(response):
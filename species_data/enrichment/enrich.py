@@ -4,13 +4,16 @@ from pprint import pformat
 import decimal
 import logging
 import datetime
-from typing import Iterable, Set
+from typing import Dict, Iterable, List, Sequence, Set
 
+from django.db import transaction
+from django.db.models import Model
 from pydantic import BaseModel
 
 from plant_species.models import Species
 from species_data.enrichment.config import EnrichmentConfig
-from species_data.enrichment.models import ConfidenceModel, get_species_data_model
+from species_data.enrichment.models import ConfidenceModel
+from species_data.enrichment.registry import get_enrichment_schema
 from species_data.enrichment.utils import get_fields
 from species_data.models import (
     Source,
@@ -23,13 +26,22 @@ from .exceptions import NoValuesSetException
 logger = logging.getLogger(__name__)
 
 
+def improves_confidence(
+    current: decimal.Decimal | None, new: decimal.Decimal | None
+) -> bool:
+    """Whether a new value should replace the current one, given their confidence."""
+    if current is None:
+        return True
+
+    return new is not None and new > current
+
+
 def set_decimalrange_property(
     species_properties: SpeciesProperties,
     prop_name: str,
     prop_value: dict,
-    sources: Iterable[Source],
 ):
-    """Sets a decimal range property on a SpeciesProperties instance."""
+    """Sets a decimal range property on a SpeciesProperties instance, without sources."""
 
     logger.debug(
         f"Setting {prop_name} on {species_properties.species}. Value: {prop_value}"
@@ -52,8 +64,47 @@ def set_decimalrange_property(
         else:
             logger.info(f"No value for {prop_name}_{value_name}, skipping")
 
-    sources_attr = getattr(species_properties, f"{prop_name}_sources")
-    sources_attr.set(sources)
+
+def set_sources(objs: Sequence[Model], field_name: str, sources: Iterable[Source]):
+    """Replaces sources of objects of one model in bulk, like `sources.set()` on each."""
+
+    if not objs:
+        return
+
+    field = objs[0]._meta.get_field(field_name)
+    through = field.remote_field.through
+    obj_column = f"{field.m2m_field_name()}_id"
+    source_column = f"{field.m2m_reverse_field_name()}_id"
+
+    through.objects.filter(**{f"{obj_column}__in": [obj.pk for obj in objs]}).delete()
+    through.objects.bulk_create(
+        [
+            through(**{obj_column: obj.pk, source_column: source.pk})
+            for obj in objs
+            for source in sources
+        ]
+    )
+
+
+def get_sources(citations: Iterable[str]) -> List[Source]:
+    """Returns Perplexity sources for citation URLs, creating missing ones in bulk."""
+
+    source_type = SourceType.objects.get_or_create(name="Perplexity")[0]
+    urls = list(dict.fromkeys(citations))
+
+    sources = {
+        source.url: source
+        for source in Source.objects.filter(source_type=source_type, url__in=urls)
+    }
+    missing = [
+        Source(url=url, source_type=source_type, date=datetime.datetime.now())
+        for url in urls
+        if url not in sources
+    ]
+    for source in Source.objects.bulk_create(missing):
+        sources[source.url] = source
+
+    return [sources[url] for url in urls]
 
 
 def set_category_property(
@@ -61,58 +112,80 @@ def set_category_property(
     prop_name: str,
     prop_value: ConfidenceModel,
     sources: Iterable[Source],
-):
-    """Sets a category property on a SpeciesProperties instance."""
+    category_ids: Dict[str, int],
+) -> List[Model]:
+    """
+    Sets a category property on a SpeciesProperties instance.
+
+    Categories are looked up by slug in `category_ids` and the through rows upserted
+    in bulk, where confidence improves. Returns those rows.
+    """
 
     if not getattr(prop_value, "values", None):
         logger.info("No values in {prop_name}, skipping.")
-        return
+        return []
 
     logger.debug(f"Setting {prop_name} with {prop_value}")
 
+    # Derive through_class (what links species properties and categories, the
+    # other side of the M2M) using prop_name on species_properties.
+    prop = getattr(species_properties, prop_name)  # ManyRelatedManager
+    through_class = prop.through
+
+    objs = []
     values: Set[Enum] = prop_value.values  # type: ignore
     for value in values:
-        # Derive category_class, the other side of the M2M)
-        # and through_class (what links them) them
-        # using prop_name on species_properties.
-        # Both category_class and through_class are Django models,
-        # as is SpeciesProperties.
-        prop = getattr(species_properties, prop_name)  # ManyRelatedManager
-
-        category_class = prop.model
-        through_class = prop.through
-
         # Sometimes value is empty!?
-        if value:
-            get_values = {
-                "species": species_properties,
-            }
-
-            try:
-                get_values[prop.target_field_name] = category_class.objects.get(
-                    slug=value.value
-                )
-            except category_class.DoesNotExist:
-                print(f"Warning! {prop_name} with slug {value} not found!")
-                continue
-
-            try:
-                obj = through_class.objects.get(**get_values)
-            except through_class.DoesNotExist:
-                obj = through_class(**get_values)
+        if not value:
+            continue
+
+        category_id = category_ids.get(value.value)
+        if category_id is None:
+            logger.warning(f"{prop_name} with slug {value} not found!")
+            continue
+
+        obj = through_class(
+            **{
+                prop.source_field_name: species_properties,
+                f"{prop.target_field_name}_id": category_id,
+            },
+            confidence=prop_value.confidence,
+        )
+        # Foreign keys are known to exist, skip querying them.
+        obj.clean_fields(exclude=[prop.source_field_name, prop.target_field_name])
+        objs.append(obj)
+
+    # Keep existing values with at least the same confidence.
+    existing = dict(
+        through_class.objects.filter(
+            **{prop.source_field_name: species_properties}
+        ).values_list(f"{prop.target_field_name}_id", "confidence")
+    )
+    objs = [
+        obj
+        for obj in objs
+        if improves_confidence(
+            existing.get(getattr(obj, f"{prop.target_field_name}_id")), obj.confidence
+        )
+    ]
+
+    # Sets primary keys of updated rows as well.
+    objs = through_class.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        update_fields=["confidence"],
+        unique_fields=[prop.source_field_name, prop.target_field_name],
+    )
 
-            obj.confidence = prop_value.confidence
-            obj.full_clean()
-            obj.save()
+    set_sources(objs, "sources", sources)
 
-            obj.sources.set(sources)
+    return objs
 
 
 def enrich_species_data(species: Species, config: EnrichmentConfig):
     """Retrieves and stores additional data about a plant species using a language model."""
 
-    data_model = get_species_data_model()
-    chain = get_enrichment_chain(config, data_model)
+    chain = get_enrichment_chain(config, get_enrichment_schema())
 
     # if not species.wikipedia_page:
     #     logger.warning(f"No Wikipedia page for {species}, skipping.")
@@ -133,66 +206,89 @@ def enrich_species_data(species: Species, config: EnrichmentConfig):
         }
     )
 
-    logger.debug(f"Received data: {pformat(plant_data)}")
+    store_species_data(species, plant_data, citations)
 
-    source_type = SourceType.objects.get_or_create(name="Perplexity")[0]
 
-    sources = []
-    for url in citations:
-        source = Source.objects.get_or_create(
-            url=url,
-            source_type=source_type,
-            defaults={
-                "date": datetime.datetime.now(),
-            },
-        )[0]
+def store_species_data(
+    species: Species, plant_data: BaseModel, citations: Iterable[str]
+):
+    """
+    Stores data about a plant species returned by the enrichment chain.
 
-        sources.append(source)
+    Writes in bulk within a single transaction, taking a few statements per property.
+    """
 
-    species_properties = SpeciesProperties.objects.get_or_create(species=species)[0]
+    logger.debug(f"Received data: {pformat(plant_data)}")
 
     fields = get_fields(SpeciesProperties)
     assert fields
     assert len(fields.decimalranges) > 0
     assert len(fields.categories) > 0
 
-    for prop_name, prop_value in [
-        (prop_name, getattr(plant_data, prop_name))
-        for prop_name in fields.decimalranges
-    ]:
-        if prop_value:
-            # TODO: Only update when confidence is higher!
-            set_decimalrange_property(
-                species_properties, prop_name, prop_value, sources
-            )
-
-    species_properties.full_clean()
-
-    species_properties.save()
-    logger.debug(f"Saved {species_properties}")
+    category_ids = get_enrichment_schema().category_ids
 
-    # For each of EcologicalRole, GrowthHabit, HumanUse and Climate zone:
-    # when given, lookup category based on slug in values and update species with it,
-    # storing CategorizedSpeciesPropertyThroughBase and get_or_create'ing a Source with SourceType named Wikipedi
-    # with the URL of the Wikipedia page.
+    with transaction.atomic():
+        sources = get_sources(citations)
 
-    for prop_name, prop_value in [
-        (prop_name, getattr(plant_data, prop_name)) for prop_name in fields.categories
-    ]:
-        if prop_value:
-            set_category_property(species_properties, prop_name, prop_value, sources)
+        species_properties = SpeciesProperties.objects.get_or_create(species=species)[0]
+        species_properties.species = species
 
-    # Prevent completely empty data. We can only test this after it has been created due to the
-    # relational map. It precludes things like empty Wikipedia pages.
-    if not any(
-        [
-            getattr(species_properties, f"{field}_{value}")
-            for field in fields.decimalranges
-            for value in ["minimum", "typical", "maximum"]
+        decimalranges = [
+            prop_name
+            for prop_name in fields.decimalranges
+            if getattr(plant_data, prop_name)
+            and improves_confidence(
+                getattr(species_properties, f"{prop_name}_confidence"),
+                getattr(plant_data, prop_name).confidence,
+            )
         ]
-    ) and not any(
-        [getattr(species_properties, field).exists() for field in fields.categories]
-    ):
-        # Reverse save.
-        species_properties.delete()
-        raise NoValuesSetException(f"Deleted {species_properties}: no values set.")
+        for prop_name in decimalranges:
+            set_decimalrange_property(
+                species_properties, prop_name, getattr(plant_data, prop_name)
+            )
+
+        # Uniqueness and the species are guaranteed by get_or_create().
+        species_properties.full_clean(
+            exclude=["species"], validate_unique=False, validate_constraints=False
+        )
+
+        species_properties.save()
+        logger.debug(f"Saved {species_properties}")
+
+        for prop_name in decimalranges:
+            set_sources([species_properties], f"{prop_name}_sources", sources)
+
+        # For each category property, when given, lookup categories based on slug in
+        # values and link them to the species, with the sources.
+        has_categories = False
+        for prop_name in fields.categories:
+            prop_value = getattr(plant_data, prop_name)
+            if prop_value:
+                category_model = getattr(species_properties, prop_name).model
+                if set_category_property(
+                    species_properties,
+                    prop_name,
+                    prop_value,
+                    sources,
+                    category_ids[category_model],
+                ):
+                    has_categories = True
+
+        # Prevent completely empty data. We can only test this after it has been created due to the
+        # relational map. It precludes things like empty Wikipedia pages.
+        if not any(
+            [
+                getattr(species_properties, f"{field}_{value}")
+                for field in fields.decimalranges
+                for value in ["minimum", "typical", "maximum"]
+            ]
+        ) and not (
+            has_categories
+            or any(
+                getattr(species_properties, field).exists()
+                for field in fields.categories
+            )
+        ):
+            # Reverse save.
+            species_properties.delete()
+            raise NoValuesSetException(f"Deleted {species_properties}: no values set.")
@@ -0,0 +1,81 @@
+"""
+Process-level cache of the species data model, prompt and category slugs.
+
+All enumerate the category tables, so they're rebuilt when the version of those
+tables changes. Versions are bumped by signals and kept with the response versions,
+in the species data cache shared by processes (see SPECIES_DATA_CACHE), so changes in
+one reach the others.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Type
+
+from django.db.models import Model
+from langchain.output_parsers import PydanticOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+from species_data import response_cache
+from species_data.models import SpeciesProperties
+
+from .chains import get_enrichment_prompt
+from .models import get_species_data_model
+from .utils import get_fields
+
+_VERSION_KEY = "species_data:categories:version"
+
+
+@dataclass(frozen=True)
+class EnrichmentSchema:
+    """Species data model, with the parser and prompt generated from it."""
+
+    data_model: Type[BaseModel]
+    parser: PydanticOutputParser
+    prompt: ChatPromptTemplate
+    # Primary keys of categories by slug, per category model.
+    category_ids: Dict[Type[Model], Dict[str, int]]
+
+
+_lock = threading.Lock()
+_schema: Optional[Tuple[int, EnrichmentSchema]] = None
+
+
+def get_categories_version() -> int:
+    return response_cache.get_versions([_VERSION_KEY])[0]
+
+
+def bump_categories_version():
+    response_cache.bump_versions([_VERSION_KEY])
+
+
+def _get_category_ids() -> Dict[Type[Model], Dict[str, int]]:
+    category_models = [
+        SpeciesProperties._meta.get_field(name).related_model
+        for name in get_fields(SpeciesProperties).categories
+    ]
+
+    return {
+        model: dict(model.objects.values_list("slug", "pk"))
+        for model in category_models
+    }
+
+
+def get_enrichment_schema() -> EnrichmentSchema:
+    """Return the schema for the current categories, building it when outdated."""
+
+    global _schema
+
+    version = get_categories_version()
+
+    with _lock:
+        if _schema is None or _schema[0] != version:
+            data_model = get_species_data_model()
+            parser, prompt = get_enrichment_prompt(data_model)
+
+            _schema = (
+                version,
+                EnrichmentSchema(data_model, parser, prompt, _get_category_ids()),
+            )
+
+        return _schema[1]
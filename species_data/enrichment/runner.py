@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+
+from plant_species.models import Species
+from species_data.enrichment.config import EnrichmentConfig
+from species_data.enrichment.registry import get_enrichment_schema
+
+from .chains import get_enrichment_chain
+from .enrich import store_species_data
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Rate limiter allowing `rate` acquisitions per second, in bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in order.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class RunnerStats:
+    """Outcome of an enrichment run."""
+
+    succeeded: int = 0
+    failures: Counter = field(default_factory=Counter)
+    # Seconds per completion, including failed ones.
+    latencies: List[float] = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def failed(self) -> int:
+        return sum(self.failures.values())
+
+    @property
+    def throughput(self) -> float:
+        """Species processed per second."""
+        if not self.duration:
+            return 0.0
+
+        return (self.succeeded + self.failed) / self.duration
+
+    def percentile(self, percent: float) -> float:
+        """Latency percentile, using the nearest rank."""
+        if not self.latencies:
+            return 0.0
+
+        latencies = sorted(self.latencies)
+        rank = max(math.ceil(percent / 100 * len(latencies)), 1)
+
+        return latencies[rank - 1]
+
+    def summary(self) -> str:
+        lines = [
+            f"Succeeded: {self.succeeded}, failed: {self.failed} "
+            f"in {self.duration:.1f}s ({self.throughput:.2f} species/s).",
+            "Latency: "
+            + ", ".join(
+                f"p{percent} {self.percentile(percent):.2f}s"
+                for percent in (50, 90, 99)
+            )
+            + ".",
+        ]
+        lines.extend(f"{name}: {count}" for name, count in self.failures.most_common())
+
+        return "\n".join(lines)
+
+
+# Called for every processed species, with the exception when it failed.
+ProgressCallback = Callable[[Species, Optional[Exception]], None]
+
+
+class EnrichmentRunner:
+    """
+    Enrich many species concurrently, sharing one chain.
+
+    Completions are requested concurrently, up to `concurrency` at a time and at
+    most `rate` per second when given. Results are stored one at a time by a single
+    writer, so database writes never contend.
+    """
+
+    def __init__(
+        self,
+        config: EnrichmentConfig,
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        self.chain = get_enrichment_chain(config, get_enrichment_schema())
+        self.concurrency = concurrency
+        self.rate = rate
+        self.on_progress = on_progress
+
+    def _done(self, species: Species, error: Optional[Exception] = None):
+        if error:
+            self.stats.failures[type(error).__name__] += 1
+            logger.warning(f"Failed enriching {species.latin_name}: {error!r}")
+        else:
+            self.stats.succeeded += 1
+
+        if self.on_progress:
+            self.on_progress(species, error)
+
+    async def _complete(self, species: Species, name: str, queue: asyncio.Queue):
+        async with self._semaphore:
+            if self._bucket:
+                await self._bucket.acquire()
+
+            start = time.monotonic()
+            try:
+                result = await self.chain.ainvoke({"species_name": name})
+            except Exception as e:
+                self._done(species, e)
+                return
+            finally:
+                self.stats.latencies.append(time.monotonic() - start)
+
+        await queue.put((species, result))
+
+    async def _write(self, queue: asyncio.Queue):
+        store = sync_to_async(store_species_data, thread_sensitive=True)
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+
+            species, (plant_data, citations) = item
+            try:
+                await store(species, plant_data, citations)
+            except Exception as e:
+                self._done(species, e)
+            else:
+                self._done(species)
+
+    async def run(self, species_list: Iterable[Species]) -> RunnerStats:
+        """
+        Enrich species, which should be fetched from the database beforehand.
+
+        Prompt names include common names, so fetch species with_common_names() to
+        look them up without a query per species.
+        """
+
+        self.stats = RunnerStats()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = (
+            TokenBucket(self.rate, capacity=self.concurrency) if self.rate else None
+        )
+
+        # Bounded, so completions wait for the writer rather than pile up.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+
+        # __str__() may query common names, which isn't allowed in the event loop.
+        species_list = list(species_list)
+        names = await sync_to_async(
+            lambda: [str(species) for species in species_list], thread_sensitive=True
+        )()
+
+        start = time.monotonic()
+        writer = asyncio.create_task(self._write(queue))
+        try:
+            await asyncio.gather(
+                *(
+                    self._complete(species, name, queue)
+                    for species, name in zip(species_list, names)
+                )
+            )
+            await queue.put(None)
+            await writer
+        finally:
+            writer.cancel()
+            self.stats.duration = time.monotonic() - start
+
+        return self.stats
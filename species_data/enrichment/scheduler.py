@@ -0,0 +1,128 @@
+"""
+Select species most in need of re-enrichment.
+
+Species are scored by staleness, from 0 (fresh) to 1 (never enriched), combining
+missing range properties, low confidence of range properties and the age of their
+most recent source. Only the stalest are re-enriched, keeping spend proportional to
+what needs refreshing.
+"""
+
+import datetime
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from django.db.models import Max, QuerySet
+
+from plant_species.models import Species
+from species_data.models import SpeciesProperties
+
+from .utils import get_fields
+
+# Relative weights of staleness components, adding up to 1.
+MISSING_WEIGHT = 0.4
+CONFIDENCE_WEIGHT = 0.4
+AGE_WEIGHT = 0.2
+
+# Sources this old or older count as fully stale.
+MAX_SOURCE_AGE = datetime.timedelta(days=365)
+
+
+@dataclass
+class Staleness:
+    species_id: int
+    score: float
+
+
+def _latest_source_dates(prop_names: List[str]) -> Dict[int, datetime.date]:
+    """Date of the most recent source of range properties, by species properties."""
+
+    latest: Dict[int, datetime.date] = {}
+    for prop_name in prop_names:
+        field = SpeciesProperties._meta.get_field(f"{prop_name}_sources")
+        through = field.remote_field.through
+        owner = field.m2m_field_name()
+
+        dates = (
+            through.objects.values_list(owner)
+            .annotate(latest=Max(f"{field.m2m_reverse_field_name()}__date"))
+            .order_by()
+        )
+        for properties_id, date in dates:
+            if date and (properties_id not in latest or date > latest[properties_id]):
+                latest[properties_id] = date
+
+    return latest
+
+
+def get_staleness(
+    species: Optional[QuerySet[Species]] = None,
+    today: Optional[datetime.date] = None,
+) -> List[Staleness]:
+    """Staleness of species, stalest first, in a fixed number of queries."""
+
+    if species is None:
+        species = Species.objects.all()
+    if today is None:
+        today = datetime.date.today()
+
+    prop_names = get_fields(SpeciesProperties).decimalranges
+    value_fields = [
+        f"{prop_name}_{value}"
+        for prop_name in prop_names
+        for value in ["minimum", "typical", "maximum", "confidence"]
+    ]
+
+    properties = {
+        row["species"]: row
+        for row in SpeciesProperties.objects.filter(
+            species__in=species.values("uuid")
+        ).values("pk", "species", *value_fields)
+    }
+    latest_dates = _latest_source_dates(prop_names)
+
+    results = []
+    for species_id, uuid in species.values_list("pk", "uuid"):
+        row = properties.get(uuid)
+        if row is None:
+            results.append(Staleness(species_id, 1.0))
+            continue
+
+        missing = 0
+        uncertainty = 0.0
+        for prop_name in prop_names:
+            if not any(
+                row[f"{prop_name}_{value}"] is not None
+                for value in ["minimum", "typical", "maximum"]
+            ):
+                missing += 1
+                uncertainty += 1
+            else:
+                uncertainty += 1 - float(row[f"{prop_name}_confidence"] or 0)
+
+        latest = latest_dates.get(row["pk"])
+        age = min((today - latest) / MAX_SOURCE_AGE, 1) if latest else 1
+
+        score = (
+            MISSING_WEIGHT * missing / len(prop_names)
+            + CONFIDENCE_WEIGHT * uncertainty / len(prop_names)
+            + AGE_WEIGHT * age
+        )
+        results.append(Staleness(species_id, score))
+
+    results.sort(key=lambda staleness: staleness.score, reverse=True)
+
+    return results
+
+
+def select_stale_species(budget: int, min_score: float = 0.0) -> List[Species]:
+    """The `budget` stalest species with a staleness of at least `min_score`."""
+
+    selected = [
+        staleness.species_id
+        for staleness in get_staleness()
+        if staleness.score >= min_score
+    ][:budget]
+
+    species = Species.objects.with_common_names().in_bulk(selected)
+
+    return [species[pk] for pk in selected]
@@ -0,0 +1,304 @@
+"""
+Compact snapshot of the species catalog, for offline clients.
+
+The export is a gzip compressed JSON Lines file, with a header, then categories and
+then species, which refer to categories by their integer id:
+
+    {"type": "header", "format": 1, "categories": ["growth_habits", ...]}
+    {"type": "category", "kind": "growth_habits", "id": 1, "slug": "tree", ...}
+    {"type": "species", "id": 1, "slug": "quercus-robur", "growth_habits": [1], ...}
+
+Species are written in chunks by primary key range, each compressed as a separate
+gzip member, which concatenate into a valid gzip file. Chunks are stored by the
+digest of their content, so rebuilding only compresses chunks which changed. The
+export itself is named by the digest of its chunks, which serves as its ETag.
+
+Exports are built by commands, never in requests, one at a time as they hold a lock
+in the species data cache shared by processes. Downloads serve the last complete
+export meanwhile. Unused chunks and exports are kept for a while, as downloads may
+still read them.
+"""
+
+import contextlib
+import datetime
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Max, Min, Prefetch
+from django.utils import timezone
+
+from plant_species.models import Species
+
+from . import response_cache
+from .enrichment.utils import get_fields
+from .models import Source, SpeciesProperties
+
+FORMAT_VERSION = 1
+
+EXPORT_DIR = "exports"
+CHUNK_DIR = f"{EXPORT_DIR}/chunks"
+
+# Species per chunk, by primary key, so new species only change the last chunk.
+CHUNK_SIZE = 500
+
+# Unused chunks and exports are only deleted once older than this.
+UNUSED_GRACE_PERIOD = datetime.timedelta(hours=1)
+
+# Builds holding the lock longer are assumed to have failed.
+BUILD_LOCK_TIMEOUT = 10 * 60
+# Seconds between attempts to take the lock from another build.
+BUILD_LOCK_POLL_INTERVAL = 1
+
+# Seconds an export found in storage, rather than registered by its build, is
+# remembered.
+FOUND_EXPORT_TIMEOUT = 60
+
+_CACHE_KEY = "species_data:export"
+_LATEST_KEY = f"{_CACHE_KEY}:latest"
+_LOCK_KEY = f"{_CACHE_KEY}:lock"
+
+
+@dataclass(frozen=True)
+class Export:
+    name: str
+    digest: str
+    size: int
+
+
+def _decimal(value: Optional[Decimal]) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _dumps(record: dict) -> bytes:
+    return (
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+    )
+
+
+def _get_category_records() -> Iterator[dict]:
+    for name in get_fields(SpeciesProperties).categories:
+        model = SpeciesProperties._meta.get_field(name).related_model
+        for category in model.objects.order_by("pk"):
+            yield {
+                "type": "category",
+                "kind": name,
+                "id": category.pk,
+                "slug": category.slug,
+                "name": category.name,
+                "description": category.description,
+            }
+
+
+def _get_species_records(start: int, end: int) -> Iterator[dict]:
+    """Species with primary keys in [start, end), in a fixed number of queries."""
+
+    fields = get_fields(SpeciesProperties)
+    species_list = (
+        Species.objects.filter(pk__gte=start, pk__lt=end)
+        .order_by("pk")
+        .select_related("genus__family", "properties")
+        .prefetch_related(
+            "common_names",
+            *(
+                Prefetch(
+                    f"properties__{name}",
+                    queryset=SpeciesProperties._meta.get_field(
+                        name
+                    ).related_model.objects.only("pk"),
+                )
+                for name in fields.categories
+            ),
+            *(
+                Prefetch(
+                    f"properties__{name}_sources", queryset=Source.objects.only("pk")
+                )
+                for name in fields.decimalranges
+            ),
+        )
+    )
+
+    for species in species_list:
+        common_names = {}
+        for common_name in species.common_names.all():
+            common_names.setdefault(common_name.language, []).append(common_name.name)
+
+        record = {
+            "type": "species",
+            "id": species.pk,
+            "slug": species.slug,
+            "latin_name": species.latin_name,
+            "genus": species.genus.latin_name,
+            "family": species.genus.family.latin_name,
+            "gbif_id": species.gbif_id,
+            "description": species.description,
+            "common_names": common_names,
+        }
+
+        properties = getattr(species, "properties", None)
+        if properties:
+            for name in fields.decimalranges:
+                # Minimum, typical, maximum and confidence.
+                record[name] = [
+                    _decimal(getattr(properties, f"{name}_{value}"))
+                    for value in ["minimum", "typical", "maximum", "confidence"]
+                ]
+                record[f"{name}_sources"] = [
+                    source.pk for source in getattr(properties, f"{name}_sources").all()
+                ]
+            for name in fields.categories:
+                record[name] = sorted(
+                    category.pk for category in getattr(properties, name).all()
+                )
+
+        yield record
+
+
+def _get_chunks() -> Iterator[bytes]:
+    """Uncompressed chunks of the export, starting with header and categories."""
+
+    header = {
+        "type": "header",
+        "format": FORMAT_VERSION,
+        "categories": get_fields(SpeciesProperties).categories,
+    }
+    yield _dumps(header) + b"".join(map(_dumps, _get_category_records()))
+
+    bounds = Species.objects.aggregate(first=Min("pk"), last=Max("pk"))
+    if bounds["first"] is None:
+        return
+
+    for start in range(
+        bounds["first"] // CHUNK_SIZE * CHUNK_SIZE, bounds["last"] + 1, CHUNK_SIZE
+    ):
+        chunk = b"".join(map(_dumps, _get_species_records(start, start + CHUNK_SIZE)))
+        if chunk:
+            yield chunk
+
+
+def _store_chunk(chunk: bytes) -> str:
+    """Store chunk compressed, unless stored before, and return its name."""
+
+    name = f"{CHUNK_DIR}/{hashlib.md5(chunk).hexdigest()}.gz"
+    if not default_storage.exists(name):
+        # Fixed mtime, so equal chunks compress identically.
+        default_storage.save(name, ContentFile(gzip.compress(chunk, mtime=0)))
+
+    return name
+
+
+def _delete_unused(directory: str, used: List[str]):
+    """Delete files in directory which aren't used, unless stored recently."""
+
+    stored_before = timezone.now() - UNUSED_GRACE_PERIOD
+    _, files = default_storage.listdir(directory)
+    for filename in files:
+        name = f"{directory}/{filename}"
+        if name not in used and default_storage.get_modified_time(name) < stored_before:
+            default_storage.delete(name)
+
+
+def _get_cache() -> BaseCache:
+    return caches[settings.SPECIES_DATA_CACHE["ALIAS"]]
+
+
+def _get_version_key() -> str:
+    # Changes to species, their properties and names bump the species list version.
+    versions = response_cache.get_versions(
+        [response_cache.GLOBAL_VERSION_KEY, response_cache.list_version_key(Species)]
+    )
+    return f"{_CACHE_KEY}:{':'.join(map(str, versions))}"
+
+
+@contextlib.contextmanager
+def _build_lock():
+    """Wait for builds in other processes, so they finish in the order they start."""
+
+    cache = _get_cache()
+    while not cache.add(_LOCK_KEY, True, timeout=BUILD_LOCK_TIMEOUT):
+        time.sleep(BUILD_LOCK_POLL_INTERVAL)
+
+    try:
+        yield
+    finally:
+        cache.delete(_LOCK_KEY)
+
+
+def build_export() -> Export:
+    """
+    Build the export, reusing unchanged chunks, and register it as the current one.
+
+    Deletes old unused chunks and exports.
+    """
+
+    with _build_lock():
+        # Read first, so changes while building leave the export outdated.
+        key = _get_version_key()
+
+        chunk_names = [_store_chunk(chunk) for chunk in _get_chunks()]
+        digest = hashlib.md5("\n".join(chunk_names).encode()).hexdigest()
+        name = f"{EXPORT_DIR}/species-data-{digest}.jsonl.gz"
+
+        if not default_storage.exists(name):
+            content = b""
+            for chunk_name in chunk_names:
+                with default_storage.open(chunk_name) as f:
+                    content += f.read()
+
+            default_storage.save(name, ContentFile(content))
+
+        _delete_unused(CHUNK_DIR, chunk_names)
+        _delete_unused(EXPORT_DIR, [name])
+
+        export = Export(name, digest, default_storage.size(name))
+        _get_cache().set_many({key: export, _LATEST_KEY: export}, timeout=None)
+
+    return export
+
+
+def is_outdated() -> bool:
+    """Whether species data changed since the current export was built."""
+    return _get_cache().get(_get_version_key()) is None
+
+
+def _find_export() -> Optional[Export]:
+    """Export stored last, e.g. by a process not sharing the species data cache."""
+
+    try:
+        _, files = default_storage.listdir(EXPORT_DIR)
+    except FileNotFoundError:
+        return None
+
+    names = [f"{EXPORT_DIR}/{filename}" for filename in files]
+    if not names:
+        return None
+
+    name = max(names, key=default_storage.get_modified_time)
+    digest = name.removeprefix(f"{EXPORT_DIR}/species-data-").split(".", 1)[0]
+
+    return Export(name, digest, default_storage.size(name))
+
+
+def get_export() -> Optional[Export]:
+    """
+    Last complete export, or None before one was built.
+
+    Exports are outdated until rebuilt after species data changed, see is_outdated().
+    """
+
+    cache = _get_cache()
+    export = cache.get(_LATEST_KEY)
+    if export is None or not default_storage.exists(export.name):
+        export = _find_export()
+        if export is not None:
+            cache.set(_LATEST_KEY, export, timeout=FOUND_EXPORT_TIMEOUT)
+
+    return export
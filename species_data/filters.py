@@ -0,0 +1,33 @@
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from plant_species.search import normalize, search_species
+
+
+class SpeciesSearchFilter(BaseFilterBackend):
+    """
+    Search species through the search index, annotating their `search_rank`.
+
+    Matches prefixes of latin and common names of species, their genus and family,
+    tolerating typos.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "")
+        if not normalize(query):
+            return queryset
+
+        return search_species(query, queryset)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Words starting names of species, their genus or family.",
+                "schema": {"type": "string"},
+            }
+        ]
@@ -1,12 +1,13 @@
-from langchain_core.exceptions import OutputParserException
+from asgiref.sync import async_to_sync
 from tqdm import tqdm
 
 from django.core.management.base import BaseCommand
 
 from species_data.enrichment.config import get_default_config
-from species_data.enrichment.enrich import enrich_species_data
+from species_data.enrichment.runner import EnrichmentRunner
+from species_data.enrichment.scheduler import select_stale_species
+from species_data.export import build_export
 from plant_species.models import Species
-from species_data.enrichment.exceptions import NoValuesSetException
 
 
 class Command(BaseCommand):
@@ -14,20 +15,74 @@ class Command(BaseCommand):
 
     help = "Generates additional data about plant species using a language model."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Maximum number of concurrent completions.",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=1.0,
+            help="Maximum number of completions started per second, 0 for unlimited.",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help=(
+                "Re-enrich the stalest species, by missing properties, low confidence "
+                "and source age, rather than only species without data. New values "
+                "replace existing ones only when their confidence is higher."
+            ),
+        )
+        parser.add_argument(
+            "--budget",
+            type=int,
+            default=50,
+            help="Maximum number of species to re-enrich with --refresh.",
+        )
+        parser.add_argument(
+            "--min-staleness",
+            type=float,
+            default=0.2,
+            help="Minimum staleness (0-1) of species to re-enrich with --refresh.",
+        )
+
     def handle(self, *args, **options):
-        species_list = Species.objects.filter(properties__isnull=True)
+        if options["refresh"]:
+            species_list = select_stale_species(
+                options["budget"], min_score=options["min_staleness"]
+            )
+        else:
+            species_list = list(
+                Species.objects.filter(properties__isnull=True).with_common_names()
+            )
+
+        with tqdm(total=len(species_list)) as pbar:
+
+            def on_progress(species, error):
+                if error:
+                    pbar.write(
+                        f"Skipping {species.latin_name}: {type(error).__name__}: {error}"
+                    )
+
+                pbar.set_description(f"Processed {species.latin_name}")
+                pbar.update()
 
-        config = get_default_config()
+            runner = EnrichmentRunner(
+                get_default_config(),
+                concurrency=options["concurrency"],
+                rate=options["rate"] or None,
+                on_progress=on_progress,
+            )
+            # Writes are sent back to this thread, keeping its database connection.
+            stats = async_to_sync(runner.run)(species_list)
 
-        with tqdm(species_list) as pbar:
-            for species in pbar:
-                pbar.set_description(f"Processing {species}")
+        self.stdout.write(stats.summary())
 
-                try:
-                    enrich_species_data(species, config)
-                except NoValuesSetException as e:
-                    pbar.write(f"Skipping no data: {species}: {e}")
-                except OutputParserException as e:
-                    pbar.write(f"Skipping validation errors: {species}: {e}")
+        if stats.succeeded:
+            build_export()
 
         self.stdout.write(self.style.SUCCESS("Successfully generated species data."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from species_data.export import build_export, is_outdated
+
+
+class Command(BaseCommand):
+    help = "Build the species data export, reusing unchanged parts of the previous one."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep running, rebuilding the export whenever species data changed.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=60.0,
+            help="Seconds between checks for changes when watching (default: 60).",
+        )
+
+    def handle(self, *args, **options):
+        self._build()
+
+        while options["watch"]:
+            time.sleep(options["poll_interval"])
+            if is_outdated():
+                self._build()
+
+    def _build(self):
+        export = build_export()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {export.size} bytes to {export.name}.")
+        )
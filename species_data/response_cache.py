@@ -0,0 +1,142 @@
+"""
+Read-through cache of rendered species data API responses.
+
+Responses are kept in a small in-process tier in front of a Django cache, which can
+be file based (see SPECIES_DATA_CACHE). Their keys include versions of the objects
+or lists they render, so changing those (through signals) invalidates them precisely
+without deleting anything. Versions live in the same Django cache as responses, so
+bumping them reaches all processes sharing it, and double as ETag and Last-Modified
+for conditional requests.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db.models import Model
+
+_PREFIX = "species_data:api"
+
+# Bumped when changes affect all responses, e.g. category slugs in species.
+GLOBAL_VERSION_KEY = f"{_PREFIX}:version"
+
+# Content and content type of a rendered response.
+CachedResponse = Tuple[bytes, str]
+
+
+def _get_cache() -> BaseCache:
+    """Cache shared by processes when file based, holding responses and versions."""
+    return caches[settings.SPECIES_DATA_CACHE["ALIAS"]]
+
+
+def list_version_key(model: Type[Model]) -> str:
+    return f"{GLOBAL_VERSION_KEY}:{model._meta.label_lower}"
+
+
+def object_version_key(model: Type[Model], lookup: str) -> str:
+    return f"{list_version_key(model)}:{lookup}"
+
+
+def get_versions(keys: List[str]) -> List[int]:
+    """Current versions for keys, the time they were first requested or last bumped."""
+
+    cache = _get_cache()
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            # Keep versions bumped in the meantime.
+            cache.add(key, now, timeout=None)
+
+        versions.update(cache.get_many(missing))
+
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump_versions(keys: Iterable[str]):
+    # Unique versions, so evicted versions are never reused.
+    version = time.time_ns()
+    _get_cache().set_many({key: version for key in keys}, timeout=None)
+
+
+def invalidate(model: Type[Model], *lookups: str):
+    """Invalidate lists of model and the objects with lookups (slug or pk)."""
+    bump_versions(
+        [
+            list_version_key(model),
+            *(object_version_key(model, lookup) for lookup in lookups),
+        ]
+    )
+
+
+def invalidate_all():
+    bump_versions([GLOBAL_VERSION_KEY])
+
+
+def get_response_key(*parts) -> str:
+    """Cache key for a response, from its URL, format, language and versions."""
+    digest = hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+    return f"{_PREFIX}:response:{digest}"
+
+
+class LocalCache:
+    """Thread-safe in-process LRU cache, holding at most `max_entries`."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+
+            return value
+
+    def set(self, key: str, value: CachedResponse):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_cache = LocalCache(settings.SPECIES_DATA_CACHE["LOCAL_MAX_ENTRIES"])
+
+
+def get_response(key: str) -> Optional[CachedResponse]:
+    """Cached response for key, from the local tier, falling back to the shared one."""
+
+    response = _local_cache.get(key)
+    if response is None:
+        response = _get_cache().get(key)
+        if response is not None:
+            _local_cache.set(key, response)
+
+    return response
+
+
+def set_response(key: str, response: CachedResponse):
+    _local_cache.set(key, response)
+    _get_cache().set(key, response, settings.SPECIES_DATA_CACHE["TIMEOUT"])
+
+
+def clear():
+    """Drop all cached responses, e.g. between tests."""
+    _local_cache.clear()
+    _get_cache().clear()
+    invalidate_all()
@@ -115,30 +115,31 @@ class SpeciesPropertiesSerializer(serializers.ModelSerializer):
     class Meta:
         model = SpeciesProperties
         fields = [
+            "height_minimum",
+            "height_typical",
             "height_maximum",
             "height_confidence",
-            "height_maximum",
-            "height_source",
+            "height_sources",
             "width_minimum",
             "width_typical",
             "width_maximum",
             "width_confidence",
-            "width_source",
+            "width_sources",
             "temperature_minimum",
             "temperature_typical",
             "temperature_maximum",
             "temperature_confidence",
-            "temperature_source",
+            "temperature_sources",
             "precipitation_minimum",
             "precipitation_typical",
             "precipitation_maximum",
             "precipitation_confidence",
-            "precipitation_source",
+            "precipitation_sources",
             "soil_acidity_minimum",
             "soil_acidity_typical",
             "soil_acidity_maximum",
             "soil_acidity_confidence",
-            "soil_acidity_source",
+            "soil_acidity_sources",
             "climate_zones",
             "growth_habits",
             "human_uses",
@@ -147,20 +148,20 @@ class SpeciesPropertiesSerializer(serializers.ModelSerializer):
             "propagation_methods",
         ]
 
-    height_source = serializers.HyperlinkedRelatedField(
-        view_name="source-detail", read_only=True
+    height_sources = serializers.HyperlinkedRelatedField(
+        many=True, view_name="source-detail", read_only=True
     )
-    width_source = serializers.HyperlinkedRelatedField(
-        view_name="source-detail", read_only=True
+    width_sources = serializers.HyperlinkedRelatedField(
+        many=True, view_name="source-detail", read_only=True
     )
-    temperature_source = serializers.HyperlinkedRelatedField(
-        view_name="source-detail", read_only=True
+    temperature_sources = serializers.HyperlinkedRelatedField(
+        many=True, view_name="source-detail", read_only=True
     )
-    precipitation_source = serializers.HyperlinkedRelatedField(
-        view_name="source-detail", read_only=True
+    precipitation_sources = serializers.HyperlinkedRelatedField(
+        many=True, view_name="source-detail", read_only=True
     )
-    soil_acidity_source = serializers.HyperlinkedRelatedField(
-        view_name="source-detail", read_only=True
+    soil_acidity_sources = serializers.HyperlinkedRelatedField(
+        many=True, view_name="source-detail", read_only=True
     )
 
     climate_zones = serializers.HyperlinkedRelatedField(
@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from plant_species.models import (
+    Family,
+    FamilyCommonName,
+    Genus,
+    GenusCommonName,
+    Species,
+    SpeciesCommonName,
+)
+
+from . import response_cache
+from .enrichment.registry import bump_categories_version
+from .models import (
+    ClimateZone,
+    EcologicalRole,
+    GrowthHabit,
+    HumanUse,
+    PropagationMethod,
+    SoilPreference,
+    Source,
+    SpeciesClimateZone,
+    SpeciesEcologicalRole,
+    SpeciesGrowthHabit,
+    SpeciesHumanUse,
+    SpeciesPropagationMethod,
+    SpeciesProperties,
+    SpeciesSoilPreference,
+)
+
+# Enumerated by the species data model.
+CATEGORY_MODELS = [
+    GrowthHabit,
+    ClimateZone,
+    HumanUse,
+    EcologicalRole,
+    SoilPreference,
+    PropagationMethod,
+]
+
+# Linking species properties to categories.
+THROUGH_MODELS = [
+    SpeciesGrowthHabit,
+    SpeciesClimateZone,
+    SpeciesHumanUse,
+    SpeciesEcologicalRole,
+    SpeciesSoilPreference,
+    SpeciesPropagationMethod,
+]
+
+
+def invalidate_enrichment_schema(sender, **kwargs):
+    # Rebuilding before commit would miss the change.
+    transaction.on_commit(bump_categories_version)
+
+
+def _invalidate_responses(model, *lookups):
+    # Responses cached before commit would be stored under the new versions.
+    transaction.on_commit(lambda: response_cache.invalidate(model, *lookups))
+
+
+def invalidate_category(sender, instance, **kwargs):
+    _invalidate_responses(sender, instance.slug)
+    # Species link categories by slug.
+    transaction.on_commit(response_cache.invalidate_all)
+
+
+def invalidate_object(sender, instance, **kwargs):
+    _invalidate_responses(sender, getattr(instance, "slug", str(instance.pk)))
+
+
+def invalidate_species_lists(sender, instance, **kwargs):
+    # Species are searched by their common names and names of their genus and family.
+    _invalidate_responses(Species)
+
+
+def invalidate_properties(sender, instance, **kwargs):
+    try:
+        slug = instance.species.slug
+    except Species.DoesNotExist:
+        # Deleted along with the species, which invalidates itself.
+        return
+
+    _invalidate_responses(Species, slug)
+
+
+def invalidate_through(sender, instance, **kwargs):
+    slugs = Species.objects.filter(properties=instance.species_id).values_list(
+        "slug", flat=True
+    )
+    _invalidate_responses(Species, *slugs)
+
+
+_receivers = [
+    *((invalidate_enrichment_schema, model) for model in CATEGORY_MODELS),
+    *((invalidate_category, model) for model in CATEGORY_MODELS),
+    *((invalidate_object, model) for model in [Family, Genus, Species, Source]),
+    *(
+        (invalidate_species_lists, model)
+        for model in [
+            Family,
+            Genus,
+            FamilyCommonName,
+            GenusCommonName,
+            SpeciesCommonName,
+        ]
+    ),
+    (invalidate_properties, SpeciesProperties),
+    *((invalidate_through, model) for model in THROUGH_MODELS),
+]
+
+for receiver, model in _receivers:
+    post_save.connect(receiver, sender=model)
+    post_delete.connect(receiver, sender=model)
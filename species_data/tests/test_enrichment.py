@@ -1,8 +1,23 @@
 import decimal
+import time
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import async_to_sync
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from langchain_core.exceptions import OutputParserException
 from langchain_core.language_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
 from species_data.enrichment.config import EnrichmentConfig
-from species_data.enrichment.enrich import enrich_species_data
+from species_data.enrichment.enrich import enrich_species_data, store_species_data
+from species_data import response_cache
+from species_data.enrichment import registry
+from species_data.enrichment.registry import get_enrichment_schema
+from species_data.enrichment.runner import EnrichmentRunner, RunnerStats, TokenBucket
+from species_data.enrichment.scheduler import get_staleness, select_stale_species
+from species_data.enrichment.utils import get_fields
 from plant_species.models import Species, Genus, Family
 from species_data.enrichment.models import get_species_data_model
 from species_data.models.categories import (
@@ -12,6 +27,7 @@ from species_data.models.categories import (
     HumanUse,
     SoilPreference,
 )
+from species_data.models import Source
 from species_data.models.models import SpeciesProperties
 
 
@@ -176,3 +192,186 @@ class EnrichSpeciesDataTest(TestCase):
         self.assertEqual(properties.height.maximum, decimal.Decimal("40"))
         self.assertEqual(properties.height.confidence, decimal.Decimal("0.1"))
         self.assertTrue(properties.height_sources.exists())
+
+
+class EnrichmentRunnerTest(TestCase):
+    def test_run(self):
+        ResponseModel = get_species_data_model()
+        plant_data = ResponseModel.parse_obj(
+            {"growth_habits": {"confidence": 1, "values": ["tree"]}}
+        )
+
+        species = _get_species()
+        failing_species = Species.objects.create(
+            latin_name="Quercus petraea", gbif_id=34344, genus=species.genus
+        )
+
+        failing_name = str(failing_species)
+
+        async def complete(inputs):
+            if inputs["species_name"] == failing_name:
+                raise OutputParserException("Invalid JSON")
+
+            return (plant_data, ["https://example.org/1"])
+
+        progress = []
+        with patch(
+            "species_data.enrichment.runner.get_enrichment_chain",
+            return_value=RunnableLambda(complete),
+        ):
+            runner = EnrichmentRunner(
+                config=MagicMock(),
+                concurrency=2,
+                rate=100,
+                on_progress=lambda species, error: progress.append(species),
+            )
+
+        stats = async_to_sync(runner.run)([species, failing_species])
+
+        self.assertEqual(stats.succeeded, 1)
+        self.assertEqual(stats.failures, {"OutputParserException": 1})
+        self.assertEqual(len(stats.latencies), 2)
+        self.assertCountEqual(progress, [species, failing_species])
+
+        species.refresh_from_db()
+        self.assertQuerysetEqual(
+            species.properties.growth_habits.all(),  # pyright: ignore reportAttributeAccessIssue
+            GrowthHabit.objects.filter(slug="tree"),
+        )
+        self.assertFalse(
+            SpeciesProperties.objects.filter(species=failing_species).exists()
+        )
+
+    def test_stats(self):
+        stats = RunnerStats(
+            succeeded=3,
+            failures=Counter({"TimeoutError": 1}),
+            latencies=[4.0, 1.0, 2.0, 3.0],
+            duration=2.0,
+        )
+
+        self.assertEqual(stats.throughput, 2.0)
+        self.assertEqual(stats.percentile(50), 2.0)
+        self.assertEqual(stats.percentile(99), 4.0)
+        self.assertIn("TimeoutError: 1", stats.summary())
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def acquire_all():
+            for _ in range(3):
+                await bucket.acquire()
+
+        start = time.monotonic()
+        async_to_sync(acquire_all)()
+
+        # The first token is available upfront.
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+class EnrichmentSchemaTest(TestCase):
+    def setUp(self):
+        response_cache.clear()
+
+    @patch.object(registry, "_schema", None)
+    def test_get_enrichment_schema(self):
+        schema = get_enrichment_schema()
+        self.assertIs(get_enrichment_schema(), schema)
+
+        # Adding a category rebuilds the schema, once committed.
+        with self.captureOnCommitCallbacks(execute=True):
+            GrowthHabit.objects.create(name="Epiphyte", description="On trees.")
+
+        rebuilt = get_enrichment_schema()
+        self.assertIsNot(rebuilt, schema)
+        self.assertIn("epiphyte", rebuilt.parser.get_format_instructions())
+
+
+class StoreSpeciesDataTest(TestCase):
+    def test_store_species_data(self):
+        ResponseModel = get_species_data_model()
+        response_data = {
+            "growth_habits": {"confidence": 1, "values": ["tree"]},
+            "human_uses": {"confidence": 0.5, "values": ["fiber", "timber"]},
+            "soil_preferences": {"confidence": 0.9, "values": ["clayey", "sandy"]},
+            "height": {"confidence": 0.1, "minimum": 25, "maximum": 40},
+        }
+        citations = ["https://example.org/1", "https://example.org/2"]
+
+        species = _get_species()
+        get_enrichment_schema()
+
+        # Statements per property rather than per value.
+        with CaptureQueriesContext(connection) as queries:
+            store_species_data(
+                species, ResponseModel.parse_obj(response_data), citations
+            )
+        self.assertLessEqual(len(queries), 30)
+
+        # Storing again updates rather than duplicates.
+        response_data["human_uses"]["confidence"] = 0.7
+        store_species_data(species, ResponseModel.parse_obj(response_data), citations)
+
+        properties: SpeciesProperties = species.properties  # pyright: ignore reportAttributeAccessIssue
+        self.assertEqual(Source.objects.count(), 2)
+        self.assertEqual(properties.specieshumanuse_set.count(), 2)  # pyright: ignore reportAttributeAccessIssue
+        self.assertEqual(
+            properties.specieshumanuse_set.first().confidence,  # pyright: ignore reportAttributeAccessIssue
+            decimal.Decimal("0.7"),
+        )
+        self.assertEqual(
+            properties.specieshumanuse_set.first().sources.count(),  # pyright: ignore reportAttributeAccessIssue
+            2,
+        )
+        self.assertEqual(properties.height_sources.count(), 2)
+
+        # Less confident values don't replace existing ones.
+        response_data["human_uses"]["confidence"] = 0.3
+        response_data["height"] = {"confidence": 0.1, "minimum": 1, "maximum": 2}
+        store_species_data(species, ResponseModel.parse_obj(response_data), citations)
+
+        properties.refresh_from_db()
+        self.assertEqual(
+            properties.specieshumanuse_set.first().confidence,  # pyright: ignore reportAttributeAccessIssue
+            decimal.Decimal("0.7"),
+        )
+        self.assertEqual(properties.height.minimum, decimal.Decimal("25"))
+
+
+class SchedulerTest(TestCase):
+    def test_select_stale_species(self):
+        ResponseModel = get_species_data_model()
+        citations = ["https://example.org/1"]
+        range_data = {"confidence": 1, "minimum": 1, "maximum": 2}
+
+        unenriched = _get_species()
+        complete = Species.objects.create(
+            latin_name="Quercus petraea", gbif_id=34344, genus=unenriched.genus
+        )
+        partial = Species.objects.create(
+            latin_name="Quercus ilex", gbif_id=34345, genus=unenriched.genus
+        )
+
+        store_species_data(
+            complete,
+            ResponseModel.parse_obj(
+                {
+                    prop_name: range_data
+                    for prop_name in get_fields(SpeciesProperties).decimalranges
+                }
+            ),
+            citations,
+        )
+        store_species_data(
+            partial,
+            ResponseModel.parse_obj({"height": range_data | {"confidence": 0.5}}),
+            citations,
+        )
+
+        staleness = {item.species_id: item.score for item in get_staleness()}
+        self.assertEqual(staleness[unenriched.pk], 1.0)
+        self.assertAlmostEqual(staleness[partial.pk], 0.68)
+        self.assertAlmostEqual(staleness[complete.pk], 0.0)
+
+        self.assertEqual(select_stale_species(2), [unenriched, partial])
+        self.assertEqual(select_stale_species(5, min_score=0.1), [unenriched, partial])
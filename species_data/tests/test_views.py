@@ -0,0 +1,300 @@
+import datetime
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from plant_species.models import Family, Genus, Species
+from species_data import response_cache
+from species_data.enrichment.utils import get_fields
+from species_data import export
+from species_data.export import build_export
+from species_data.models import Source, SourceType, SpeciesProperties
+from species_data.models.categories import GrowthHabit, SpeciesGrowthHabit
+
+
+class CachedResponseTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        family = Family.objects.create(latin_name="Fagaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Quercus", gbif_id=2, family=family)
+        cls.species = Species.objects.create(
+            latin_name="Quercus robur", gbif_id=3, genus=genus
+        )
+
+    def setUp(self):
+        response_cache.clear()
+        self.url = reverse("species-detail", kwargs={"slug": self.species.slug})
+
+    def test_cached(self):
+        response = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url, {"format": "json"})
+
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    @override_settings(ALLOWED_HOSTS=["internal", "api.example"])
+    def test_hosts(self):
+        url = reverse("genus-detail", kwargs={"slug": self.species.genus.slug})
+
+        internal = self.client.get(url, {"format": "json"}, HTTP_HOST="internal")
+        self.assertTrue(internal.json()["url"].startswith("http://internal/"))
+
+        public = self.client.get(
+            url, {"format": "json"}, HTTP_HOST="api.example", secure=True
+        )
+        self.assertTrue(public.json()["url"].startswith("https://api.example/"))
+
+    def test_not_modified(self):
+        response = self.client.get(self.url, {"format": "json"})
+
+        response = self.client.get(
+            self.url, {"format": "json"}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_invalidation(self):
+        response = self.client.get(self.url, {"format": "json"})
+        list_response = self.client.get(reverse("species-list"), {"format": "json"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.species.description = "Deciduous tree."
+            self.species.save()
+
+        updated = self.client.get(self.url, {"format": "json"})
+        self.assertEqual(updated.json()["description"], "Deciduous tree.")
+        self.assertNotEqual(updated["ETag"], response["ETag"])
+
+        updated = self.client.get(reverse("species-list"), {"format": "json"})
+        self.assertNotEqual(updated["ETag"], list_response["ETag"])
+
+
+class SpeciesDataQueriesTest(TestCase):
+    SPECIES_COUNT = 1600
+
+    @classmethod
+    def setUpTestData(cls):
+        family = Family.objects.create(latin_name="Fagaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Quercus", gbif_id=2, family=family)
+        species = Species.objects.bulk_create(
+            Species(
+                latin_name=f"Quercus species {i}",
+                slug=f"quercus-species-{i}",
+                gbif_id=100 + i,
+                genus=genus,
+            )
+            for i in range(cls.SPECIES_COUNT)
+        )
+        properties = SpeciesProperties.objects.bulk_create(
+            SpeciesProperties(species=s, height_maximum=30, height_confidence=0.8)
+            for s in species
+        )
+
+        tree = GrowthHabit.objects.get(slug="tree")
+        SpeciesGrowthHabit.objects.bulk_create(
+            SpeciesGrowthHabit(species=p, growth_habit=tree, confidence=0.9)
+            for p in properties
+        )
+
+        source = Source.objects.create(
+            source_type=SourceType.objects.create(name="Encyclopedia"),
+            name="Encyclopedia",
+            url="https://example.com",
+        )
+        SpeciesProperties.height_sources.through.objects.bulk_create(
+            SpeciesProperties.height_sources.through(speciesproperties=p, source=source)
+            for p in properties
+        )
+
+    def setUp(self):
+        response_cache.clear()
+
+    def _get_page(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+
+        return response.json(), len(queries)
+
+    def test_constant_queries(self):
+        fields = get_fields(SpeciesProperties)
+        # Species with properties, then each category and range source.
+        expected = 1 + len(fields.categories) + len(fields.decimalranges)
+
+        page, first_count = self._get_page(
+            reverse("species-list") + "?format=json&page_size=100"
+        )
+        self.assertLessEqual(first_count, expected)
+
+        properties = page["results"][0]["properties"]
+        self.assertEqual(len(properties["growth_habits"]), 1)
+        self.assertEqual(len(properties["height_sources"]), 1)
+        self.assertEqual(properties["human_uses"], [])
+
+        page, next_count = self._get_page(page["next"])
+        self.assertEqual(next_count, first_count)
+
+        # Larger pages take as many queries.
+        _, count = self._get_page(
+            reverse("species-list") + "?format=json&page_size=1000"
+        )
+        self.assertEqual(count, first_count)
+
+
+IN_MEMORY_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+@override_settings(STORAGES=IN_MEMORY_STORAGES)
+class SpeciesDataExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        family = Family.objects.create(latin_name="Fagaceae", gbif_id=1)
+        genus = Genus.objects.create(latin_name="Quercus", gbif_id=2, family=family)
+        cls.species = Species.objects.create(
+            latin_name="Quercus robur", gbif_id=3, genus=genus
+        )
+        properties = SpeciesProperties.objects.create(
+            species=cls.species, height_maximum=40, height_confidence=0.8
+        )
+        SpeciesGrowthHabit.objects.create(
+            species=properties,
+            growth_habit=GrowthHabit.objects.get(slug="tree"),
+            confidence=0.9,
+        )
+
+    def setUp(self):
+        response_cache.clear()
+        self.url = reverse("species-data-export")
+
+    def _get_records(self, content: bytes):
+        return [json.loads(line) for line in gzip.decompress(content).splitlines()]
+
+    def test_export(self):
+        build_export()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        header, *records, species = self._get_records(b"".join(response))
+        self.assertEqual(header["type"], "header")
+        self.assertEqual(species["slug"], self.species.slug)
+
+        tree = next(
+            record
+            for record in records
+            if record["kind"] == "growth_habits" and record["slug"] == "tree"
+        )
+        self.assertEqual(species["growth_habits"], [tree["id"]])
+        self.assertEqual(species["height"], [None, None, 40.0, 0.8])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range(self):
+        etag = build_export().digest
+        content = b"".join(self.client.get(self.url))
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, content[10:])
+        self.assertEqual(
+            response["Content-Range"], f"bytes 10-{len(content) - 1}/{len(content)}"
+        )
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-10")
+        self.assertEqual(response.content, content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(content)}-")
+        self.assertEqual(response.status_code, 416)
+
+        # Ranges of another version return the whole export.
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=10-", HTTP_IF_RANGE='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=f'"{etag}"'
+        )
+        self.assertEqual(response.content, content[:10])
+
+    def test_incremental(self):
+        first = build_export()
+        self.assertEqual(build_export(), first)
+
+        other = Species.objects.create(
+            latin_name="Quercus petraea", gbif_id=4, genus=self.species.genus
+        )
+        second = build_export()
+        self.assertNotEqual(second.digest, first.digest)
+
+        records = self._get_records(b"".join(self.client.get(self.url)))
+        self.assertEqual(records[-1]["slug"], other.slug)
+
+    def test_outdated(self):
+        build_export()
+        first = b"".join(self.client.get(self.url))
+        self.assertFalse(export.is_outdated())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Species.objects.create(
+                latin_name="Quercus petraea", gbif_id=4, genus=self.species.genus
+            )
+        self.assertTrue(export.is_outdated())
+
+        # Requests never build, the previous export is served until rebuilt.
+        self.assertEqual(b"".join(self.client.get(self.url)), first)
+
+        call_command("export_species_data", stdout=io.StringIO())
+        self.assertFalse(export.is_outdated())
+
+        records = self._get_records(b"".join(self.client.get(self.url)))
+        self.assertEqual(records[-1]["slug"], other.slug)
+
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_found(self):
+        built = build_export()
+
+        # Built by a process not sharing the cache.
+        response_cache.clear()
+        self.assertEqual(export.get_export(), built)
+
+    # Fresh storages, without exports of other tests.
+    @override_settings(STORAGES=IN_MEMORY_STORAGES)
+    def test_unavailable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "60")
+
+    def test_keep_recent(self):
+        first = build_export()
+        Species.objects.create(
+            latin_name="Quercus petraea", gbif_id=4, genus=self.species.genus
+        )
+
+        # Downloads may still read the previous export.
+        build_export()
+        self.assertTrue(default_storage.exists(first.name))
+
+        later = datetime.datetime.now(datetime.timezone.utc) + (
+            export.UNUSED_GRACE_PERIOD * 2
+        )
+        with patch("django.utils.timezone.now", return_value=later):
+            build_export()
+        self.assertFalse(default_storage.exists(first.name))
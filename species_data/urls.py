@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework import routers
 from species_data import views
 
@@ -15,4 +16,10 @@ router.register(r"sources", views.SourceViewSet)
 
 app_name = "species_data"
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "export.jsonl.gz",
+        views.SpeciesDataExportView.as_view(),
+        name="species-data-export",
+    ),
+]
@@ -1,8 +1,23 @@
+import re
+from typing import Optional, Tuple
+
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.utils.translation import get_language
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.views import APIView
 
 from plant_species.models import Species, Genus, Family
 
+from . import response_cache
+from .enrichment.utils import get_fields
+from .export import get_export
+from .filters import SpeciesSearchFilter
 from .models import (
     ClimateZone,
     GrowthHabit,
@@ -11,6 +26,7 @@ from .models import (
     SoilPreference,
     PropagationMethod,
     Source,
+    SpeciesProperties,
 )
 
 from .serializers import (
@@ -27,21 +43,135 @@ from .serializers import (
 )
 
 
-class FamilyDataViewSet(viewsets.ReadOnlyModelViewSet):
+class CachedResponseMixin:
+    """
+    Serve responses from the response cache, supporting conditional requests.
+
+    Lists are invalidated by changes to any of their objects, details by changes to
+    their object, looked up by `lookup_field`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        version_key = response_cache.list_version_key(self.queryset.model)
+        return self._get_cached_response(
+            [version_key], super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        version_key = response_cache.object_version_key(self.queryset.model, lookup)
+        return self._get_cached_response(
+            [version_key], super().retrieve, request, *args, **kwargs
+        )
+
+    def _get_cached_response(self, version_keys, handler, request, *args, **kwargs):
+        # The browsable API renders the user, don't share it.
+        if request.accepted_renderer.format == "api":
+            return handler(request, *args, **kwargs)
+
+        versions = response_cache.get_versions(
+            [response_cache.GLOBAL_VERSION_KEY, *version_keys]
+        )
+        key = response_cache.get_response_key(
+            # Hyperlinks in responses include scheme and host.
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+            get_language(),
+            *versions,
+        )
+        etag = quote_etag(key.rsplit(":", 1)[-1])
+        last_modified = max(versions) // 10**9
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        cached = response_cache.get_response(key)
+        if cached:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            patch_vary_headers(response, ["Accept"])
+        else:
+            response = self.finalize_response(
+                request, handler(request, *args, **kwargs), *args, **kwargs
+            )
+            response.render()
+            if response.status_code != 200:
+                return response
+
+            response_cache.set_response(
+                key, (response.content, response["Content-Type"])
+            )
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+
+        return response
+
+
+class FamilyDataViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = Family.objects.all()
     serializer_class = FamilyDataSerializer
 
 
-class GenusDataViewSet(viewsets.ReadOnlyModelViewSet):
+class GenusDataViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = Genus.objects.all()
     serializer_class = GenusDataSerializer
 
 
-class SpeciesDataViewSet(viewsets.ReadOnlyModelViewSet):
+def get_species_data_queryset():
+    """
+    Species with everything SpeciesDataSerializer emits, in a fixed number of queries.
+
+    Properties are joined, their categories and range sources prefetched with only
+    the columns needed for their URLs.
+    """
+    fields = get_fields(SpeciesProperties)
+    properties_fields = [
+        f"properties__{field.attname}"
+        for field in SpeciesProperties._meta.concrete_fields
+    ]
+
+    return (
+        Species.objects.select_related("properties")
+        .only(
+            "uuid",
+            "slug",
+            "latin_name",
+            "description",
+            "gbif_id",
+            "image_thumbnail",
+            "image_large",
+            *properties_fields,
+        )
+        .prefetch_related(
+            *(
+                Prefetch(
+                    f"properties__{name}",
+                    queryset=SpeciesProperties._meta.get_field(
+                        name
+                    ).related_model.objects.only("slug"),
+                )
+                for name in fields.categories
+            ),
+            *(
+                Prefetch(
+                    f"properties__{name}_sources", queryset=Source.objects.only("pk")
+                )
+                for name in fields.decimalranges
+            ),
+        )
+    )
+
+
+class SpeciesDataViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
-    queryset = Species.objects.all()
+    queryset = get_species_data_queryset()
     serializer_class = SpeciesDataSerializer
     filterset_fields = {
         # "properties__genus__family",
@@ -56,53 +186,158 @@ class SpeciesDataViewSet(viewsets.ReadOnlyModelViewSet):
         "properties__ecological_roles": ["exact"],
     }
 
-    search_fields = [
-        "latin_name",
-        "common_names__name",
-        "genus__common_names__name",
-        "genus__family__common_names__name",
-        "genus__latin_name",
-        "genus__family__latin_name",
-    ]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, SpeciesSearchFilter]
 
 
-class ClimateZoneViewSet(viewsets.ReadOnlyModelViewSet):
+class ClimateZoneViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = ClimateZone.objects.all()
     serializer_class = ClimateZoneSerializer
 
 
-class GrowthHabitViewSet(viewsets.ReadOnlyModelViewSet):
+class GrowthHabitViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = GrowthHabit.objects.all()
     serializer_class = GrowthHabitSerializer
 
 
-class HumanUseViewSet(viewsets.ReadOnlyModelViewSet):
+class HumanUseViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = HumanUse.objects.all()
     serializer_class = HumanUseSerializer
 
 
-class EcologicalRoleViewSet(viewsets.ReadOnlyModelViewSet):
+class EcologicalRoleViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = EcologicalRole.objects.all()
     serializer_class = EcologicalRoleSerializer
 
 
-class SoilPreferenceViewSet(viewsets.ReadOnlyModelViewSet):
+class SoilPreferenceViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = SoilPreference.objects.all()
     serializer_class = SoilPreferenceSerializer
 
 
-class PropagationMethodViewSet(viewsets.ReadOnlyModelViewSet):
+class PropagationMethodViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     lookup_field = "slug"
     queryset = PropagationMethod.objects.all()
     serializer_class = PropagationMethodSerializer
 
 
-class SourceViewSet(viewsets.ReadOnlyModelViewSet):
+class SourceViewSet(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Source.objects.all()
     serializer_class = SourceSerializer
+
+
+class ExportRenderer(BaseRenderer):
+    """Passes through the gzip compressed species data export."""
+
+    media_type = "application/gzip"
+    format = "gz"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+# Single byte range, e.g. "bytes=0-499", "bytes=500-" or "bytes=-500".
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def get_byte_range(request, size: int, etag: str) -> Optional[Tuple[int, int]]:
+    """
+    First and last byte requested by the Range header, or None for the whole file.
+
+    Ranges starting beyond the end are returned as is, to be rejected as unsatisfiable.
+    Multiple ranges aren't supported, and like invalid ranges they are ignored.
+    """
+
+    header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    # Ranges of another version would corrupt resumed downloads.
+    if not header or (if_range and if_range != etag):
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix, the last bytes.
+        return max(size - int(last), 0), size - 1
+
+    if last and int(last) < int(first):
+        return None
+
+    return int(first), min(int(last), size - 1) if last else size - 1
+
+
+class SpeciesDataExportView(APIView):
+    """
+    The whole species catalog as one gzip compressed JSON Lines file.
+
+    See `species_data.export` for its format. Serves the last export built by the
+    `export_species_data` command, unavailable until the first is. It supports
+    conditional requests by ETag, and byte ranges with If-Range to resume downloads.
+    """
+
+    # Required for model permissions.
+    queryset = Species.objects.none()
+    renderer_classes = [ExportRenderer]
+
+    # Seconds clients are asked to wait for the first export.
+    retry_after = 60
+
+    def get(self, request):
+        export = get_export()
+        if export is None:
+            response = HttpResponse(status=503)
+            response["Retry-After"] = str(self.retry_after)
+            return response
+
+        etag = quote_etag(export.digest)
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        byte_range = get_byte_range(request, export.size, etag)
+        if byte_range is None:
+            response = FileResponse(
+                default_storage.open(export.name),
+                content_type=ExportRenderer.media_type,
+            )
+        else:
+            first, last = byte_range
+            if first >= export.size:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{export.size}"
+                return response
+
+            with default_storage.open(export.name) as f:
+                f.seek(first)
+                content = f.read(last - first + 1)
+
+            response = HttpResponse(
+                content, status=206, content_type=ExportRenderer.media_type
+            )
+            response["Content-Range"] = f"bytes {first}-{last}/{export.size}"
+
+        response["ETag"] = etag
+        response["Accept-Ranges"] = "bytes"
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment=True, filename="species-data.jsonl.gz"
+        )
+
+        return response
+
+    def handle_exception(self, exc):
+        # Report errors as JSON, rather than as an export.
+        self.request.accepted_renderer = JSONRenderer()
+        self.request.accepted_media_type = JSONRenderer.media_type
+
+        return super().handle_exception(exc)
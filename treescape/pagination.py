@@ -0,0 +1,20 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginate on the primary key, so deep pages cost as much as the first one.
+
+    Unlike offset pagination, there are no page numbers; follow the `next` and
+    `previous` links instead. Ranked search results are ordered by rank first.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        if "search_rank" in queryset.query.annotations:
+            return ("-search_rank", "id")
+
+        return super().get_ordering(request, queryset, view)
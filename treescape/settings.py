@@ -244,7 +244,7 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.TokenAuthentication",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "treescape.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_RENDERER_CLASSES": [
@@ -316,6 +316,68 @@ SOCIALACCOUNT_PROVIDERS = {
 
 PPLX_API_KEY = env("PPLX_API_KEY")
 
+# Persistent cache for GBIF and Wikipedia API responses, disabled unless
+# ENRICHMENT_CACHE_PATH is set, so tests don't use it. Set ENRICHMENT_OFFLINE to only
+# serve from cache.
+ENRICHMENT_CACHE = {
+    "PATH": env("ENRICHMENT_CACHE_PATH", default=""),
+    "TTL": timedelta(days=env.int("ENRICHMENT_CACHE_TTL_DAYS", default=90)),
+    "MAX_SIZE": env.int("ENRICHMENT_CACHE_MAX_SIZE", default=512 * 1024 * 1024),
+    "OFFLINE": env.bool("ENRICHMENT_OFFLINE", default=False),
+}
+
+# Resolve latin names and common names with the GBIF API ("api"), or with a local
+# mirror of the backbone ("local"), loaded with the load_gbif_backbone command.
+GBIF_BACKEND = env("GBIF_BACKEND", default="api")
+
+# Renditions of species images besides image_large (2048px) and image_thumbnail
+# (512px), e.g. {"name": "large_webp", "size": 2048, "format": "webp"}. Supported
+# formats are jpeg, webp and avif.
+SPECIES_IMAGE_EXTRA_DERIVATIVES = []
+
+# Species images larger than this many bytes are skipped when downloading.
+SPECIES_IMAGE_MAX_SIZE = env.int("SPECIES_IMAGE_MAX_SIZE", default=20 * 1024 * 1024)
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # Rendered species data API responses, in files when SPECIES_DATA_CACHE_PATH is
+    # set so they're shared between processes and survive restarts.
+    "species_data": (
+        {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": env("SPECIES_DATA_CACHE_PATH"),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+        if env("SPECIES_DATA_CACHE_PATH", default="")
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "species_data",
+        }
+    ),
+    # Rendered map tiles, in files when TILE_CACHE_PATH is set so invalidating them
+    # reaches all processes.
+    "tiles": (
+        {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": env("TILE_CACHE_PATH"),
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+        if env("TILE_CACHE_PATH", default="")
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tiles",
+        }
+    ),
+}
+
+# Species data API responses are cached in process, up to LOCAL_MAX_ENTRIES, in
+# front of the ALIAS cache, for TIMEOUT seconds.
+SPECIES_DATA_CACHE = {
+    "ALIAS": "species_data",
+    "LOCAL_MAX_ENTRIES": 256,
+    "TIMEOUT": 60 * 60 * 24,
+}
+
 # CORS settings for React Native app
 CORS_ALLOW_ALL_ORIGINS = True  # For development, set to False in production
 CORS_ALLOW_CREDENTIALS = True